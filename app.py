@@ -5,15 +5,20 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from src.core.scanner import HardwareScanner
-from src.core.loginctl_api import get_current_assignments
-from src.ui.wizard import ExpressSetupWizard
-from src.ui.advanced_ui import AdvancedSetupWindow
+from src.core.scan_cache import store_scan, scans_equal
+from src.ui.scan_worker import ScanThread, StartupScanThread
+# The wizard and advanced window (and their overlay/listener/dialog modules) are
+# imported when first opened, so the launcher can appear before they load.
 
 class MultiseatLauncher(QMainWindow):
-    def __init__(self, hardware_data, live_mapping=None):
+    def __init__(self, hardware_data=None, live_mapping=None, scanner=None):
         super().__init__()
+        # None until start_initial_scan() delivers the first scan
         self.hardware_data = hardware_data
+        self.scanner = scanner
         self.live_mapping = live_mapping or {}
+        self.startup_thread = None
+        self.revalidate_thread = None
         self.setWindowTitle("Multiseat Manager - Launcher")
         self.setMinimumSize(450, 300)
         self.init_ui()
@@ -30,22 +35,10 @@ class MultiseatLauncher(QMainWindow):
         layout.addWidget(title_label)
 
         # Hardware Summary
-        gpus = len(self.hardware_data.get("graphics", []))
-        monitors = sum(len(gpu.get("monitors", [])) for gpu in self.hardware_data.get("graphics", []))
-        inputs = len(self.hardware_data.get("inputs", []))
-        # Exclude root hubs from usb count to just count external devices roughly
-        usbs = sum(1 for v in self.hardware_data.get("usb", {}).values() if not v.get("is_hub", False))
-
-        summary_text = (
-            f"Detected Hardware:\n"
-            f"• {gpus} GPUs\n"
-            f"• {monitors} Displays\n"
-            f"• {inputs} Input Devices\n"
-        )
-        summary_label = QLabel(summary_text)
-        summary_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        summary_label.setStyleSheet("font-size: 10pt; line-height: 1.4; margin: 15px;")
-        layout.addWidget(summary_label)
+        self.summary_label = QLabel()
+        self.summary_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.summary_label.setStyleSheet("font-size: 10pt; line-height: 1.4; margin: 15px;")
+        layout.addWidget(self.summary_label)
 
         # Buttons
         btn_layout = QHBoxLayout()
@@ -64,8 +57,68 @@ class MultiseatLauncher(QMainWindow):
         btn_layout.addWidget(self.btn_advanced)
         
         layout.addLayout(btn_layout)
+        self.update_summary()
+
+    def update_summary(self):
+        loading = self.hardware_data is None
+        self.btn_express.setEnabled(not loading)
+        self.btn_advanced.setEnabled(not loading)
+        if loading:
+            self.summary_label.setText("Scanning hardware...")
+            return
+
+        gpus = len(self.hardware_data.get("graphics", []))
+        monitors = sum(len(gpu.get("monitors", [])) for gpu in self.hardware_data.get("graphics", []))
+        inputs = len(self.hardware_data.get("inputs", []))
+
+        summary_text = (
+            f"Detected Hardware:\n"
+            f"• {gpus} GPUs\n"
+            f"• {monitors} Displays\n"
+            f"• {inputs} Input Devices\n"
+        )
+        self.summary_label.setText(summary_text)
+
+    def start_initial_scan(self, use_cache=True):
+        """Loads the cached or a fresh scan plus live assignments in the background."""
+        self.startup_thread = StartupScanThread(self.scanner, use_cache=use_cache)
+        self.startup_thread.loaded.connect(self.on_initial_scan)
+        self.startup_thread.scan_failed.connect(self.on_initial_scan_failed)
+        self.startup_thread.start()
+
+    def on_initial_scan(self, hardware_data, live_mapping, fingerprint, warm_start):
+        self.hardware_data = hardware_data
+        self.live_mapping = live_mapping
+        self.update_summary()
+        if warm_start:
+            self.revalidate_cached_scan(fingerprint)
+        elif "--scan-timings" in sys.argv:
+            print(self.scanner.format_timings(), file=sys.stderr)
+
+    def on_initial_scan_failed(self, message):
+        QMessageBox.critical(self, "Hardware Scan Error", f"Failed to scan hardware:\n{message}")
+        QApplication.exit(1)
+
+    def revalidate_cached_scan(self, fingerprint):
+        """Rescans in the background after a warm start and swaps in the result if the hardware changed."""
+        self.fingerprint = fingerprint
+        self.revalidate_thread = ScanThread(self.scanner)
+        self.revalidate_thread.scan_finished.connect(self.on_revalidated)
+        self.revalidate_thread.start()
+
+    def on_revalidated(self, fresh_data):
+        store_scan(fresh_data, self.fingerprint)
+        if scans_equal(fresh_data, self.hardware_data):
+            return
+        # Update in place: the wizard and advanced window share this dict
+        self.hardware_data.clear()
+        self.hardware_data.update(fresh_data)
+        self.update_summary()
+        if hasattr(self, 'advanced_win'):
+            self.advanced_win._rebuild_from_model()
 
     def start_express(self):
+        from src.ui.wizard import ExpressSetupWizard
         self.wizard = ExpressSetupWizard(self.hardware_data)
         self.wizard.accepted.connect(self.on_wizard_finished)
         self.wizard.rejected.connect(self.show)
@@ -79,12 +132,14 @@ class MultiseatLauncher(QMainWindow):
     def start_advanced(self, checked=False, initial_mapping=None):
         # btn_advanced.clicked passes 'checked' as a bool. 
         # initial_mapping comes via python kwargs from on_wizard_finished.
+        from src.ui.advanced_ui import AdvancedSetupWindow
         mapping = initial_mapping if initial_mapping is not None else self.live_mapping
         
         self.advanced_win = AdvancedSetupWindow(
             self.hardware_data, 
             on_wizard_request=self.show_wizard_from_advanced, 
-            initial_mapping=mapping
+            initial_mapping=mapping,
+            scanner=self.scanner
         )
         self.advanced_win.show()
         if hasattr(self, 'wizard'):
@@ -100,26 +155,20 @@ def main():
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
     
-    # Load Hardware
-    scanner = HardwareScanner()
-    try:
-        hardware_data = scanner.full_scan()
-        assignments = get_current_assignments()
-        
-        # Transform flat syspath map to group map
-        live_mapping = {}
-        for syspath, seat in assignments.items():
-            if seat not in live_mapping:
-                live_mapping[seat] = []
-            live_mapping[seat].append(syspath)
-            
-    except Exception as e:
-        QMessageBox.critical(None, "Hardware Scan Error", f"Failed to scan hardware:\n{str(e)}")
-        sys.exit(1)
-
-    launcher = MultiseatLauncher(hardware_data, live_mapping=live_mapping)
+    # Show the launcher right away; the scan (or the cached one, when the sysfs
+    # topology fingerprint is unchanged) arrives from a worker thread
+    launcher = MultiseatLauncher(scanner=HardwareScanner())
     launcher.show()
-    sys.exit(app.exec())
+    launcher.start_initial_scan()
+    exit_code = app.exec()
+    # A scan still in flight must finish before its QThread is torn down
+    for thread in (launcher.startup_thread, launcher.revalidate_thread):
+        if thread:
+            thread.wait()
+    # Ends the privileged session helper, if identify or apply started one
+    from src.core.helper_client import close_session
+    close_session()
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Compares the per-device rules older versions installed with the compact GOTO layout
+from src/core/rules_gen.py on synthetic topologies: rule count, and the match work udev
+does per coldplug event (rules visited and key comparisons, counting each DEVPATH
+alternative), replayed over every device in the synthetic sysfs tree.
+
+    python -m benchmarks.rules --sizes 100 1000 10000
+"""
+import os
+import re
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from fnmatch import fnmatchcase
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.executor import ConfigExecutor
+from src.core.udev_db import UdevDatabase
+from src.core.rules_gen import generate_rules, per_device_rules
+from benchmarks.run import Workload
+
+# The per-device layout is quadratic to replay; 10000 devices takes minutes
+DEFAULT_SIZES = [10, 100, 1000]
+
+_PAIR_RE = re.compile(r'([A-Z_]+(?:\{[^}]*\})?)\s*(==|!=|=)\s*"((?:[^"\\]|\\.)*)"')
+_USB_PORT_RE = re.compile(r"/usb\d+/(\d+-\d+)/")
+
+
+def desk_layout(work):
+    """desired entries with each GPU on its own seat and every input behind one front hub on one seat."""
+    executor = ConfigExecutor()
+    desired = []
+    for i, gpu in enumerate(work.hardware["graphics"]):
+        desired.append((executor._get_target_path(gpu), work.seats[i % len(work.seats)], None, gpu))
+    desks = {}
+    for inp in work.hardware["inputs"]:
+        path = executor._get_target_path(inp)
+        match = _USB_PORT_RE.search(path)
+        desk = desks.setdefault(match.group(1) if match else path, len(desks))
+        desired.append((path, work.seats[desk % len(work.seats)], None, inp))
+    return desired
+
+
+def compile_rules(lines):
+    """[(matches, goto, label)] with matches as (key, op, [alternatives])."""
+    rules = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        matches, goto, label = [], None, None
+        for key, op, value in _PAIR_RE.findall(line):
+            if op in ("==", "!="):
+                matches.append((key, op, value.split("|")))
+            elif key == "GOTO":
+                goto = value
+            elif key == "LABEL":
+                label = value
+        rules.append((matches, goto, label))
+    return rules
+
+
+def coldplug_events(root):
+    """(devpath, subsystem, tags) for every device of the synthetic tree (uevent/dev files or a udev record)."""
+    udev = UdevDatabase.load(root=root)
+    sys_root = os.path.join(root, "sys")
+    syspaths = set(udev.records)
+    for dirpath, dirnames, filenames in os.walk(os.path.join(sys_root, "devices")):
+        if "uevent" in filenames or "dev" in filenames:
+            syspaths.add("/sys" + dirpath[len(sys_root):])
+    events = []
+    for syspath in sorted(syspaths):
+        link = os.path.join(root, syspath.lstrip("/"), "subsystem")
+        subsystem = os.path.basename(os.readlink(link)) if os.path.islink(link) else ""
+        events.append((syspath[4:], subsystem, udev.tags(syspath)))
+    return events
+
+
+def match_work(rules, event):
+    """(rules visited, key comparisons) for one add event, following GOTOs like udev does."""
+    devpath, subsystem, tags = event
+    values = {"ACTION": ["add"], "DEVPATH": [devpath], "SUBSYSTEM": [subsystem], "TAG": list(tags)}
+    labels = {label: i for i, (_, _, label) in enumerate(rules) if label}
+    visited = comparisons = 0
+    i = 0
+    while i < len(rules):
+        matches, goto, _ = rules[i]
+        visited += 1
+        matched = True
+        for key, op, patterns in matches:
+            hit = False
+            for pattern in patterns:
+                comparisons += 1
+                if any(fnmatchcase(value, pattern) for value in values.get(key, [""])):
+                    hit = True
+                    break
+            if hit != (op == "=="):
+                matched = False
+                break
+        i = labels[goto] if matched and goto in labels else i + 1
+    return visited, comparisons
+
+
+def measure_layout(lines, events):
+    rules = compile_rules(lines)
+    start = time.perf_counter()
+    visited = comparisons = 0
+    for event in events:
+        v, c = match_work(rules, event)
+        visited += v
+        comparisons += c
+    return len(rules), visited / len(events), comparisons / len(events), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rule count and per-event match work of the generated seat rules.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="approximate device counts")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="multiseat-rules-bench-")
+    print(f"{'size':>6} {'events':>7} {'layout':>10} {'rules':>6} {'visited/ev':>11} {'cmp/ev':>8} {'replay ms':>10}")
+    try:
+        for size in args.sizes:
+            work = Workload(size, workdir)
+            desired = desk_layout(work)
+            events = coldplug_events(work.root)
+            for name, lines in (("per-device", per_device_rules(desired)), ("compact", generate_rules(desired))):
+                count, visited, comparisons, elapsed = measure_layout(lines, events)
+                print(f"{size:>6} {len(events):>7} {name:>10} {count:>6} {visited:>11.1f} {comparisons:>8.1f} "
+                      f"{elapsed * 1000:>10.1f}", flush=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Times the scanner, mapping and staging hot paths on synthetic topologies and compares
+the results against a stored baseline.
+
+    python -m benchmarks --save-baseline          # record numbers before a change
+    python -m benchmarks --threshold 15           # exit 1 if anything got >15% slower
+
+Baselines are machine-specific, so they are not checked in.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.config import ConfigManager
+from src.core.scanner import HardwareScanner
+from src.core.executor import ConfigExecutor
+from src.core.backup import read_profile
+from src.core.profile import resolve_profile
+from src.tools.synthetic_topology import generate_topology, topology_for_devices
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+BASELINE_VERSION = 1
+# Differences below this are timer noise on small topologies, whatever the percentage
+MIN_DELTA_SECONDS = 0.002
+
+
+class Workload:
+    """One synthetic machine plus the seat mapping the benchmarks replay against it."""
+
+    def __init__(self, size, workdir):
+        self.size = size
+        self.root = os.path.join(workdir, f"devices-{size}")
+        generate_topology(self.root, **topology_for_devices(size))
+        self.config = ConfigManager(os.path.join(workdir, "aliases.json"))
+        self.scanner = HardwareScanner(self.config, root=self.root)
+        self.hardware = self.scanner.full_scan()
+
+        # One GPU per seat, input devices dealt round-robin across the seats
+        gpus = self.hardware["graphics"]
+        self.seats = [f"seat{i + 1}" for i in range(max(1, len(gpus)))]
+        self.staging_map = {seat: [] for seat in self.seats}
+        for i, gpu in enumerate(gpus):
+            self.staging_map[self.seats[i]].append(gpu)
+        for i, inp in enumerate(self.hardware["inputs"]):
+            self.staging_map[self.seats[i % len(self.seats)]].append(inp)
+
+        self.mapping = {seat: [{"id": hw["persistent_id"]} for hw in hw_list]
+                        for seat, hw_list in self.staging_map.items()}
+        self.profile_path = os.path.join(workdir, f"profile-{size}.json")
+        with open(self.profile_path, "w") as f:
+            json.dump(self.mapping, f)
+        self.staging_dir = os.path.join(workdir, f"staging-{size}")
+
+
+def measure(func, setup=None, repeat=3):
+    """Best-of-repeat wall time of func(setup()), with setup excluded from the timing."""
+    best = None
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        func(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_full_scan(work, repeat):
+    return measure(lambda _: work.scanner.full_scan(), repeat=repeat)
+
+
+def bench_apply_mapping(work, repeat):
+    from PyQt6.QtWidgets import QApplication
+    from src.ui.advanced_ui import AdvancedSetupWindow
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    def setup():
+        window = AdvancedSetupWindow(work.hardware, initial_mapping={seat: [] for seat in work.seats})
+        return window
+
+    def run(window):
+        window.apply_mapping(work.mapping)
+        window.deleteLater()
+
+    elapsed = measure(run, setup, repeat)
+    app.processEvents()
+    return elapsed
+
+
+def bench_generate_staging(work, repeat):
+    executor = ConfigExecutor()
+    executor.staging_dir = work.staging_dir
+    return measure(lambda _: executor.generate_staging(work.staging_map, live_assignments={}), repeat=repeat)
+
+
+def bench_resolve_profile(work, repeat):
+    # Loading a saved profile and matching it against the scan, as `cli.py stage` does
+    return measure(lambda _: resolve_profile(work.hardware, read_profile(work.profile_path)), repeat=repeat)
+
+
+def run_startup(work):
+    """One fresh-interpreter launch of app.py via benchmarks/startup.py; returns its timing dict."""
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--root", work.root,
+         "--config", work.config.config_path],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def bench_import_app(work, repeat):
+    return min(run_startup(work)["import_app"] for _ in range(repeat))
+
+
+def bench_time_to_window(work, repeat):
+    # Should stay flat across sizes: the scan runs after the launcher is shown
+    return min(run_startup(work)["time_to_window"] for _ in range(repeat))
+
+
+BENCHMARKS = {
+    "full_scan": bench_full_scan,
+    "apply_mapping": bench_apply_mapping,
+    "generate_staging": bench_generate_staging,
+    "resolve_profile": bench_resolve_profile,
+    "import_app": bench_import_app,
+    "time_to_window": bench_time_to_window,
+}
+
+
+def run_benchmarks(sizes, names=None, repeat=3, workdir=None, report=None):
+    """Returns {benchmark: {str(size): seconds}}."""
+    names = names or list(BENCHMARKS)
+    results = {name: {} for name in names}
+    own_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="multiseat-bench-")
+    try:
+        for size in sizes:
+            work = Workload(size, workdir)
+            for name in names:
+                elapsed = BENCHMARKS[name](work, repeat)
+                results[name][str(size)] = elapsed
+                if report:
+                    report(name, size, elapsed)
+    finally:
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare_results(results, baseline, threshold_pct):
+    """Returns a list of (benchmark, size, baseline_s, current_s) that regressed by more than threshold_pct."""
+    regressions = []
+    for name, by_size in results.items():
+        for size, current in by_size.items():
+            base = baseline.get(name, {}).get(size)
+            if base is None:
+                continue
+            if current > base * (1 + threshold_pct / 100.0) and current - base > MIN_DELTA_SECONDS:
+                regressions.append((name, size, base, current))
+    return regressions
+
+
+def load_baseline(path):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("version") != BASELINE_VERSION:
+        return None
+    return data.get("results", {})
+
+
+def save_baseline(path, results):
+    existing = load_baseline(path) or {}
+    for name, by_size in results.items():
+        existing.setdefault(name, {}).update(by_size)
+    with open(path, "w") as f:
+        json.dump({"version": BASELINE_VERSION, "python": sys.version.split()[0], "results": existing}, f, indent=4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scanner, mapping and staging hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="approximate device counts")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="run a subset of the benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark (best time is kept)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON path")
+    parser.add_argument("--threshold", type=float, default=20.0, help="allowed slowdown in percent")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    baseline = load_baseline(args.baseline)
+
+    def report(name, size, elapsed):
+        base = (baseline or {}).get(name, {}).get(str(size))
+        delta = f"{(elapsed / base - 1) * 100:+7.1f}%" if base else "       -"
+        print(f"{name:<18} {size:>6} {elapsed * 1000:>10.2f} ms {delta}", flush=True)
+
+    print(f"{'benchmark':<18} {'size':>6} {'time':>13} {'vs base':>8}")
+    results = run_benchmarks(args.sizes, args.only, args.repeat, report=report)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if baseline is None:
+        print("No baseline found; run with --save-baseline to record one.")
+        return
+
+    regressions = compare_results(results, baseline, args.threshold)
+    for name, size, base, current in regressions:
+        print(f"REGRESSION {name}[{size}]: {base * 1000:.2f} ms -> {current * 1000:.2f} ms", file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Child process for the startup benchmarks: imports app.py, shows the launcher against a
+synthetic root and prints the elapsed times as JSON. Runs in a fresh interpreter so
+import costs are real, not already paid by the parent.
+
+    python -m benchmarks.startup --root DIR [--config aliases.json]
+"""
+import time
+
+START = time.perf_counter()
+
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--root", default="/")
+    parser.add_argument("--config")
+    args = parser.parse_args()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    import app
+    imported = time.perf_counter()
+
+    from src.core.config import ConfigManager
+    from src.core.scanner import HardwareScanner
+    qapp = app.QApplication(sys.argv[:1])
+    launcher = app.MultiseatLauncher(scanner=HardwareScanner(ConfigManager(args.config), root=args.root))
+    launcher.show()
+    launcher.start_initial_scan(use_cache=False)
+    qapp.processEvents()
+    shown = time.perf_counter()
+
+    launcher.startup_thread.wait()
+    qapp.processEvents()
+    loaded = time.perf_counter()
+
+    json.dump({
+        "import_app": imported - START,
+        "time_to_window": shown - START,
+        "time_to_hardware": loaded - START,
+        "lazy_modules_loaded": sorted(m for m in ("src.ui.wizard", "src.ui.advanced_ui") if m in sys.modules),
+    }, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+Headless front end: scan hardware, show live seat assignments and stage/apply saved
+profiles without a display server. Only src.core is imported here, never PyQt6, and
+only inside the subcommand that needs it so `--help` and light commands start fast.
+"""
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import subprocess
+
+
+def load_hardware(args, scanner=None):
+    """full_scan() result for args.root, through the scan cache unless --no-cache."""
+    from src.core.scan_cache import load_or_scan
+
+    if scanner is None:
+        scanner = make_scanner(args)
+    hardware_data, _, _ = load_or_scan(scanner, use_cache=not args.no_cache, parallel=args.parallel)
+    return hardware_data
+
+
+def make_scanner(args):
+    from src.core.config import ConfigManager
+    from src.core.scanner import HardwareScanner
+
+    config = ConfigManager(args.config) if args.config else ConfigManager()
+    return HardwareScanner(config, root=args.root)
+
+
+def _print_usb(node, depth):
+    if node.get("hidden_by_input"):
+        return
+    print(f"  {'  ' * depth}{node.get('name')}  [{node.get('syspath')}]")
+    for child in node.get("children", []):
+        _print_usb(child, depth + 1)
+
+
+def print_hardware(hardware_data):
+    print("Graphics:")
+    for gpu in hardware_data.get("graphics", []):
+        print(f"  {gpu.get('name')}  [{gpu.get('syspath')}]")
+        for mon in gpu.get("monitors", []):
+            print(f"    {mon.get('name')}")
+    print("Inputs:")
+    for inp in hardware_data.get("inputs", []):
+        if inp.get("error"):
+            print(f"  ({inp.get('error')})")
+        else:
+            print(f"  {inp.get('name')}  ({inp.get('type')})  [{inp.get('syspath')}]")
+    print("Audio/Video:")
+    for av in hardware_data.get("av", []):
+        print(f"  {av.get('name')}  [{av.get('syspath')}]")
+    print("USB:")
+    for node in hardware_data.get("usb", {}).values():
+        _print_usb(node, 0)
+
+
+def cmd_scan(args):
+    from src.core.registry import to_plain
+
+    hardware_data = load_hardware(args)
+    if args.json:
+        json.dump(to_plain(hardware_data), sys.stdout, indent=2)
+        print()
+    else:
+        print_hardware(hardware_data)
+    return 0
+
+
+def cmd_status(args):
+    from src.core.loginctl_api import get_live_mapping
+
+    seats = get_live_mapping()
+    if args.json:
+        json.dump(seats, sys.stdout, indent=2)
+        print()
+    elif not seats:
+        print("All devices are on seat0.")
+    else:
+        for seat in sorted(seats):
+            print(f"{seat}:")
+            for syspath in sorted(seats[seat]):
+                print(f"  {syspath}")
+    return 0
+
+
+def stage_profile(args):
+    """Resolves the profile against a scan and writes staging files. Returns (staging_dir, plan) or (None, None)."""
+    from src.core.backup import read_profile
+    from src.core.profile import resolve_profile
+    from src.core.executor import ConfigExecutor
+
+    try:
+        mapping = read_profile(args.profile)
+    except (OSError, ValueError) as e:
+        print(f"Failed to load profile {args.profile}: {e}", file=sys.stderr)
+        return None, None
+    staging_map = resolve_profile(load_hardware(args), mapping)
+    executor = ConfigExecutor()
+    if args.output:
+        executor.staging_dir = os.path.abspath(args.output)
+    staging_dir = executor.generate_staging(staging_map)
+    for seat in sorted(staging_map):
+        if seat != "seat0":
+            print(f"{seat}: {len(staging_map[seat])} device(s)")
+    for line in executor.last_plan.summary():
+        print(f"  {line}")
+    return staging_dir, executor.last_plan
+
+
+def cmd_stage(args):
+    staging_dir, _ = stage_profile(args)
+    if not staging_dir:
+        return 1
+    print(f"Staged in {staging_dir}; review it, then run apply_config.sh as root.")
+    return 0
+
+
+def cmd_simulate(args):
+    from src.core.backup import read_profile
+    from src.core.profile import resolve_profile
+    from src.core.executor import ConfigExecutor
+    from src.core.rules_sim import RuleSimulator
+
+    try:
+        mapping = read_profile(args.profile)
+    except (OSError, ValueError) as e:
+        print(f"Failed to load profile {args.profile}: {e}", file=sys.stderr)
+        return 1
+    scanner = make_scanner(args)
+    staging_map = resolve_profile(load_hardware(args, scanner), mapping)
+    simulator = RuleSimulator(scanner.udev_db, root=args.root)
+    predicted, mismatches = ConfigExecutor().predict(staging_map, simulator)
+    if args.json:
+        json.dump({"predicted": predicted, "mismatches": {path: {"desired": want, "predicted": got}
+                                                          for path, (want, got) in mismatches.items()}},
+                  sys.stdout, indent=2)
+        print()
+    else:
+        for syspath in sorted(predicted):
+            print(f"{predicted[syspath]:<8} {syspath}")
+        for path, (want, got) in sorted(mismatches.items()):
+            print(f"MISMATCH {path}: {got} instead of {want}")
+        if not mismatches:
+            print("Every device lands on its seat.")
+    return 1 if mismatches else 0
+
+
+def cmd_identify(args):
+    from src.core.helper_client import HelperSession, identify_options, touched_devices, update_table, \
+        IDENTIFY_DEBOUNCE_MS
+
+    inputs = [inp for inp in load_hardware(args).get("inputs", []) if "error" not in inp]
+    names = {inp.get("persistent_id"): inp.get("name", "") for inp in inputs}
+    devices = [[f"/dev/input/{node}", inp.get("persistent_id")] for inp in inputs for node in inp.get("nodes", [])]
+    try:
+        session = HelperSession().start()
+    except OSError as e:
+        print(f"Could not start the input helper: {e}", file=sys.stderr)
+        return 1
+
+    debounce_ms = IDENTIFY_DEBOUNCE_MS if args.debounce_ms is None else args.debounce_ms
+    request_id, events = session.subscribe("identify", devices=devices, **identify_options(debounce_ms))
+    deadline = time.monotonic() + args.seconds
+    table = []
+    stats = None
+    try:
+        while True:
+            try:
+                message = events.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if message.get("event") == "records":
+                for persistent_id in touched_devices(message["records"], table):
+                    print(f"{persistent_id}  {names.get(persistent_id, '')}", flush=True)
+            elif message.get("event") == "device":
+                update_table(table, message)
+                print(f"{message['action']}: {message['persistent_id']}  {message.get('name', '')}", flush=True)
+            elif not message.get("ok"):
+                print(f"Identify failed: {message.get('error', '')}", file=sys.stderr)
+                return 1
+            else:
+                table = message.get("table", [])
+                print(f"Listening to {message.get('opened', 0)} input node(s) for {args.seconds:g} s; "
+                      "press a key on each device.", flush=True)
+        stats = session.request("stats", timeout=5, target=request_id).get("stats")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        session.cancel(request_id)
+        session.close()
+    if stats:
+        print(f"Helper: {stats['cpu_s'] * 1000:.0f} ms CPU over {stats['wall_s']:.1f} s ({stats['cpu_percent']:.2f}%), "
+              f"{stats['wakeups']} wakeups, {stats['events']} events read, {stats['delivered']} delivered, "
+              f"{stats['filtered']} filtered, {stats['debounced']} debounced; "
+              f"kernel filtering on {stats['kernel_masked']} node(s).")
+    return 0
+
+
+def cmd_apply_profile(args):
+    from src.core.executor import CHANGES_FILE_NAME
+    from src.core.apply_helper import helper_command
+
+    staging_dir, plan = stage_profile(args)
+    if not staging_dir:
+        return 1
+    if plan.is_noop:
+        # Already applied: no authentication prompt, no udev reload
+        return 0
+    command = helper_command(os.path.join(staging_dir, CHANGES_FILE_NAME))
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, bufsize=1)
+    except FileNotFoundError as e:
+        print(f"Could not run {command[0]}: {e}", file=sys.stderr)
+        return 1
+    for line in process.stdout:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if event.get("step") not in ("start", "done"):
+            target = " ".join(str(event[key]) for key in ("action", "path", "seat", "devices") if key in event)
+            status = f"{event.get('ms', 0):.0f} ms" if event.get("ok") else f"FAILED: {event.get('error', '')}"
+            print(f"[{event.get('index')}] {event['step']} {target} ({status})")
+        elif event.get("step") == "done":
+            print(f"Finished in {event.get('ms', 0):.0f} ms, {event.get('failed', 0)} step(s) failed.")
+    returncode = process.wait()
+    if returncode in (126, 127) and command[0] == "pkexec":
+        print("Authentication was cancelled or failed. Configuration was not applied.", file=sys.stderr)
+    elif returncode:
+        print(f"Failed to apply configuration (code {returncode}).", file=sys.stderr)
+    else:
+        print("Configuration applied successfully.")
+    return returncode
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="multiseat-manager", description="Headless multiseat management.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_scan_options(p):
+        p.add_argument("--root", default="/", help="filesystem root to scan (for synthetic trees)")
+        p.add_argument("--config", help="aliases.json to use")
+        p.add_argument("--no-cache", action="store_true", help="ignore the cached scan")
+        p.add_argument("--parallel", action="store_true", help="scan device classes in parallel")
+
+    p = sub.add_parser("scan", help="list detected hardware")
+    add_scan_options(p)
+    p.add_argument("--json", action="store_true", help="print the full scan as JSON")
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("status", help="show devices attached to non-seat0 seats")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_status)
+
+    p = sub.add_parser("stage", help="write udev rules and apply_config.sh for a saved profile")
+    p.add_argument("profile")
+    p.add_argument("--output", metavar="DIR", help="staging directory (default: ./staging in the app dir)")
+    add_scan_options(p)
+    p.set_defaults(func=cmd_stage)
+
+    p = sub.add_parser("simulate", help="predict the seat of every device under a profile's rules, offline")
+    p.add_argument("profile")
+    p.add_argument("--json", action="store_true")
+    add_scan_options(p)
+    p.set_defaults(func=cmd_simulate)
+
+    p = sub.add_parser("identify", help="print the persistent ID of every input device used, plus helper CPU use")
+    p.add_argument("--seconds", type=float, default=30, help="how long to listen (default: 30)")
+    p.add_argument("--debounce-ms", type=float,
+                   help="report each device at most once per this window (default: the window the UI uses)")
+    add_scan_options(p)
+    p.set_defaults(func=cmd_identify)
+
+    p = sub.add_parser("apply-profile", help="stage a saved profile and apply it (via pkexec unless root)")
+    p.add_argument("profile")
+    p.add_argument("--output", metavar="DIR", help="staging directory (default: ./staging in the app dir)")
+    add_scan_options(p)
+    p.set_defaults(func=cmd_apply_profile)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Privileged applier: runs under pkexec with the path of a staged changes.json, performs
+the whole change set in one process, and prints one JSON object per step to stdout:
+
+    {"step": "start", "total": 4}
+    {"step": "attach", "seat": "seat1", "path": "/sys/...", "ok": true, "ms": 3.1, "index": 2}
+    {"step": "done", "ok": true, "failed": 0, "ms": 84.0}
+
+Seat changes go through logind's AttachDevice/FlushDevices over a single D-Bus
+connection; without jeepney it falls back to `loginctl`.
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import subprocess
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from src.core.logind_dbus import LogindManager
+
+RULES_DIR = "/etc/udev/rules.d"
+RULES_FILE_NAME = "70-multiseat-manager.rules"
+_SEAT_RE = re.compile(r"^seat[A-Za-z0-9_-]+$")
+
+
+def emit(event):
+    print(json.dumps(event), flush=True)
+
+
+class LoginctlFallback:
+    """LogindManager's interface on top of the loginctl command."""
+
+    def __init__(self, run=subprocess.run):
+        self.run = run
+
+    def _loginctl(self, *args):
+        result = self.run(["loginctl", *args], capture_output=True, text=True)
+        if result.returncode:
+            raise OSError(result.stderr.strip() or f"loginctl exited with {result.returncode}")
+
+    def attach_device(self, seat, sysfs_path):
+        self._loginctl("attach", seat, sysfs_path)
+
+    def flush_devices(self):
+        self._loginctl("flush-devices")
+
+    def close(self):
+        pass
+
+
+def validate_request(request):
+    """Raises ValueError unless request is a well-formed change set (runs as root: trust nothing)."""
+    if request.get("version") != 1:
+        raise ValueError("unsupported change set version")
+    pairs = [(seat, path) for seat, path in request.get("attach", [])]
+    pairs += [("seat0", path) for path in request.get("detach", [])]
+    for seat, path in pairs:
+        if not _SEAT_RE.match(seat):
+            raise ValueError(f"invalid seat name: {seat!r}")
+    for path in [path for _, path in pairs] + list(request.get("retrigger", [])):
+        if not path.startswith("/sys/") or ".." in path.split("/"):
+            raise ValueError(f"invalid sysfs path: {path!r}")
+    source = (request.get("rules") or {}).get("install")
+    if source and os.path.basename(source) != RULES_FILE_NAME:
+        raise ValueError(f"invalid rules file: {source!r}")
+
+
+def count_steps(request):
+    rules = request.get("rules") or {}
+    return (bool(rules.get("install") or rules.get("remove")) + bool(request.get("flush"))
+            + len(request.get("attach", [])) + len(request.get("detach", []))
+            + bool(request.get("reload")) + bool(request.get("retrigger")))
+
+
+def retrigger(paths, timeout, run=subprocess.run):
+    """Change events for paths and their children, waiting for just those (bounded settle on older udevadm)."""
+    matches = [f"--parent-match={path}" for path in paths]
+    try:
+        result = run(["udevadm", "trigger", "--action=change", "--settle", *matches],
+                     capture_output=True, text=True, timeout=timeout)
+        if result.returncode == 0:
+            return
+    except subprocess.TimeoutExpired:
+        pass
+    run(["udevadm", "trigger", "--action=change", *matches], capture_output=True, text=True, check=True)
+    run(["udevadm", "settle", f"--timeout={timeout}"], capture_output=True, text=True)
+
+
+def apply_changes(request, logind=None, run=subprocess.run, rules_dir=RULES_DIR, emit=emit):
+    """Performs a validated change set, emitting a progress event per step. Returns the number of failed steps."""
+    start = time.perf_counter()
+    failed = 0
+    index = 0
+    emit({"step": "start", "total": count_steps(request)})
+
+    def step(name, perform, **fields):
+        nonlocal failed, index
+        index += 1
+        began = time.perf_counter()
+        event = {"step": name, **fields, "index": index}
+        try:
+            perform()
+            event["ok"] = True
+        except Exception as e:
+            failed += 1
+            event["ok"] = False
+            event["error"] = str(e)
+        event["ms"] = round((time.perf_counter() - began) * 1000, 1)
+        emit(event)
+
+    rules = request.get("rules") or {}
+    target = os.path.join(rules_dir, RULES_FILE_NAME)
+    if rules.get("install"):
+        step("rules", lambda: shutil.copyfile(rules["install"], target), action="install")
+    elif rules.get("remove"):
+        step("rules", lambda: os.path.exists(target) and os.remove(target), action="remove")
+
+    if logind is None and (request.get("flush") or request.get("attach") or request.get("detach")):
+        try:
+            logind = LogindManager()
+        except OSError:
+            logind = LoginctlFallback(run)
+    try:
+        if request.get("flush"):
+            step("flush", logind.flush_devices)
+        for seat, path in request.get("attach", []):
+            step("attach", lambda s=seat, p=path: logind.attach_device(s, p), seat=seat, path=path)
+        for path in request.get("detach", []):
+            step("attach", lambda p=path: logind.attach_device("seat0", p), seat="seat0", path=path)
+    finally:
+        if logind is not None:
+            logind.close()
+
+    if request.get("reload"):
+        step("reload", lambda: run(["udevadm", "control", "--reload-rules"], capture_output=True, text=True, check=True))
+    if request.get("retrigger"):
+        paths = request["retrigger"]
+        step("retrigger", lambda: retrigger(paths, request.get("settle_timeout", 15), run), devices=len(paths))
+
+    emit({"step": "done", "ok": not failed, "failed": failed,
+          "ms": round((time.perf_counter() - start) * 1000, 1)})
+    return failed
+
+
+def privileged_command(script, *args):
+    """argv that runs script (a path) with args as root: directly when already root, else through pkexec."""
+    app_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    python_exec = os.path.join(app_dir, ".venv", "bin", "python3")
+    if not os.path.exists(python_exec):
+        python_exec = sys.executable
+    cmd = [python_exec, os.path.abspath(script), *args]
+    return cmd if os.geteuid() == 0 else ["pkexec"] + cmd
+
+
+def helper_command(changes_path):
+    """argv that runs this helper on changes_path as root."""
+    return privileged_command(__file__, changes_path)
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("usage: apply_helper.py CHANGES_JSON", file=sys.stderr)
+        sys.exit(2)
+    try:
+        with open(sys.argv[1], "r") as f:
+            request = json.load(f)
+        validate_request(request)
+    except (OSError, ValueError) as e:
+        print(f"Invalid change set: {e}", file=sys.stderr)
+        sys.exit(2)
+    sys.exit(1 if apply_changes(request) else 0)
+
+
+if __name__ == "__main__":
+    main()
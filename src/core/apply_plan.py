@@ -0,0 +1,113 @@
+"""
+Diff engine behind ConfigExecutor: compares the desired seat layout with live assignments
+and installed rules and keeps only the operations that change something.
+"""
+import os
+
+# Format of the change set handed to the privileged apply helper
+REQUEST_VERSION = 1
+
+
+class ApplyPlan:
+    """
+    The operations needed to reach a desired layout:
+      attach      [(seat, path)]  loginctl attach to a non-seat0 seat
+      detach      [path]          loginctl attach seat0 (drops a 72-seat-*.rules pin)
+      flush       bool            loginctl flush-devices, when every pinned device returns to seat0
+      rules_add / rules_remove    udev rule lines that differ from the installed rules file
+      retrigger   [path]          devices whose seat or access mode changes
+    """
+
+    def __init__(self):
+        self.attach = []
+        self.detach = []
+        self.flush = False
+        self.rules_add = []
+        self.rules_remove = []
+        self.rules_text = ""
+        self.retrigger = []
+
+    @property
+    def rules_changed(self):
+        return bool(self.rules_add or self.rules_remove)
+
+    @property
+    def is_noop(self):
+        return not (self.attach or self.detach or self.flush or self.rules_changed or self.retrigger)
+
+    def to_request(self, rules_source, settle_timeout):
+        """The change set for apply_helper.py; rules_source is the staged rules file to install."""
+        return {
+            "version": REQUEST_VERSION,
+            "rules": {"install": rules_source if self.rules_changed and self.rules_text else None,
+                      "remove": self.rules_changed and not self.rules_text},
+            "flush": self.flush,
+            "attach": [list(pair) for pair in self.attach],
+            "detach": list(self.detach),
+            "reload": self.rules_changed,
+            "retrigger": list(self.retrigger),
+            "settle_timeout": settle_timeout,
+        }
+
+    def summary(self):
+        """Human-readable list of the planned operations."""
+        if self.is_noop:
+            return ["Nothing to apply: the installed configuration already matches."]
+        lines = [f"attach {path} -> {seat}" for seat, path in self.attach]
+        if self.flush:
+            lines.append("flush all loginctl device attachments")
+        lines += [f"detach {path} -> seat0" for path in self.detach]
+        if self.rules_add:
+            lines.append(f"add {len(self.rules_add)} udev rule(s)")
+        if self.rules_remove:
+            lines.append(f"remove {len(self.rules_remove)} udev rule(s)")
+        if self.retrigger:
+            lines.append(f"retrigger {len(self.retrigger)} device(s)")
+        return lines
+
+
+def _rule_lines(text_lines):
+    """Rule lines of a rules file without comments and blanks, for comparison."""
+    return [line.strip() for line in text_lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def build_plan(desired, rules_text_lines, live_assignments, rules_index, installed_lines, own_rules_file):
+    """
+    desired: [(target_path, seat, mode, hw)] for every device in the layout, seat0 included.
+    rules_text_lines: the rules file that expresses the layout (comments allowed).
+    installed_lines: the lines of the installed copy of own_rules_file, or None if absent.
+    """
+    plan = ApplyPlan()
+    plan.rules_text = "\n".join(rules_text_lines) + "\n" if rules_text_lines else ""
+
+    wanted = _rule_lines(rules_text_lines)
+    installed = _rule_lines(installed_lines or [])
+    wanted_set, installed_set = set(wanted), set(installed)
+    plan.rules_add = [line for line in wanted if line not in installed_set]
+    plan.rules_remove = [line for line in installed if line not in wanted_set]
+
+    foreign_pins = []
+    for target_path, seat, mode, hw in desired:
+        rule = rules_index.lookup_hw(hw, target_path)
+        current_seat = live_assignments.get(target_path) or (rule.seat if rule else "seat0")
+
+        if seat != "seat0" and current_seat != seat:
+            plan.attach.append((seat, target_path))
+        elif seat == "seat0" and current_seat != "seat0":
+            # Devices this tool placed carry a loginctl attach pin (72-seat-*.rules) besides
+            # their line in our own file; removing that line alone would leave them on the seat
+            pinned = any(os.path.basename(pin.file) != own_rules_file and pin.seat != "seat0"
+                         for pin in rules_index.lookup_hw_all(hw, target_path))
+            if pinned or rule is None:
+                # rule is None: attached live without any rule; only logind can release it
+                foreign_pins.append(target_path)
+
+        if (current_seat != seat or mode != (rule.mode if rule else None)) and target_path not in plan.retrigger:
+            plan.retrigger.append(target_path)
+
+    if foreign_pins and not any(seat != "seat0" for _, seat, _, _ in desired):
+        # Everything goes back to seat0: one flush removes every 72-seat-*.rules at once
+        plan.flush = True
+    else:
+        plan.detach = foreign_pins
+    return plan
@@ -1,6 +1,5 @@
 import os
 import stat
-from PyQt6.QtWidgets import QMessageBox
 
 def install_desktop_file(parent_widget=None):
     """
@@ -40,8 +39,10 @@ Keywords=multiseat;loginctl;seat;hardware;usb;gpu;
         os.system("update-desktop-database ~/.local/share/applications/ > /dev/null 2>&1")
         
         if parent_widget:
+            from PyQt6.QtWidgets import QMessageBox
             QMessageBox.information(parent_widget, "Installed", f"Desktop shortcut successfully installed to:\n{desktop_file}")
             
     except Exception as e:
         if parent_widget:
+            from PyQt6.QtWidgets import QMessageBox
             QMessageBox.critical(parent_widget, "Install Error", f"Failed to create .desktop shortcut:\n{str(e)}")
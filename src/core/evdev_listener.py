@@ -1,65 +1,220 @@
 #!/usr/bin/env python3
+import os
+import array
 import evdev
+import fcntl
 import select
+import struct
 import sys
 import threading
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from src.core.scanner import persistent_id_from
+from src.core.session_helper import EV_KEY, encode_message, encode_records
+
+EV_SYN = 0
+# struct input_event: struct timeval, u16 type, u16 code, s32 value
+_INPUT_EVENT = struct.Struct("llHHi")
+_READ_SIZE = _INPUT_EVENT.size * 256
+# EVIOCSMASK = _IOW('E', 0x93, struct input_mask {u32 type; u32 codes_size; u64 codes_ptr})
+_INPUT_MASK = struct.Struct("IIQ")
+EVIOCSMASK = (1 << 30) | (_INPUT_MASK.size << 16) | (ord("E") << 8) | 0x93
+
+
+def set_type_mask(fd, types):
+    """
+    Asks evdev (Linux 4.4+) to deliver only the given event types to this fd, so events
+    nobody subscribed to never wake the reader. Returns False where unsupported.
+    """
+    bits = array.array("B", bytes(8))  # EV_CNT bits, one unsigned long
+    for event_type in types:
+        bits[event_type // 8] |= 1 << (event_type % 8)
+    try:
+        fcntl.ioctl(fd, EVIOCSMASK, _INPUT_MASK.pack(EV_SYN, len(bits), bits.buffer_info()[0]))
+    except OSError:
+        return False
+    return True
+
+
 def check_stdin():
     # If stdin closes, the parent died or told us to stop
     sys.stdin.read()
     sys.exit(0)
 
+
+class InputWatcher:
+    """
+    Watches a set of evdev nodes on a caller's epoll object and reports their events as
+    records keyed by device index; table[index] is the node's persistent_id. Shared by
+    this one-shot listener and the session helper. Nodes can come and go at any time;
+    indexes are never reused within one watcher.
+
+    Only the event types in types are reported, filtered by the kernel where it supports
+    event masks. With debounce_ms, a device's first activity (anything but a key release)
+    is reported and the rest of its events are dropped until the window has passed.
+    """
+
+    def __init__(self, epoll, types=(EV_KEY,), debounce_ms=0):
+        self.epoll = epoll
+        self.types = frozenset(types)
+        self.debounce_us = int(debounce_ms * 1000)
+        self.devices = {}  # fd -> (InputDevice, device index, node path)
+        self.quiet_until = {}  # fd -> kernel timestamp (us) until which events are debounced
+        self.table = []
+        self.stats = {"wakeups": 0, "events": 0, "delivered": 0, "filtered": 0, "debounced": 0, "kernel_masked": 0}
+
+    def add(self, path, pid):
+        """Starts watching path; returns its device index, or None if it cannot be opened or is already watched."""
+        if self.find(path) is not None:
+            return None
+        try:
+            dev = evdev.InputDevice(path)
+        except Exception:
+            return None
+        return self.watch(dev, pid, path)
+
+    def watch(self, dev, pid, path):
+        """Registers an already open device (anything with .fd and .close()) and returns its device index."""
+        index = len(self.table)
+        self.devices[dev.fd] = (dev, index, path)
+        self.table.append(pid)
+        if set_type_mask(dev.fd, self.types):
+            self.stats["kernel_masked"] += 1
+        self.epoll.register(dev.fd, select.EPOLLIN)
+        return index
+
+    def find(self, path):
+        for fd, (dev, index, node) in self.devices.items():
+            if node == path:
+                return fd
+        return None
+
+    def remove(self, fd):
+        """Stops watching fd; returns its device index."""
+        dev, index, node = self.devices.pop(fd)
+        self.quiet_until.pop(fd, None)
+        try:
+            self.epoll.unregister(fd)
+        except (OSError, ValueError):
+            pass
+        try:
+            dev.close()
+        except Exception:
+            pass
+        return index
+
+    def read(self, fd):
+        """
+        (device index, type, code, value, timestamp_us) for the pending events on fd that
+        pass the filters, or None if the device went away (it is no longer watched then).
+        """
+        index = self.devices[fd][1]
+        stats = self.stats
+        stats["wakeups"] += 1
+        records = []
+        while True:
+            try:
+                data = os.read(fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            except OSError:
+                # ENODEV after an unplug: a dead fd would wake every poll from now on
+                self.remove(fd)
+                return None
+            if not data:
+                break
+            usable = len(data) - len(data) % _INPUT_EVENT.size
+            for sec, usec, event_type, code, value in _INPUT_EVENT.iter_unpack(data[:usable]):
+                stats["events"] += 1
+                if event_type not in self.types:
+                    stats["filtered"] += 1
+                    continue
+                timestamp = sec * 1000000 + usec
+                if self.debounce_us:
+                    if timestamp < self.quiet_until.get(fd, 0):
+                        stats["debounced"] += 1
+                        continue
+                    if event_type != EV_KEY or value != 0:
+                        self.quiet_until[fd] = timestamp + self.debounce_us
+                records.append((index, event_type, code, value, timestamp))
+            if len(data) < _READ_SIZE:
+                break
+        stats["delivered"] += len(records)
+        return records
+
+    def close(self):
+        for fd in list(self.devices):
+            self.remove(fd)
+
+
+def input_node_event(event, root="/"):
+    """
+    (action, node, syspath, persistent_id, name) for a udev-processed uevent of an evdev
+    node, or None for any other device. Only nodes udev classified as input (ID_INPUT)
+    are reported for "add".
+    """
+    devname = event.get("DEVNAME", "")
+    action = event.get("ACTION")
+    if event.get("SUBSYSTEM") != "input" or not os.path.basename(devname).startswith("event"):
+        return None
+    if action == "add" and not event.get("ID_INPUT"):
+        return None
+    if action not in ("add", "remove"):
+        return None
+    node = devname if devname.startswith("/dev/") else "/dev/" + devname
+    syspath = "/sys" + event["DEVPATH"]
+    name = ""
+    try:
+        with open(os.path.join(root, syspath.lstrip("/"), "device", "name"), "r") as f:
+            name = f.read().strip()
+    except OSError:
+        pass
+    return action, node, syspath, persistent_id_from(syspath, event), name
+
+
 def main():
     if len(sys.argv) < 2:
         sys.exit(1)
-        
-    devices = {}
+
     try:
         epoll = select.epoll()
     except AttributeError:
         sys.exit(2)
-        
+
     # Start a daemon thread to watch stdin so we know when to die gracefully
     t = threading.Thread(target=check_stdin, daemon=True)
     t.start()
-        
+
+    watcher = InputWatcher(epoll)
     for arg in sys.argv[1:]:
         # format: /dev/input/eventX|persistent_id
         parts = arg.split("|", 1)
         if len(parts) == 2:
             path, pid = parts
-            try:
-                dev = evdev.InputDevice(path)
-                devices[dev.fd] = (dev, pid)
-                epoll.register(dev.fd, select.EPOLLIN)
-            except Exception:
-                pass
-                
-    if not devices:
+            watcher.add(path, pid)
+
+    if not watcher.devices:
         sys.exit(3)
-        
+
+    # Same framing as the session helper: the ID table once, then binary records
+    out = sys.stdout.buffer
+    out.write(encode_message({"id": 0, "ok": True, "opened": len(watcher.devices), "table": watcher.table}))
+    out.flush()
     try:
         while True:
             events = epoll.poll(0.5)
+            records = []
             for fd, event_type in events:
-                if fd in devices:
-                    dev, pid = devices[fd]
-                    try:
-                        for event in dev.read():
-                            if event.type == evdev.ecodes.EV_KEY:
-                                if event.value != 0:  # Key down
-                                    print(pid, flush=True)
-                    except Exception:
-                        pass
+                if fd in watcher.devices:
+                    records.extend(watcher.read(fd) or [])
+            if records:
+                out.write(encode_records(0, records))
+                out.flush()
     except KeyboardInterrupt:
         pass
     finally:
-        for fd, (dev, pid) in devices.items():
-            try:
-                epoll.unregister(fd)
-                dev.close()
-            except Exception:
-                pass
+        watcher.close()
         epoll.close()
 
 if __name__ == "__main__":
@@ -1,15 +1,25 @@
 import subprocess
 import os
 import stat
-from PyQt6.QtWidgets import QMessageBox
+import json
 
 from src.core.loginctl_api import get_current_assignments
+from src.core.rules_index import get_rules_index
+from src.core.apply_plan import build_plan
+from src.core.rules_gen import generate_rules
+
+# The rules file this tool installs; seat rules elsewhere come from loginctl attach or the distribution
+RULES_FILE_NAME = "70-multiseat-manager.rules"
+# Upper bound (seconds) on waiting for udev to finish the retriggered devices
+SETTLE_TIMEOUT = 15
+CHANGES_FILE_NAME = "changes.json"
 
 class ConfigExecutor:
     def __init__(self, parent_widget=None):
         self.parent = parent_widget
         self.app_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
         self.staging_dir = os.path.join(self.app_dir, "staging")
+        self.last_plan = None
         
     def _get_target_path(self, hw_data):
         # GPUs should attach by their base PCI path to absorb both video and audio components
@@ -36,72 +46,110 @@ class ConfigExecutor:
                     return syspath[idx:] # fallback
         return hw_data.get("syspath")
 
-    def generate_staging(self, staging_map):
+    def _retrigger_script(self, changed_paths):
         """
-        staging_map: {"seat1": [hw_data_1, hw_data_2], "seat0": [...]}
-        Returns the staging directory path if rules were written, or None.
+        Replays change events for just the changed devices and their children (DRM/sound under a
+        GPU, interfaces under a USB device), instead of every device on the machine, then waits
+        for those events only and reports how long the seats took to become ready.
         """
-        live_assignments = get_current_assignments()
-        
-        commands = []
-        udev_rules = []
-        
+        if not changed_paths:
+            return ""
+        matches = " ".join(f"--parent-match={path}" for path in changed_paths)
+        return (
+            "start=$(date +%s%N)\n"
+            # --settle (systemd 248+) waits for the triggered events only; older udevadm falls back to a bounded settle
+            f"timeout {SETTLE_TIMEOUT} udevadm trigger --action=change --settle {matches} 2>/dev/null || {{\n"
+            f"    udevadm trigger --action=change {matches}\n"
+            f"    udevadm settle --timeout={SETTLE_TIMEOUT}\n"
+            "}\n"
+            f"echo \"Seats ready after $(( ($(date +%s%N) - start) / 1000000 )) ms ({len(changed_paths)} device(s) retriggered)\"\n"
+        )
+
+    def desired_layout(self, staging_map):
+        """[(target_path, seat, mode, hw)] for every device of staging_map that has a sysfs path."""
+        desired = []
         for seat_name, hw_list in staging_map.items():
             for hw in hw_list:
                 target_path = self._get_target_path(hw)
                 if not target_path:
                     continue
-                    
-                current_seat = live_assignments.get(target_path, "seat0")
-                if current_seat != seat_name and seat_name != "seat0":
-                    commands.append(f"loginctl attach {seat_name} {target_path}")
+                mode = "0600" if hw.get("restrict_access") and seat_name != "seat0" else None
+                desired.append((target_path, seat_name, mode, hw))
+        return desired
 
-                if seat_name != "seat0":
-                    dev_name = hw.get("name", "Unknown Device")
-                    # In some mock testing cases, target_path might be short. Ensure it drops /sys but works either way.
-                    devpath = target_path[4:] if target_path.startswith("/sys") else target_path
-                    if not devpath.startswith("/"):
-                        devpath = "/" + devpath
-                        
-                    udev_rules.append(f"# {dev_name}")
-
-                    hw_type = hw.get("type", "")
+    def predict(self, staging_map, simulator):
+        """
+        Runs the rules generate_staging() would write for staging_map through a RuleSimulator.
+        Returns (predicted {syspath: seat}, mismatches {target_path: (desired, predicted)}).
+        """
+        desired = self.desired_layout(staging_map)
+        return simulator.check(desired, generate_rules(desired))
 
-                    mode_str = ""
-                    if hw.get("restrict_access"):
-                        mode_str = ', MODE="0600"'
+    def plan(self, staging_map, live_assignments=None, rules_index=None):
+        """
+        Diffs staging_map ({"seat1": [hw_data, ...], "seat0": [...]}) against the live
+        assignments and installed rules. Returns an ApplyPlan.
+        """
+        if live_assignments is None:
+            live_assignments = get_current_assignments()
+        if rules_index is None:
+            rules_index = get_rules_index()
 
-                    udev_rules.append(f'TAG=="seat", DEVPATH=="{devpath}", ENV{{ID_SEAT}}="{seat_name}"{mode_str}')
+        desired = self.desired_layout(staging_map)
+        return build_plan(desired, generate_rules(desired), live_assignments, rules_index,
+                          rules_index.read_active(RULES_FILE_NAME), RULES_FILE_NAME)
 
-                    # If this is a GPU using a PCI syspath, we must explicitly tag related subsystems
-                    # to ensure DRM, fb, and sound cards under this PCI bus are assigned to the seat.
-                    if hw_type in ["graphics", "gpu"] and hw.get("pci_syspath"):
-                        # Catch children for drm, graphics and sound
-                        udev_rules.append(f'TAG=="seat", DEVPATH=="{devpath}/*", SUBSYSTEM=="drm", ENV{{ID_SEAT}}="{seat_name}"')
-                        udev_rules.append(f'TAG=="seat", DEVPATH=="{devpath}/*", SUBSYSTEM=="graphics", ENV{{ID_SEAT}}="{seat_name}"')
-                        udev_rules.append(f'TAG=="seat", DEVPATH=="{devpath}/*", SUBSYSTEM=="sound", ENV{{ID_SEAT}}="{seat_name}"')
+    def generate_staging(self, staging_map, live_assignments=None, rules_index=None):
+        """
+        staging_map: {"seat1": [hw_data_1, hw_data_2], "seat0": [...]}
+        live_assignments: {syspath: seat} as returned by get_current_assignments() (queried if None).
+        rules_index: RulesIndex of installed seat rules (the host's if None).
+        Writes the rules file, an apply_config.sh that performs only the planned operations
+        (see plan()) and the same operations as changes.json for apply_helper.py; when nothing
+        differs neither changes anything. The plan is kept in
+        self.last_plan. Returns the staging directory path.
+        """
+        plan = self.plan(staging_map, live_assignments, rules_index)
+        self.last_plan = plan
 
         os.makedirs(self.staging_dir, exist_ok=True)
         
         script_content = "#!/bin/sh\n"
         
-        rules_path = os.path.join(self.staging_dir, "70-multiseat-manager.rules")
-        if udev_rules:
+        rules_path = os.path.join(self.staging_dir, RULES_FILE_NAME)
+        if plan.rules_text:
             with open(rules_path, "w") as f:
-                f.write("\n".join(udev_rules) + "\n")
-            script_content += f"cp {os.path.abspath(rules_path)} /etc/udev/rules.d/70-multiseat-manager.rules\n"
+                f.write(plan.rules_text)
         elif os.path.exists(rules_path):
             os.remove(rules_path)
-            
-        if commands:
-            script_content += "\n".join(commands) + "\n"
-        
-        script_content += "udevadm control --reload-rules\n"
-        script_content += "udevadm trigger\n"
+
+        if plan.is_noop:
+            script_content += f"echo '{plan.summary()[0]}'\n"
+        else:
+            if plan.rules_changed:
+                if plan.rules_text:
+                    script_content += f"cp {os.path.abspath(rules_path)} /etc/udev/rules.d/{RULES_FILE_NAME}\n"
+                else:
+                    script_content += f"rm -f /etc/udev/rules.d/{RULES_FILE_NAME}\n"
+
+            commands = [f"loginctl attach {seat_name} {path}" for seat_name, path in plan.attach]
+            if plan.flush:
+                commands.append("loginctl flush-devices")
+            commands += [f"loginctl attach seat0 {path}" for path in plan.detach]
+            if commands:
+                script_content += "\n".join(commands) + "\n"
+
+            if plan.rules_changed:
+                script_content += "udevadm control --reload-rules\n"
+            script_content += self._retrigger_script(plan.retrigger)
         
         script_path = os.path.join(self.staging_dir, "apply_config.sh")
         with open(script_path, "w") as f:
             f.write(script_content)
+
+        # The same operations as one structured request for apply_helper.py
+        with open(os.path.join(self.staging_dir, CHANGES_FILE_NAME), "w") as f:
+            json.dump(plan.to_request(os.path.abspath(rules_path), SETTLE_TIMEOUT), f, indent=4)
         
         st = os.stat(script_path)
         os.chmod(script_path, st.st_mode | stat.S_IEXEC)
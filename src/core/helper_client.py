@@ -0,0 +1,276 @@
+"""
+Client side of session_helper.py: one privileged helper per application session, shared
+by the input listener and the apply path so polkit and interpreter startup are paid once.
+"""
+import os
+import json
+import array
+import queue
+import socket
+import threading
+import subprocess
+
+from src.core.apply_helper import privileged_command
+from src.core.session_helper import FrameReader, KIND_JSON, KIND_INPUT, EV_KEY, encode_message, decode_records
+
+SESSION_HELPER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "session_helper.py")
+# Identify only needs a device's first key-down; repeats and chatter within this window stay in the helper
+IDENTIFY_DEBOUNCE_MS = 250
+
+
+class NotifyingQueue(queue.Queue):
+    """
+    A queue whose read_fd becomes readable whenever something is put, so an event loop
+    (QSocketNotifier, selectors) can wait for helper messages without a thread.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.read_fd, self._write_fd = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+        self._fd_lock = threading.Lock()
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        with self._fd_lock:
+            if self._write_fd is not None:
+                try:
+                    os.write(self._write_fd, b"\0")
+                except BlockingIOError:
+                    pass  # Already readable
+
+    def drain(self):
+        """Clears the wakeup, then returns everything queued so far without blocking."""
+        try:
+            while os.read(self.read_fd, 4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+        items = []
+        while True:
+            try:
+                items.append(self.get_nowait())
+            except queue.Empty:
+                return items
+
+    def close(self):
+        with self._fd_lock:
+            if self._write_fd is not None:
+                os.close(self._write_fd)
+                os.close(self.read_fd)
+                self._write_fd = None
+
+
+class HelperSession:
+    """
+    A running session helper. Replies and events are routed by request id to per-request
+    queues by a reader thread; once the helper exits every open queue receives
+    {"ok": False, "closed": True}.
+    """
+
+    def __init__(self, command=None):
+        self.command = command or privileged_command(SESSION_HELPER_SCRIPT)
+        self.process = None
+        self.sock = None
+        self.helper_pid = None
+        self._hello = None
+        self.closed = True
+        self._queues = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def launch(self):
+        """Spawns the helper and queues the hello without waiting for it (or for the polkit prompt)."""
+        parent, child = socket.socketpair()
+        try:
+            self.process = subprocess.Popen(self.command, stdin=child, stdout=child, stderr=subprocess.DEVNULL)
+        finally:
+            child.close()
+        self.sock = parent
+        self.closed = False
+        threading.Thread(target=self._read_loop, daemon=True).start()
+        self._hello = self.subscribe("hello")
+        return self
+
+    def start(self):
+        """Spawns the helper and waits for its hello (through the polkit prompt). Raises PermissionError or OSError."""
+        return self.launch().wait_ready()
+
+    def wait_ready(self):
+        """Waits for the hello queued by launch(). Raises PermissionError or OSError."""
+        hello_id, hello = self._hello
+        try:
+            reply = hello.get()
+        finally:
+            self.release(hello_id)
+        if not reply.get("ok"):
+            self.close()
+            code = self.process.returncode
+            if code in (126, 127):
+                raise PermissionError("Authentication was cancelled or failed")
+            raise OSError(reply.get("error") or f"session helper exited with code {code}")
+        self.helper_pid = reply.get("pid")
+        return self
+
+    def is_alive(self):
+        return not self.closed and self.process is not None and self.process.poll() is None
+
+    def _read_loop(self):
+        reader = FrameReader()
+        while True:
+            try:
+                data, ancdata, _, _ = self.sock.recvmsg(65536, socket.CMSG_SPACE(16))
+            except OSError:
+                break
+            if not data:
+                break
+            fds = []
+            for level, kind, cdata in ancdata:
+                if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                    fds.extend(array.array("i", cdata[:len(cdata) - len(cdata) % 4]))
+            for kind, payload in reader.feed(data):
+                if kind == KIND_INPUT:
+                    request_id, records = decode_records(payload)
+                    self._dispatch({"id": request_id, "event": "records", "records": records})
+                    continue
+                if kind != KIND_JSON:
+                    continue
+                message = json.loads(payload)
+                if fds and "event" not in message:
+                    message["fds"], fds = fds, []
+                self._dispatch(message)
+            for fd in fds:
+                os.close(fd)
+        self.closed = True
+        with self._lock:
+            waiting = list(self._queues.values())
+        for events in waiting:
+            events.put({"ok": False, "closed": True, "error": "session helper exited"})
+
+    def _dispatch(self, message):
+        with self._lock:
+            events = self._queues.get(message.get("id"))
+        if events is not None:
+            events.put(message)
+        else:
+            for fd in message.get("fds", []):
+                os.close(fd)
+
+    def subscribe(self, op, events=None, **fields):
+        """
+        Sends a request and returns (request_id, queue) receiving its events and reply;
+        pass a NotifyingQueue as events to be woken through a file descriptor instead.
+        """
+        events = events if events is not None else queue.Queue()
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._queues[request_id] = events
+            if self.closed:
+                events.put({"ok": False, "closed": True, "error": "session helper is not running"})
+                return request_id, events
+            try:
+                self.sock.sendall(encode_message({"id": request_id, "op": op, **fields}))
+            except OSError as e:
+                events.put({"ok": False, "closed": True, "error": str(e)})
+        return request_id, events
+
+    def release(self, request_id):
+        with self._lock:
+            self._queues.pop(request_id, None)
+
+    def request(self, op, timeout=None, **fields):
+        """Sends a request and returns its reply, skipping any events. Raises TimeoutError."""
+        request_id, events = self.subscribe(op, **fields)
+        try:
+            while True:
+                try:
+                    message = events.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"no reply to {op}")
+                if "event" not in message:
+                    return message
+        finally:
+            self.release(request_id)
+
+    def cancel(self, request_id):
+        """Ends a streaming request (identify) without waiting for the acknowledgement."""
+        self.release(request_id)
+        if not self.closed:
+            cancel_id, _ = self.subscribe("cancel", target=request_id)
+            self.release(cancel_id)
+
+    def open_device(self, path):
+        """A read-only, non-blocking fd for an input device node, opened by the helper."""
+        reply = self.request("open", path=path)
+        if not reply.get("ok") or not reply.get("fds"):
+            raise OSError(reply.get("error") or f"could not open {path}")
+        return reply["fds"][0]
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+        self.closed = True
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+def identify_options(debounce_ms=IDENTIFY_DEBOUNCE_MS):
+    """identify request fields for telling devices apart: key events only, first activity per device."""
+    return {"types": [EV_KEY], "debounce_ms": debounce_ms}
+
+
+def update_table(table, announcement):
+    """Records a device announced as plugged in under its index in an identify ID table."""
+    if announcement.get("action") == "add":
+        index = announcement["index"]
+        table.extend([None] * (index + 1 - len(table)))
+        table[index] = announcement["persistent_id"]
+
+
+def touched_devices(records, table):
+    """persistent_ids with a key-down among records, once each, in the order they were first hit."""
+    touched = []
+    for index, event_type, code, value, timestamp in records:
+        pid = table[index] if index < len(table) else None
+        if event_type == EV_KEY and value != 0 and pid and pid not in touched:
+            touched.append(pid)
+    return touched
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(wait=True):
+    """
+    The application's helper session, started on first use or after it exited (one pkexec
+    prompt). With wait=False a new helper is only launched: requests queue up behind the
+    prompt and fail with {"closed": True} if authorization is refused.
+    """
+    global _session
+    with _session_lock:
+        if _session is None or not _session.is_alive():
+            _session = HelperSession().launch()
+            if wait:
+                try:
+                    _session.wait_ready()
+                except OSError:
+                    _session = None
+                    raise
+        return _session
+
+
+def close_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,330 @@
+import os
+import socket
+import struct
+
+from .registry import DeviceRegistry
+
+NETLINK_KOBJECT_UEVENT = 15
+# Multicast groups: 1 = raw kernel uevents, 2 = udev-processed events (carry ID_PATH etc.)
+GROUP_KERNEL = 1
+GROUP_UDEV = 2
+
+_LIBUDEV_PREFIX = b"libudev\x00"
+_LIBUDEV_MAGIC = 0xfeedcafe
+# prefix[8], magic (big-endian), header_size, properties_off, properties_len, filter hashes...
+_LIBUDEV_HEADER = struct.Struct("=8sIIII")
+
+
+def parse_uevent(data):
+    """
+    Decodes one netlink datagram into a property dict (ACTION, DEVPATH, SUBSYSTEM, ...).
+    Handles both libudev-framed messages and raw kernel "action@devpath" messages.
+    """
+    if data.startswith(_LIBUDEV_PREFIX):
+        if len(data) < _LIBUDEV_HEADER.size:
+            return None
+        _, magic, _, props_off, props_len = _LIBUDEV_HEADER.unpack_from(data, 0)
+        if socket.ntohl(magic) != _LIBUDEV_MAGIC:
+            return None
+        payload = data[props_off:props_off + props_len]
+    else:
+        head, _, payload = data.partition(b"\x00")
+        if b"@" not in head:
+            return None
+
+    event = {}
+    for field in payload.split(b"\x00"):
+        if b"=" in field:
+            key, value = field.split(b"=", 1)
+            event[key.decode("utf-8", "replace")] = value.decode("utf-8", "replace")
+    if "ACTION" not in event or "DEVPATH" not in event:
+        return None
+    return event
+
+
+class UeventMonitor:
+    """Non-blocking listener on the kernel uevent netlink socket."""
+
+    def __init__(self, group=GROUP_UDEV, rcvbuf=1024 * 1024):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC,
+                                  NETLINK_KOBJECT_UEVENT)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        except OSError:
+            pass
+        self.sock.bind((0, group))
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def receive(self):
+        """Drains every pending uevent. Returns a list of event dicts (possibly empty)."""
+        events = []
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                # ENOBUFS: the kernel dropped events; callers should fall back to a full rescan
+                events.append({"ACTION": "overflow", "DEVPATH": ""})
+                break
+            event = parse_uevent(data)
+            if event:
+                events.append(event)
+        return events
+
+    def close(self):
+        self.sock.close()
+
+
+class HotplugModel:
+    """
+    Applies uevent deltas to an existing full_scan() result in place.
+    Only the affected subtree is re-read: one USB device, one DRM card's connectors,
+    the event nodes of one input device or one sound/video device.
+    apply_events() returns a list of (action, category, item) changes where action is
+    "add", "remove" or "change" and category is "usb", "graphics", "inputs" or "av"
+    ("all" with item None after a full rescan).
+    """
+
+    def __init__(self, scanner, hardware_data):
+        self.scanner = scanner
+        self.hardware_data = hardware_data
+
+    # -- lookup helpers -------------------------------------------------
+
+    def _iter_usb(self, nodes=None, parent=None):
+        if nodes is None:
+            nodes = list(self.hardware_data.get("usb", {}).values())
+        for node in nodes:
+            yield node, parent
+            yield from self._iter_usb(node.get("children", []), node)
+
+    def _find_usb(self, dev_id):
+        for node, parent in self._iter_usb():
+            if node.get("id") == dev_id:
+                return node, parent
+        return None, None
+
+    def _find_gpu(self, syspath):
+        if isinstance(self.hardware_data, DeviceRegistry):
+            gpu = self.hardware_data.by_syspath(syspath)
+            return gpu if gpu is not None and gpu.get("type") == "gpu" else None
+        for gpu in self.hardware_data.get("graphics", []):
+            if gpu.get("syspath") == syspath:
+                return gpu
+        return None
+
+    def _all_av(self):
+        """Yields (av, container_list, owner) for standalone and GPU-trapped AV devices."""
+        for av in list(self.hardware_data.get("av", [])):
+            yield av, self.hardware_data["av"], None
+        for gpu in self.hardware_data.get("graphics", []):
+            for av in list(gpu.get("audio_video", [])):
+                yield av, gpu["audio_video"], gpu
+            for mon in gpu.get("monitors", []):
+                for av in list(mon.get("audio_video", [])):
+                    yield av, mon["audio_video"], gpu
+
+    # -- event dispatch -------------------------------------------------
+
+    def apply_events(self, events):
+        changes = []
+        touched_usb = False
+        for event in events:
+            if event.get("ACTION") == "overflow":
+                return self.rescan_all()
+
+            subsystem = event.get("SUBSYSTEM")
+            action = event.get("ACTION")
+            syspath = "/sys" + event["DEVPATH"]
+            sysname = os.path.basename(syspath)
+            self._update_udev_record(syspath, event)
+
+            if subsystem == "usb" and event.get("DEVTYPE") == "usb_device":
+                changes += self._apply_usb(action, sysname)
+                touched_usb = True
+            elif subsystem == "drm" and sysname.startswith("card"):
+                changes += self._apply_drm(action, sysname, syspath)
+            elif subsystem == "input" and sysname.startswith("event"):
+                changes += self._apply_input(action, sysname, syspath)
+                touched_usb = True
+            elif subsystem == "sound" and sysname.startswith("card"):
+                changes += self._apply_av(action, syspath, lambda: self.scanner._read_sound_card(sysname))
+                touched_usb = True
+            elif subsystem == "video4linux":
+                changes += self._apply_av(action, syspath,
+                                          lambda: self.scanner._read_video_device(sysname, self._av_by_syspath()))
+                touched_usb = True
+            if isinstance(self.hardware_data, DeviceRegistry):
+                # Later events in the batch may look up devices this one added
+                self.hardware_data.invalidate()
+
+        if touched_usb:
+            changes += self._refresh_usb_hiding()
+        return changes
+
+    def rescan_all(self):
+        """Fallback after lost events: full rescan, reported as a single ("change", "all", None)."""
+        fresh = self.scanner.full_scan()
+        for key, value in fresh.items():
+            self.hardware_data[key] = value
+        return [("change", "all", None)]
+
+    def _update_udev_record(self, syspath, event):
+        db = self.scanner.udev_db
+        if db is None:
+            return
+        if event.get("ACTION") == "remove":
+            db.records.pop(syspath, None)
+        elif "ID_PATH" in event or "ID_SERIAL" in event or "TAGS" in event:
+            tags = {t for t in event.get("TAGS", "").split(":") if t}
+            db.records[syspath] = {"properties": dict(event), "tags": tags}
+
+    def _apply_usb(self, action, dev_id):
+        usb_tree = self.hardware_data.setdefault("usb", {})
+        existing, parent = self._find_usb(dev_id)
+
+        if action == "remove":
+            if not existing:
+                return []
+            if parent:
+                parent["children"].remove(existing)
+            else:
+                usb_tree.pop(dev_id, None)
+            return [("remove", "usb", existing)]
+
+        if action not in ("add", "change", "bind"):
+            return []
+        node = self.scanner._read_usb_device(dev_id)
+        if existing:
+            node["children"] = existing.get("children", [])
+            container = parent["children"] if parent else None
+            if container is not None:
+                container[container.index(existing)] = node
+            else:
+                usb_tree[dev_id] = node
+            return [("change", "usb", node)]
+
+        parent_node, _ = self._find_usb(self.scanner.usb_parent_id(dev_id)) if not dev_id.startswith("usb") else (None, None)
+        if parent_node:
+            parent_node["children"].append(node)
+        else:
+            usb_tree[dev_id] = node
+        return [("add", "usb", node)]
+
+    def _apply_drm(self, action, sysname, syspath):
+        # Connector hotplug arrives as a "change" on the card itself (HOTPLUG=1)
+        card = sysname.split("-", 1)[0]
+        card_syspath = syspath if card == sysname else os.path.dirname(syspath)
+        gpu = self._find_gpu(card_syspath)
+        graphics = self.hardware_data.setdefault("graphics", [])
+
+        if action == "remove" and card == sysname:
+            if not gpu:
+                return []
+            graphics.remove(gpu)
+            # Audio trapped under the GPU falls back to the generic list
+            orphans = gpu.get("audio_video", []) + [av for mon in gpu.get("monitors", []) for av in mon.get("audio_video", [])]
+            self.hardware_data.setdefault("av", []).extend(orphans)
+            return [("remove", "graphics", gpu)] + [("add", "av", av) for av in orphans]
+
+        drm_items = os.listdir(self.scanner.host_path("/sys/class/drm/"))
+        if not gpu:
+            if action != "add" or card != sysname:
+                return []
+            gpu = self.scanner._read_gpu(card, drm_items)
+            graphics.append(gpu)
+            changes = [("add", "graphics", gpu)]
+            # A new GPU can claim HDMI audio functions that were listed on their own
+            for av in list(self.hardware_data.get("av", [])):
+                if self.scanner._trap_av(av, [gpu]):
+                    self.hardware_data["av"].remove(av)
+                    changes.append(("remove", "av", av))
+            return changes
+
+        trapped = gpu.get("audio_video", []) + [av for mon in gpu.get("monitors", []) for av in mon.get("audio_video", [])]
+        gpu["monitors"] = self.scanner._read_connectors(card, gpu["persistent_id"], drm_items)
+        gpu["audio_video"] = []
+        for av in trapped:
+            self.scanner._trap_av(av, [gpu])
+        return [("change", "graphics", gpu)]
+
+    def _apply_input(self, action, ev, syspath):
+        inputs = self.hardware_data.setdefault("inputs", [])
+        owner = next((inp for inp in inputs if ev in inp.get("nodes", [])), None)
+
+        if action == "remove":
+            if not owner:
+                return []
+            remaining = [n for n in owner["nodes"] if n != ev]
+            if not remaining:
+                inputs.remove(owner)
+                return [("remove", "inputs", owner)]
+            return self._replace_input(owner, remaining)
+
+        if action != "add" or owner:
+            return []
+        node = self.scanner._read_input_node(ev)
+        if not node:
+            return []
+        # Group with the logical device sharing the same physical path, if any
+        for inp in inputs:
+            nodes = inp.get("nodes", [])
+            first = self.scanner._read_input_node(nodes[0]) if nodes else None
+            if first and first["phys_path"] == node["phys_path"]:
+                return self._replace_input(inp, nodes + [ev])
+        new_items = self.scanner.scan_input_devices(event_nodes=[ev])
+        inputs.extend(new_items)
+        return [("add", "inputs", item) for item in new_items]
+
+    def _replace_input(self, owner, nodes):
+        inputs = self.hardware_data["inputs"]
+        rescanned = self.scanner.scan_input_devices(event_nodes=nodes)
+        if not rescanned:
+            inputs.remove(owner)
+            return [("remove", "inputs", owner)]
+        # Keep the same dict so UI rows and user flags (restrict_access) stay attached
+        restrict = owner.get("restrict_access")
+        owner.clear()
+        owner.update(rescanned[0])
+        if restrict:
+            owner["restrict_access"] = restrict
+        return [("change", "inputs", owner)]
+
+    def _av_by_syspath(self):
+        return {av["syspath"]: av for av, _, _ in self._all_av() if av.get("syspath")}
+
+    def _apply_av(self, action, syspath, reader):
+        existing = next(((av, container, owner) for av, container, owner in self._all_av()
+                         if av.get("syspath") == syspath), None)
+        if action == "remove":
+            if not existing:
+                return []
+            av, container, owner = existing
+            container.remove(av)
+            if owner:
+                return [("change", "graphics", owner)]
+            return [("remove", "av", av)]
+
+        if action != "add" or existing:
+            return []
+        av = reader()
+        if not av:
+            # A webcam merged into an existing sound card: report that card as changed
+            return [("change", "av", a) for a in self.hardware_data.get("av", []) if a.get("type") == "camera_mic"]
+        for gpu in self.hardware_data.get("graphics", []):
+            if self.scanner._trap_av(av, [gpu]):
+                return [("change", "graphics", gpu)]
+        self.hardware_data.setdefault("av", []).append(av)
+        return [("add", "av", av)]
+
+    def _refresh_usb_hiding(self):
+        inputs = self.hardware_data.get("inputs", [])
+        used = [inp.get("syspath", "") for inp in inputs if "syspath" in inp] + \
+               list(self._av_by_syspath().keys())
+        before = {id(node): node.get("hidden_by_input", False) for node, _ in self._iter_usb()}
+        self.scanner._hide_used_usb(self.hardware_data.get("usb", {}).values(), used)
+        return [("change", "usb", node) for node, _ in self._iter_usb()
+                if node.get("hidden_by_input", False) != before.get(id(node), False)]
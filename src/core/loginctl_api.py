@@ -2,8 +2,15 @@ import subprocess
 import re
 import os
 
+from .logind_dbus import query_seats
+from .udev_db import read_seat_assignments
+from .rules_index import get_rules_index
+
 def list_seats():
-    """Returns a list of all active seats from loginctl."""
+    """Returns a list of all active seats, from logind over D-Bus or else loginctl."""
+    seats = query_seats()
+    if seats is not None:
+        return list(seats)
     try:
         result = subprocess.run(
             ["loginctl", "list-seats", "--no-legend"], 
@@ -57,29 +64,31 @@ def get_current_assignments():
     Returns a dictionary mapping persistent syspaths to their current non-seat0 seat.
     Example: {"/sys/devices/pci0000:00/...": "seat1"}
     """
-    seats = list_seats()
-    assignments = {}
-    
-    for seat in seats:
-        if seat == "seat0":
-            continue
-            
-        status = seat_status(seat)
-        for dev in status.get("devices", []):
-            assignments[dev["syspath"]] = seat
+    # Seat membership is the ID_SEAT property udev puts on "seat"-tagged devices (loginctl
+    # seat-status reads the same data), so one sweep of the udev database answers for every
+    # seat, including devices on seats without a master device that logind does not list
+    assignments = read_seat_assignments()
+    if assignments is None:
+        assignments = {}
+        for seat in list_seats():
+            if seat == "seat0":
+                continue
+
+            status = seat_status(seat)
+            for dev in status.get("devices", []):
+                assignments[dev["syspath"]] = seat
             
-    # Also parse 70-multiseat-manager.rules to catch any statically defined mappings
-    rules_path = "/etc/udev/rules.d/70-multiseat-manager.rules"
-    if os.path.exists(rules_path):
-        import re
-        with open(rules_path, "r") as f:
-            for line in f:
-                if 'ENV{ID_SEAT}' in line and 'DEVPATH' in line:
-                    devpath_match = re.search(r'DEVPATH=="([^"]+)"', line)
-                    seat_match = re.search(r'ENV\{ID_SEAT\}=="([^"]+)"', line)
-                    if devpath_match and seat_match:
-                        syspath = "/sys" + devpath_match.group(1)
-                        if syspath not in assignments:
-                            assignments[syspath] = seat_match.group(1)
-                            
+    # Also include statically defined mappings from installed rules (ours, and the
+    # 72-seat-*.rules loginctl attach writes) that udev has not applied yet
+    for syspath, seat in get_rules_index().seat_assignments().items():
+        assignments.setdefault(syspath, seat)
+
     return assignments
+
+
+def get_live_mapping():
+    """get_current_assignments() grouped by seat: {seat: [syspath, ...]}, the shape apply_mapping() takes."""
+    live_mapping = {}
+    for syspath, seat in get_current_assignments().items():
+        live_mapping.setdefault(seat, []).append(syspath)
+    return live_mapping
@@ -0,0 +1,94 @@
+"""
+Small org.freedesktop.login1 client over D-Bus (jeepney). Everything is fetched over a
+single connection, without forking loginctl. jeepney is optional: without it, or
+without a reachable logind, query_seats() returns None and callers fall back to
+loginctl.
+"""
+try:
+    from jeepney import DBusAddress, DBusErrorResponse, Properties, new_method_call
+    from jeepney.io.blocking import open_dbus_connection
+    from jeepney.wrappers import unwrap_msg
+except ImportError:
+    open_dbus_connection = None
+
+LOGIN1_BUS_NAME = "org.freedesktop.login1"
+LOGIN1_PATH = "/org/freedesktop/login1"
+MANAGER_INTERFACE = "org.freedesktop.login1.Manager"
+SEAT_INTERFACE = "org.freedesktop.login1.Seat"
+DEFAULT_TIMEOUT = 2.0
+
+
+def _unwrap(properties):
+    """a{sv} as returned by jeepney ({name: (signature, value)}) -> {name: value}."""
+    return {name: value[1] if isinstance(value, tuple) and len(value) == 2 else value
+            for name, value in properties.items()}
+
+
+def query_seats(bus="SYSTEM", timeout=DEFAULT_TIMEOUT):
+    """
+    Returns {seat_id: {property: value}} for every seat logind knows, in ListSeats order
+    (Id, CanGraphical, CanTTY, ActiveSession, Sessions, ...), or None if logind cannot
+    be reached. bus is "SYSTEM" or a D-Bus address string (used by the tests).
+    """
+    if open_dbus_connection is None:
+        return None
+    try:
+        conn = open_dbus_connection(bus=bus)
+    except (OSError, KeyError, ValueError):
+        return None
+    try:
+        manager = DBusAddress(LOGIN1_PATH, bus_name=LOGIN1_BUS_NAME, interface=MANAGER_INTERFACE)
+        seat_list = unwrap_msg(conn.send_and_get_reply(new_method_call(manager, "ListSeats"), timeout=timeout))[0]
+        seats = {}
+        for seat_id, object_path in seat_list:
+            seat = DBusAddress(object_path, bus_name=LOGIN1_BUS_NAME, interface=SEAT_INTERFACE)
+            try:
+                properties = _unwrap(unwrap_msg(conn.send_and_get_reply(Properties(seat).get_all(), timeout=timeout))[0])
+            except DBusErrorResponse:
+                # Seat vanished between ListSeats and GetAll
+                continue
+            properties.setdefault("Id", seat_id)
+            seats[seat_id] = properties
+        return seats
+    except (DBusErrorResponse, OSError, TimeoutError, ValueError, IndexError):
+        return None
+    finally:
+        conn.close()
+
+
+class LogindManager:
+    """
+    One connection to org.freedesktop.login1.Manager for a batch of calls (AttachDevice,
+    FlushDevices). Raises OSError if jeepney or the bus is unavailable; failed calls raise
+    jeepney's DBusErrorResponse.
+    """
+
+    def __init__(self, bus="SYSTEM", timeout=DEFAULT_TIMEOUT):
+        if open_dbus_connection is None:
+            raise OSError("jeepney is not installed")
+        try:
+            self.conn = open_dbus_connection(bus=bus)
+        except (KeyError, ValueError) as e:
+            raise OSError(str(e)) from e
+        self.timeout = timeout
+        self.manager = DBusAddress(LOGIN1_PATH, bus_name=LOGIN1_BUS_NAME, interface=MANAGER_INTERFACE)
+
+    def call(self, method, signature=None, body=()):
+        msg = new_method_call(self.manager, method, signature, body)
+        return unwrap_msg(self.conn.send_and_get_reply(msg, timeout=self.timeout))
+
+    def attach_device(self, seat, sysfs_path):
+        """Same as `loginctl attach`: logind writes the 72-seat-*.rules file and retriggers the device."""
+        self.call("AttachDevice", "ssb", (seat, sysfs_path, False))
+
+    def flush_devices(self):
+        self.call("FlushDevices", "b", (False,))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,185 @@
+import os
+import mmap
+import struct
+
+PCI_IDS_PATHS = [
+    "/usr/share/hwdata/pci.ids",
+    "/usr/share/misc/pci.ids",
+    "/usr/share/pci.ids",
+]
+DEFAULT_INDEX_PATH = "~/.cache/multiseat-manager/pci.ids.idx"
+
+# Record key levels. Sorting on the packed key groups vendors, devices and subsystems.
+LEVEL_VENDOR = 0
+LEVEL_DEVICE = 1
+LEVEL_SUBSYSTEM = 2
+
+_MAGIC = b"MSPCI001"
+_HEADER = struct.Struct("<8sQQI")   # magic, source mtime_ns, source size, record count
+_KEY = struct.Struct(">BHHHH")      # level, vendor, device, subvendor, subdevice (big-endian sorts bytewise)
+_RECORD = struct.Struct("<9sxIH")   # key, pad, string offset, string length (16 bytes)
+
+
+def read_pci_sysfs_ids(pci_addr, sys_root="/sys"):
+    """
+    Reads vendor/device/subsystem/class IDs for a PCI function from sysfs.
+    Returns a dict of integers, or None if the device does not exist.
+    """
+    dev_dir = os.path.join(sys_root, "bus", "pci", "devices", pci_addr)
+    ids = {}
+    for attr in ("vendor", "device", "subsystem_vendor", "subsystem_device", "class"):
+        try:
+            with open(os.path.join(dev_dir, attr), "r") as f:
+                ids[attr] = int(f.read().strip(), 16)
+        except (OSError, ValueError):
+            ids[attr] = None
+    if ids["vendor"] is None or ids["device"] is None:
+        return None
+    return ids
+
+
+def find_pci_ids_file(root="/"):
+    for path in PCI_IDS_PATHS:
+        host_path = os.path.join(root, path.lstrip("/"))
+        if os.path.exists(host_path):
+            return host_path
+    return None
+
+
+class PciIdsIndex:
+    """
+    Binary-searchable index over the system pci.ids database.
+    The index is built from the text file on first use and cached on disk, then
+    memory-mapped on later runs. It is rebuilt whenever pci.ids changes.
+    """
+
+    def __init__(self, buf=None, count=0, strings_offset=0):
+        self._buf = buf
+        self._count = count
+        self._strings_offset = strings_offset
+
+    @classmethod
+    def open(cls, ids_path=None, index_path=None):
+        ids_path = ids_path or find_pci_ids_file()
+        if not ids_path:
+            return cls()
+        index_path = os.path.expanduser(index_path or DEFAULT_INDEX_PATH)
+
+        try:
+            st = os.stat(ids_path)
+        except OSError:
+            return cls()
+
+        index = cls._open_cached(index_path, st)
+        if index is not None:
+            return index
+
+        data = cls.build(ids_path, st)
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            tmp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, index_path)
+        except OSError:
+            # Read-only cache dir: keep the freshly built index in memory only
+            pass
+        return cls._from_buffer(data)
+
+    @classmethod
+    def _open_cached(cls, index_path, st):
+        try:
+            with open(index_path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(buf) < _HEADER.size:
+            buf.close()
+            return None
+        magic, mtime_ns, size, _ = _HEADER.unpack_from(buf, 0)
+        if magic != _MAGIC or mtime_ns != st.st_mtime_ns or size != st.st_size:
+            buf.close()
+            return None
+        return cls._from_buffer(buf)
+
+    @classmethod
+    def _from_buffer(cls, buf):
+        _, _, _, count = _HEADER.unpack_from(buf, 0)
+        return cls(buf, count, _HEADER.size + count * _RECORD.size)
+
+    @staticmethod
+    def parse(ids_path):
+        """Yields (key_bytes, name) for every vendor, device and subsystem entry in pci.ids."""
+        vendor = device = None
+        with open(ids_path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                # The device class section at the end of the file uses a different grammar
+                if line.startswith("C "):
+                    break
+                try:
+                    if line.startswith("\t\t"):
+                        if vendor is None or device is None:
+                            continue
+                        subvendor, subdevice, name = line.strip().split(None, 2)
+                        yield _KEY.pack(LEVEL_SUBSYSTEM, vendor, device, int(subvendor, 16), int(subdevice, 16)), name
+                    elif line.startswith("\t"):
+                        if vendor is None:
+                            continue
+                        dev_id, name = line.strip().split(None, 1)
+                        device = int(dev_id, 16)
+                        yield _KEY.pack(LEVEL_DEVICE, vendor, device, 0, 0), name
+                    else:
+                        vendor_id, name = line.strip().split(None, 1)
+                        vendor = int(vendor_id, 16)
+                        device = None
+                        yield _KEY.pack(LEVEL_VENDOR, vendor, 0, 0, 0), name
+                except ValueError:
+                    continue
+
+    @classmethod
+    def build(cls, ids_path, st=None):
+        """Serializes pci.ids into the sorted fixed-width record format."""
+        st = st or os.stat(ids_path)
+        entries = sorted(dict(cls.parse(ids_path)).items())
+
+        strings = bytearray()
+        records = bytearray()
+        for key, name in entries:
+            encoded = name.encode("utf-8")[:0xFFFF]
+            records += _RECORD.pack(key, len(strings), len(encoded))
+            strings += encoded
+
+        header = _HEADER.pack(_MAGIC, st.st_mtime_ns, st.st_size, len(entries))
+        return bytes(header) + bytes(records) + bytes(strings)
+
+    def _find(self, key):
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = _HEADER.size + mid * _RECORD.size
+            mid_key = self._buf[offset:offset + _KEY.size]
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid
+            else:
+                _, str_off, str_len = _RECORD.unpack_from(self._buf, offset)
+                start = self._strings_offset + str_off
+                return self._buf[start:start + str_len].decode("utf-8", errors="replace")
+        return None
+
+    def lookup(self, vendor, device, subvendor=None, subdevice=None):
+        """Returns (vendor_name, device_name, subsystem_name); unknown parts are None."""
+        if not self._count:
+            return None, None, None
+        vendor_name = self._find(_KEY.pack(LEVEL_VENDOR, vendor, 0, 0, 0))
+        device_name = self._find(_KEY.pack(LEVEL_DEVICE, vendor, device, 0, 0))
+        subsystem_name = None
+        if subvendor is not None and subdevice is not None:
+            subsystem_name = self._find(_KEY.pack(LEVEL_SUBSYSTEM, vendor, device, subvendor, subdevice))
+        return vendor_name, device_name, subsystem_name
+
+    def __len__(self):
+        return self._count
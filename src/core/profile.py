@@ -0,0 +1,111 @@
+from .registry import DeviceRecord, IdentifierMatcher
+
+# Row types that become udev rules / attach commands, as in the advanced UI's seat trees
+STAGED_TYPES = ("gpu", "usb_hub", "usb_child", "input", "av")
+
+
+def identifier_string(ident):
+    """The matchable string of a profile entry: dicts from wizard/load, device records or plain strings."""
+    if isinstance(ident, DeviceRecord):
+        return ident.get("persistent_id") or ident.get("syspath")
+    if isinstance(ident, dict):
+        return ident.get("id") or ident.get("persistent_id") or ident.get("syspath")
+    if isinstance(ident, str):
+        return ident
+    return None
+
+
+def build_seat_matcher(seat_identifiers):
+    """seat_identifiers: [identifiers, ...] in seat order. Hits are (seat_index, identifier)."""
+    return IdentifierMatcher((identifier_string(ident), (seat_index, ident))
+                             for seat_index, identifiers in enumerate(seat_identifiers)
+                             for ident in identifiers)
+
+
+def plan_moves(groups, matcher, seat_count, children_of, hw_of):
+    """
+    Decides which seat0 rows each seat claims. Returns one [(parent, row, identifier), ...]
+    list per seat. Seats are processed as if one after another: a later seat never sees
+    what an earlier seat already took, and earlier seats still search inside rows a later
+    seat takes. Works on Qt tree items and on the headless rows below alike.
+    """
+    moves = [[] for _ in range(seat_count)]
+
+    def walk(parent, seat_limit):
+        for row in children_of(parent):
+            hw = hw_of(row) or {}
+            hit = matcher.match(hw.get("persistent_id"), hw.get("syspath"), hw.get("pci_syspath"))
+            if hit is not None and hit[0] < seat_limit:
+                seat_index, ident = hit
+                moves[seat_index].append((parent, row, ident))
+                if seat_index:
+                    walk(row, seat_index)
+            else:
+                walk(row, seat_limit)
+
+    for group in groups:
+        walk(group, seat_count)
+    return moves
+
+
+class _Row:
+    __slots__ = ("type", "hw", "children")
+
+    def __init__(self, row_type, hw, children=None):
+        self.type = row_type
+        self.hw = hw
+        self.children = children if children is not None else []
+
+
+def _usb_row(node, row_type):
+    children = [_usb_row(child, "usb_child") for child in node.get("children", []) if not child.get("hidden_by_input")]
+    return _Row(row_type, node, children)
+
+
+def build_rows(hardware_data):
+    """Headless equivalent of a freshly populated seat0 tree: graphics, inputs, AV and USB groups."""
+    graphics = []
+    for gpu in hardware_data.get("graphics", []):
+        monitors = [_Row("monitor", mon, [_Row("audio", av) for av in mon.get("audio_video", [])])
+                    for mon in gpu.get("monitors", [])]
+        graphics.append(_Row("gpu", gpu, monitors + [_Row("audio", av) for av in gpu.get("audio_video", [])]))
+    inputs = [_Row("input", inp) for inp in hardware_data.get("inputs", []) if "error" not in inp]
+    av = [_Row("av", item) for item in hardware_data.get("av", [])]
+    usb = [_usb_row(node, "usb_hub") for node in hardware_data.get("usb", {}).values() if not node.get("hidden_by_input")]
+    return [_Row(None, None, graphics), _Row(None, None, inputs), _Row(None, None, av), _Row(None, None, usb)]
+
+
+def _staged(rows, out):
+    for row in rows:
+        if row.type in STAGED_TYPES:
+            out.append(row.hw)
+        _staged(row.children, out)
+    return out
+
+
+def resolve_profile(hardware_data, mapping):
+    """
+    Resolves a profile ({seat: [identifiers]}) against a scan without a UI, with the same
+    matching rules as AdvancedSetupWindow.apply_mapping. Returns the staging map
+    {"seat0": [...], "seat1": [...]} that the advanced window would hand to
+    ConfigExecutor.generate_staging, with restrict_access flags from the profile applied.
+    """
+    seats = [seat for seat in mapping if seat not in ("seat0", "seat_count")]
+    groups = build_rows(hardware_data)
+    matcher = build_seat_matcher([mapping[seat] for seat in seats])
+    moves = plan_moves(groups, matcher, len(seats), lambda row: list(row.children), lambda row: row.hw)
+
+    # Moved rows land in the target seat's groups the way AdvancedSetupWindow.apply_mapping files them
+    seat_groups = {seat: {"gpu": [], "input": [], "av": [], "usb_hub": []} for seat in seats}
+    for seat, seat_moves in zip(seats, moves):
+        for parent, row, ident in seat_moves:
+            parent.children.remove(row)
+            seat_groups[seat].get(row.type, seat_groups[seat]["input"]).append(row)
+            if isinstance(ident, (dict, DeviceRecord)) and ident.get("restrict_access"):
+                row.hw["restrict_access"] = True
+
+    staging_map = {"seat0": _staged(groups, [])}
+    for seat in seats:
+        buckets = seat_groups[seat]
+        staging_map[seat] = _staged(buckets["gpu"] + buckets["input"] + buckets["av"] + buckets["usb_hub"], [])
+    return staging_map
@@ -0,0 +1,348 @@
+import bisect
+
+
+class DeviceRecord:
+    """
+    Slotted hardware record with a dict-compatible interface (get, [], in, keys, ...),
+    so scanner, hotplug, executor and UI code can keep treating devices as mappings
+    while sharing one object per device. Unset fields behave like missing keys;
+    keys outside FIELDS go to a small overflow dict.
+    """
+    FIELDS = ()
+    _field_set = frozenset()
+    __slots__ = ("_extra",)
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        try:
+            return self._extra[key]
+        except (AttributeError, KeyError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            setattr(self, key, value)
+            return
+        try:
+            self._extra[key] = value
+        except AttributeError:
+            self._extra = {key: value}
+
+    def __delitem__(self, key):
+        if key in self._field_set:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        try:
+            del self._extra[key]
+        except (AttributeError, KeyError):
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def keys(self):
+        keys = [key for key in self.FIELDS if hasattr(self, key)]
+        keys.extend(getattr(self, "_extra", {}).keys())
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    _MISSING = object()
+
+    def pop(self, key, default=_MISSING):
+        try:
+            value = self[key]
+        except KeyError:
+            if default is DeviceRecord._MISSING:
+                raise
+            return default
+        del self[key]
+        return value
+
+    def update(self, other=(), **fields):
+        items = other.items() if hasattr(other, "items") else other
+        for key, value in items:
+            self[key] = value
+        for key, value in fields.items():
+            self[key] = value
+
+    def clear(self):
+        for key in self.keys():
+            del self[key]
+
+    def to_dict(self):
+        return {key: to_plain(value) for key, value in self.items()}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class UsbDevice(DeviceRecord):
+    FIELDS = ("id", "syspath", "persistent_id", "name", "is_hub", "type", "children", "hidden_by_input")
+    __slots__ = FIELDS
+
+
+class GpuDevice(DeviceRecord):
+    FIELDS = ("syspath", "pci_syspath", "persistent_id", "name", "type", "monitors", "audio_video")
+    __slots__ = FIELDS
+
+
+class MonitorDevice(DeviceRecord):
+    FIELDS = ("syspath", "persistent_id", "name", "type", "connector", "audio_video")
+    __slots__ = FIELDS
+
+
+class InputDevice(DeviceRecord):
+    FIELDS = ("syspath", "persistent_id", "name", "type", "nodes", "restrict_access", "error")
+    __slots__ = FIELDS
+
+
+class AvDevice(DeviceRecord):
+    FIELDS = ("syspath", "persistent_id", "name", "type", "eld_monitors", "children")
+    __slots__ = FIELDS
+
+
+RECORD_TYPES = {
+    "usb": UsbDevice,
+    "gpu": GpuDevice,
+    "graphics": GpuDevice,
+    "monitor": MonitorDevice,
+    "input": InputDevice,
+    "audio": AvDevice,
+    "camera": AvDevice,
+    "camera_mic": AvDevice,
+}
+# Nested lists that hold further device records
+_CHILD_LISTS = ("children", "monitors", "audio_video")
+
+
+def to_plain(value):
+    """Converts records (and containers of them) back to plain dicts/lists for JSON."""
+    if isinstance(value, (DeviceRecord, dict)):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    return value
+
+
+def make_record(data, default_type=None):
+    """Builds the matching DeviceRecord (recursively) from a plain scan dict."""
+    if isinstance(data, DeviceRecord):
+        return data
+    cls = RECORD_TYPES.get(data.get("type")) or RECORD_TYPES.get(default_type, AvDevice)
+    record = cls()
+    for key, value in data.items():
+        if key in _CHILD_LISTS and isinstance(value, list):
+            value = [make_record(item) if isinstance(item, dict) else item for item in value]
+        record[key] = value
+    return record
+
+
+class DeviceRegistry(dict):
+    """
+    The shared hardware model: the familiar {"usb", "graphics", "inputs", "av"} mapping
+    of records, plus lazily built indexes by persistent_id, syspath and PCI device.
+    Code that mutates the nested lists in place (hotplug) calls invalidate() afterwards.
+    """
+
+    def __init__(self, usb=None, graphics=None, inputs=None, av=None):
+        super().__init__(usb=usb if usb is not None else {}, graphics=graphics or [],
+                         inputs=inputs or [], av=av or [])
+        self._index = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Wraps a plain full_scan()/cache dict, converting its devices to records."""
+        if isinstance(data, cls):
+            return data
+        return cls(
+            usb={key: make_record(node, "usb") for key, node in data.get("usb", {}).items()},
+            graphics=[make_record(gpu, "gpu") for gpu in data.get("graphics", [])],
+            inputs=[make_record(inp, "input") for inp in data.get("inputs", [])],
+            av=[make_record(av, "audio") for av in data.get("av", [])],
+        )
+
+    def to_dict(self):
+        return {key: to_plain(value) for key, value in self.items()}
+
+    # -- mutation tracking ----------------------------------------------
+
+    def invalidate(self):
+        self._index = None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._index = None
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._index = None
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._index = None
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._index = None
+
+    def clear(self):
+        super().clear()
+        self._index = None
+
+    # -- lookups ----------------------------------------------------------
+
+    def iter_devices(self):
+        """Yields every record once: USB nodes, GPUs, monitors, inputs and AV devices wherever they are nested."""
+        stack = list(self.get("usb", {}).values())
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(node.get("children", []))
+        for gpu in self.get("graphics", []):
+            yield gpu
+            yield from gpu.get("audio_video", [])
+            for mon in gpu.get("monitors", []):
+                yield mon
+                yield from mon.get("audio_video", [])
+        yield from self.get("inputs", [])
+        for av in self.get("av", []):
+            yield av
+            yield from av.get("children", [])
+
+    def _ensure_index(self):
+        if self._index is None:
+            by_pid, by_syspath, by_pci = {}, {}, {}
+            for device in self.iter_devices():
+                if device.get("persistent_id"):
+                    by_pid.setdefault(device["persistent_id"], device)
+                if device.get("syspath"):
+                    by_syspath.setdefault(device["syspath"], device)
+                if device.get("pci_syspath"):
+                    by_pci.setdefault(device["pci_syspath"], device)
+            self._index = (by_pid, by_syspath, by_pci)
+        return self._index
+
+    def by_persistent_id(self, persistent_id):
+        return self._ensure_index()[0].get(persistent_id)
+
+    def by_syspath(self, syspath):
+        return self._ensure_index()[1].get(syspath)
+
+    def by_pci_device(self, pci_device):
+        """The GPU at a function-less PCI address such as "0000:07:00"."""
+        return self._ensure_index()[2].get(pci_device)
+
+    def lookup(self, identifier):
+        """Resolves a saved-profile identifier (persistent_id, syspath or PCI device) to its record."""
+        by_pid, by_syspath, by_pci = self._ensure_index()
+        return by_pid.get(identifier) or by_syspath.get(identifier) or by_pci.get(identifier)
+
+
+class IdentifierMatcher:
+    """
+    Answers AdvancedSetupWindow.apply_mapping's matching rules without comparing every
+    tree row against every identifier. A row matches an identifier if its persistent_id,
+    syspath or pci_syspath equals it, either string is a prefix of the other (syspath,
+    pci_syspath) or a suffix of the other (persistent_id). entries are
+    (identifier_string, payload) pairs in priority order; the earliest match wins, as in
+    the original linear scan.
+    """
+
+    def __init__(self, entries):
+        self._first = {}
+        for text, payload in entries:
+            if text and text not in self._first:
+                self._first[text] = (len(self._first), payload)
+        self._sorted = sorted(self._first)
+        self._reversed = sorted(text[::-1] for text in self._first)
+        self._lengths = sorted({len(text) for text in self._first})
+
+    def _starting_with(self, prefix, sorted_texts, reverse=False):
+        """Identifiers that start with prefix (or end with it when reverse=True)."""
+        pos = bisect.bisect_left(sorted_texts, prefix)
+        while pos < len(sorted_texts) and sorted_texts[pos].startswith(prefix):
+            text = sorted_texts[pos]
+            yield self._first[text[::-1] if reverse else text]
+            pos += 1
+
+    def _prefixes_of(self, value):
+        """Identifiers that are a prefix of value."""
+        for length in self._lengths:
+            if length > len(value):
+                break
+            hit = self._first.get(value[:length])
+            if hit:
+                yield hit
+
+    def _suffixes_of(self, value):
+        """Identifiers that are a suffix of value."""
+        for length in self._lengths:
+            if length > len(value):
+                break
+            hit = self._first.get(value[len(value) - length:])
+            if hit:
+                yield hit
+
+    def match(self, persistent_id, syspath, pci_syspath):
+        """Returns the payload of the earliest matching identifier, or None."""
+        candidates = []
+        for value in (persistent_id, syspath, pci_syspath):
+            if value and value in self._first:
+                candidates.append(self._first[value])
+        for value in (syspath, pci_syspath):
+            if value:
+                candidates.extend(self._starting_with(value, self._sorted))
+                candidates.extend(self._prefixes_of(value))
+        if persistent_id:
+            candidates.extend(self._suffixes_of(persistent_id))
+            candidates.extend(self._starting_with(persistent_id[::-1], self._reversed, reverse=True))
+        if not candidates:
+            return None
+        return min(candidates, key=lambda hit: hit[0])[1]
+
+    def __len__(self):
+        return len(self._first)
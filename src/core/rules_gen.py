@@ -0,0 +1,118 @@
+"""
+Seat rules in the compact layout this tool installs. Two guards send every remove event
+and every device without the "seat" tag straight to the end label, then each
+(seat, access mode) pair gets one rule whose DEVPATH alternatives cover all of its
+devices and which jumps to the end as soon as it matches. Devices of one seat below the
+same USB hub or PCI function, with nothing of another seat there, collapse into a
+single "<parent>/*" prefix.
+"""
+import re
+
+END_LABEL = "multiseat_manager_end"
+# USB devices/hubs ("1-2.3", root hubs "usb1") and PCI functions ("0000:00:14.0")
+_COLLAPSIBLE_RE = re.compile(r"^(?:usb\d+|\d+-[\d.]+|[0-9a-f]{4}:[0-9a-f]{2}:[0-9a-f]{2}\.[0-7])$")
+
+
+def devpath_of(target_path):
+    """DEVPATH (sysfs path without /sys) of a staging target path."""
+    devpath = target_path[4:] if target_path.startswith("/sys") else target_path
+    return devpath if devpath.startswith("/") else "/" + devpath
+
+
+def _with_children(hw):
+    # A GPU's DRM, framebuffer and sound children follow it onto the seat
+    return hw.get("type") in ("graphics", "gpu") and bool(hw.get("pci_syspath"))
+
+
+def _collapse_parents(devpath):
+    """USB devices/hubs and PCI functions strictly above devpath, nearest first."""
+    parts = devpath.split("/")
+    # parts[:2] is "/devices"; parts[:k] for k < len(parts) are the ancestors
+    return ["/".join(parts[:k]) for k in range(len(parts) - 1, 2, -1) if _COLLAPSIBLE_RE.match(parts[k - 1])]
+
+
+def collapse(paths, shared):
+    """
+    paths: {devpath: covers_children} for one group; shared(parent) is true when a device
+    of another group lies below parent. Repeatedly replaces the entries below the lowest
+    hub or PCI function that holds two or more of them (and is not shared) with that
+    parent's children.
+    """
+    paths = dict(paths)
+    while True:
+        members = {}
+        for devpath in paths:
+            for parent in _collapse_parents(devpath.rstrip("/")):
+                members.setdefault(parent, []).append(devpath)
+        candidates = [parent for parent, below in members.items() if len(below) >= 2 and not shared(parent)]
+        lowest = [parent for parent in candidates
+                  if not any(other.startswith(parent + "/") for other in candidates)]
+        if not lowest:
+            return paths
+        for parent in lowest:
+            for devpath in members[parent]:
+                del paths[devpath]
+            # The parent itself stays where it is: only its children join the seat
+            paths[parent + "/"] = True
+
+
+def _patterns(paths):
+    patterns = []
+    for devpath, children in sorted(paths.items()):
+        if devpath.endswith("/"):
+            patterns.append(devpath + "*")
+        else:
+            patterns.append(devpath)
+            if children:
+                patterns.append(devpath + "/*")
+    return patterns
+
+
+def generate_rules(desired):
+    """
+    desired: [(target_path, seat, mode, hw)] for every device in the layout, seat0 included.
+    Returns the lines of the rules file (empty when every device stays on seat0).
+    """
+    groups = {}
+    owners = {}  # hub/PCI function -> the (seat, mode) groups with a device below it
+    for target_path, seat, mode, hw in desired:
+        devpath = devpath_of(target_path)
+        if seat != "seat0":
+            groups.setdefault((seat, mode), []).append((devpath, hw))
+        for parent in _collapse_parents(devpath):
+            owners.setdefault(parent, set()).add((seat, mode) if seat != "seat0" else ("seat0", None))
+    if not groups:
+        return []
+
+    lines = [
+        "# Generated by Multiseat Manager: seat assignments",
+        f'ACTION=="remove", GOTO="{END_LABEL}"',
+        f'TAG!="seat", GOTO="{END_LABEL}"',
+    ]
+    for (seat, mode), members in sorted(groups.items(), key=lambda item: (item[0][0], item[0][1] or "")):
+        paths = collapse({devpath: _with_children(hw) for devpath, hw in members},
+                         lambda parent: len(owners.get(parent, ())) > 1)
+        names = ", ".join(hw.get("name", "Unknown Device") for _, hw in members)
+        mode_str = f', MODE="{mode}"' if mode else ""
+        lines.append("")
+        lines.append(f"# {seat}{' (restricted access)' if mode else ''}: {names}")
+        lines.append(f'DEVPATH=="{"|".join(_patterns(paths))}", ENV{{ID_SEAT}}="{seat}"{mode_str}, GOTO="{END_LABEL}"')
+    lines.append("")
+    lines.append(f'LABEL="{END_LABEL}"')
+    return lines
+
+
+def per_device_rules(desired):
+    """The one-rule-per-device layout older versions installed, kept for benchmarks/rules.py."""
+    lines = []
+    for target_path, seat, mode, hw in desired:
+        if seat == "seat0":
+            continue
+        devpath = devpath_of(target_path)
+        mode_str = f', MODE="{mode}"' if mode else ""
+        lines.append(f"# {hw.get('name', 'Unknown Device')}")
+        lines.append(f'TAG=="seat", DEVPATH=="{devpath}", ENV{{ID_SEAT}}="{seat}"{mode_str}')
+        if _with_children(hw):
+            for subsystem in ("drm", "graphics", "sound"):
+                lines.append(f'TAG=="seat", DEVPATH=="{devpath}/*", SUBSYSTEM=="{subsystem}", ENV{{ID_SEAT}}="{seat}"')
+    return lines
@@ -0,0 +1,265 @@
+import os
+import re
+
+# udev reads rules from these directories; a file name in an earlier directory masks the
+# same name in later ones, and the surviving files are processed in lexical order.
+RULES_DIRS = [
+    "/etc/udev/rules.d",
+    "/run/udev/rules.d",
+    "/usr/local/lib/udev/rules.d",
+    "/usr/lib/udev/rules.d",
+    "/lib/udev/rules.d",
+]
+
+# KEY{attr}<op>"value" pairs of a rule line
+_PAIR_RE = re.compile(r'([A-Z_]+(?:\{[^}]*\})?)\s*(==|!=|\+=|-=|:=|=)\s*"((?:[^"\\]|\\.)*)"')
+_GLOB_CHARS = set("*?[")
+_PATH_TAG_RE = re.compile(r"[^A-Za-z0-9-]")
+
+
+def path_tag(id_path):
+    """udev's ID_PATH_TAG for an ID_PATH ("pci-0000:00:14.0-usb-0:2" -> "pci-0000_00_14_0-usb-0_2")."""
+    return _PATH_TAG_RE.sub("_", id_path)
+
+
+class SeatRule:
+    """One rule line that sets ENV{ID_SEAT}, reduced to what it matches on."""
+    __slots__ = ("file", "line", "seat", "devpath", "id_path", "id_for_seat", "subsystem", "mode")
+
+    def __init__(self, file, line, seat, devpath=None, id_path=None, id_for_seat=None, subsystem=None, mode=None):
+        self.file = file
+        self.line = line
+        self.seat = seat
+        self.devpath = devpath
+        self.id_path = id_path
+        self.id_for_seat = id_for_seat
+        self.subsystem = subsystem
+        self.mode = mode
+
+    @property
+    def patterns(self):
+        """The DEVPATH match split into its "|" alternatives."""
+        return self.devpath.split("|") if self.devpath else []
+
+    @property
+    def syspath(self):
+        """Canonical /sys path of a single literal DEVPATH match, or None for globs, alternatives and non-DEVPATH rules."""
+        if not self.devpath or (_GLOB_CHARS | {"|"}) & set(self.devpath):
+            return None
+        return "/sys" + self.devpath
+
+    def __repr__(self):
+        return f"SeatRule({self.seat!r}, {self.file}:{self.line})"
+
+
+def parse_rule_line(line):
+    """Returns a SeatRule (without file/line) if the rule assigns ID_SEAT, else None."""
+    if "ID_SEAT" not in line:
+        return None
+    seat = None
+    fields = {}
+    for key, op, value in _PAIR_RE.findall(line):
+        if key == "ENV{ID_SEAT}":
+            # Older versions of this tool wrote ID_SEAT== in their rules; treat it as an assignment
+            if op in ("=", ":=", "=="):
+                seat = value
+        elif op == "==":
+            fields[key] = value
+        elif key == "MODE" and op in ("=", ":="):
+            fields["MODE"] = value
+    if not seat:
+        return None
+    return SeatRule(None, None, seat,
+                    devpath=fields.get("DEVPATH"),
+                    id_path=fields.get("ENV{ID_PATH}"),
+                    id_for_seat=fields.get("ENV{ID_FOR_SEAT}"),
+                    subsystem=fields.get("SUBSYSTEM"),
+                    mode=fields.get("MODE"))
+
+
+def parse_rules_file(path):
+    """All SeatRules in a rules file, honouring backslash line continuations."""
+    rules = []
+    try:
+        with open(path, "r", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+    pending = ""
+    start = 0
+    for number, raw in enumerate(lines, 1):
+        if not pending:
+            start = number
+        if raw.endswith("\\"):
+            pending += raw[:-1]
+            continue
+        text = (pending + raw).strip()
+        pending = ""
+        if not text or text.startswith("#"):
+            continue
+        rule = parse_rule_line(text)
+        if rule:
+            rule.file = path
+            rule.line = start
+            rules.append(rule)
+    return rules
+
+
+class RulesIndex:
+    """
+    Every installed rule that assigns a seat (this tool's 70-multiseat-manager.rules, the
+    72-seat-*.rules files `loginctl attach` writes, distribution rules), parsed once and
+    re-read per file only when its mtime changes. Lookups by DEVPATH, ID_PATH and
+    ID_FOR_SEAT are dict hits; where several rules match, the one udev applies last wins.
+    ID_FOR_SEAT is "<subsystem>-<ID_PATH_TAG>", so those rules are also found from an ID_PATH.
+    DEVPATH alternatives are indexed one by one, and "<parent>/*" prefixes are found by
+    walking up from the device.
+    """
+
+    def __init__(self, dirs=None, root="/"):
+        self.root = os.path.abspath(root)
+        self.dirs = dirs or RULES_DIRS
+        self._files = {}  # host path -> (mtime_ns, size, [SeatRule])
+        self._order = None
+        self._by_syspath = {}
+        self._by_prefix = {}
+        self._by_id_path = {}
+        self._by_id_for_seat = {}
+        self._by_path_tag = {}
+
+    def _host(self, path):
+        return path if self.root == "/" else os.path.join(self.root, path.lstrip("/"))
+
+    def active_files(self):
+        """Host paths of the rules files udev would read, after masking, in processing order."""
+        active = {}
+        for directory in self.dirs:
+            host_dir = self._host(directory)
+            try:
+                names = os.listdir(host_dir)
+            except OSError:
+                continue
+            for name in names:
+                if name.endswith(".rules") and name not in active:
+                    active[name] = os.path.join(host_dir, name)
+        return [active[name] for name in sorted(active)]
+
+    def refresh(self):
+        """Re-stats the rules files and rebuilds the lookups if any were added, removed or changed."""
+        order = []
+        changed = False
+        seen = set()
+        for path in self.active_files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            seen.add(path)
+            order.append(path)
+            cached = self._files.get(path)
+            if cached is None or cached[0] != st.st_mtime_ns or cached[1] != st.st_size:
+                self._files[path] = (st.st_mtime_ns, st.st_size, parse_rules_file(path))
+                changed = True
+        for path in list(self._files):
+            if path not in seen:
+                del self._files[path]
+                changed = True
+        if changed or order != self._order:
+            self._order = order
+            self._rebuild()
+        return self
+
+    def _rebuild(self):
+        # Every key maps to all rules matching on it, in processing order; udev applies the last
+        self._by_syspath, self._by_prefix = {}, {}
+        self._by_id_path, self._by_id_for_seat, self._by_path_tag = {}, {}, {}
+        for path in self._order:
+            for rule in self._files[path][2]:
+                for pattern in rule.patterns:
+                    if not _GLOB_CHARS & set(pattern):
+                        self._by_syspath.setdefault("/sys" + pattern, []).append(rule)
+                    elif pattern.endswith("/*") and not _GLOB_CHARS & set(pattern[:-2]):
+                        self._by_prefix.setdefault("/sys" + pattern[:-2], []).append(rule)
+                if rule.id_path:
+                    self._by_id_path.setdefault(rule.id_path, []).append(rule)
+                if rule.id_for_seat:
+                    self._by_id_for_seat.setdefault(rule.id_for_seat, []).append(rule)
+                    self._by_path_tag.setdefault(rule.id_for_seat.partition("-")[2], []).append(rule)
+
+    def read_active(self, name):
+        """Lines of the rules file udev uses under this name (after masking), or None if there is none."""
+        for path in self.active_files():
+            if os.path.basename(path) == name:
+                try:
+                    with open(path, "r", errors="replace") as f:
+                        return f.read().splitlines()
+                except OSError:
+                    return None
+        return None
+
+    def rules(self):
+        """Every indexed SeatRule in processing order."""
+        return [rule for path in self._order or [] for rule in self._files[path][2]]
+
+    def _candidates(self, syspath=None, id_path=None, id_for_seat=None):
+        """Lists of matching rules, most specific key first: DEVPATH, "<parent>/*" prefixes, ID_PATH, ID_FOR_SEAT."""
+        if syspath:
+            yield self._by_syspath.get(syspath)
+            if self._by_prefix:
+                parent = os.path.dirname(syspath)
+                while len(parent) > len("/sys"):
+                    yield self._by_prefix.get(parent)
+                    parent = os.path.dirname(parent)
+        if id_path:
+            yield self._by_id_path.get(id_path)
+            yield self._by_path_tag.get(path_tag(id_path))
+        if id_for_seat:
+            yield self._by_id_for_seat.get(id_for_seat)
+
+    def lookup(self, syspath=None, id_path=None, id_for_seat=None):
+        """The rule that assigns a device a seat, or None."""
+        for rules in self._candidates(syspath, id_path, id_for_seat):
+            if rules:
+                return rules[-1]
+        return None
+
+    def lookup_all(self, syspath=None, id_path=None, id_for_seat=None):
+        """Every rule that matches a device, whichever file it is in, in processing order."""
+        return self._in_order(rule for rules in self._candidates(syspath, id_path, id_for_seat) for rule in rules or ())
+
+    def _in_order(self, rules):
+        """Distinct rules sorted the way udev processes them."""
+        order = {path: i for i, path in enumerate(self._order or [])}
+        distinct = {id(rule): rule for rule in rules}
+        return sorted(distinct.values(), key=lambda rule: (order.get(rule.file, -1), rule.line or 0))
+
+    @staticmethod
+    def _hw_keys(hw_data, target_path):
+        persistent_id = hw_data.get("persistent_id") or ""
+        id_path = persistent_id[5:] if persistent_id.startswith("path:") else None
+        return (target_path, id_path), (hw_data.get("syspath"),)
+
+    def lookup_hw(self, hw_data, target_path=None):
+        """lookup() for a scanned device: its staging target path, syspath, or "path:" persistent_id."""
+        first, second = self._hw_keys(hw_data, target_path)
+        return self.lookup(*first) or self.lookup(*second)
+
+    def lookup_hw_all(self, hw_data, target_path=None):
+        """lookup_all() for a scanned device, with the same keys as lookup_hw()."""
+        first, second = self._hw_keys(hw_data, target_path)
+        return self._in_order(self.lookup_all(*first) + self.lookup_all(*second))
+
+    def seat_assignments(self):
+        """{syspath: seat} for rules with a literal DEVPATH match and a non-seat0 seat."""
+        return {syspath: rules[-1].seat for syspath, rules in self._by_syspath.items() if rules[-1].seat != "seat0"}
+
+
+_shared_index = None
+
+
+def get_rules_index():
+    """Process-wide RulesIndex over the host's rules directories, refreshed (stat only) on each call."""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = RulesIndex()
+    return _shared_index.refresh()
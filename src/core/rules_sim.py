@@ -0,0 +1,342 @@
+"""
+Offline udev rule simulator: replays the seat-relevant part of the installed rules, with
+this tool's rules file replaced by a staged one, against a udev database snapshot and
+predicts the seat each device lands on, without triggering anything.
+
+Understood: ACTION, DEVPATH, KERNEL, SUBSYSTEM, TAG and ENV{} matches with "|" alternatives
+and globs; ENV{}, TAG and MODE assignments with $env{}/%E{}, $kernel/%k and $devpath/%p;
+GOTO/LABEL; IMPORT{parent}. A rule that matches on anything else (ATTRS, PROGRAM, ...)
+never matches. Files that assign neither a seat nor tags are skipped. Tags start out as
+recorded in the snapshot, minus the per-seat tags logind derives from ID_SEAT.
+"""
+import os
+import re
+import bisect
+from fnmatch import translate
+
+from src.core.rules_index import RulesIndex
+from src.core.udev_db import UdevDatabase
+
+_TOKEN_RE = re.compile(r'([A-Z_]+(?:\{[^}]*\})?)\s*(==|!=|\+=|-=|:=|=)\s*"((?:[^"\\]|\\.)*)"')
+_SUBST_RE = re.compile(r"\$env\{([^}]+)\}|%E\{([^}]+)\}|\$kernel|%k|\$devpath|%p")
+_SEAT_TAG_RE = re.compile(r"^seat[A-Za-z0-9_-]+$")
+_GLOB_CHARS = set("*?[")
+_MATCH_KEYS = ("ACTION", "DEVPATH", "KERNEL", "SUBSYSTEM", "TAG")
+# Shorter DEVPATH runs are cheaper to walk than to index
+_MIN_RUN = 4
+
+
+def compile_pattern(value):
+    """A predicate for a udev match value: "|" alternatives of literals, prefixes or globs."""
+    literals, prefixes, globs = set(), [], []
+    for alternative in value.split("|"):
+        if not _GLOB_CHARS & set(alternative):
+            literals.add(alternative)
+        elif alternative.endswith("*") and not _GLOB_CHARS & set(alternative[:-1]):
+            prefixes.append(alternative[:-1])
+        else:
+            globs.append(re.compile(translate(alternative)))
+    prefixes = tuple(prefixes)
+
+    def match(text):
+        return (text in literals or (bool(prefixes) and text.startswith(prefixes))
+                or any(g.match(text) for g in globs))
+    return match
+
+
+class _Rule:
+    __slots__ = ("matches", "assigns", "goto", "label", "devpaths")
+
+    def __init__(self):
+        self.matches = []  # (key, negate, predicate)
+        self.assigns = []  # (key, op, value)
+        self.goto = None
+        self.label = None
+        self.devpaths = None  # alternatives of a leading DEVPATH== match
+
+
+class _DevpathRun:
+    """
+    Consecutive rules that each start with a DEVPATH== match (like the per-seat rules of
+    the generated file), indexed so a device goes straight to the few that can match it.
+    """
+
+    def __init__(self, rules, start, end):
+        self.end = end
+        self.literals = {}  # devpath -> [rule index]
+        self.dirs = {}      # "<parent>/" of a "<parent>/*" pattern -> [rule index]
+        self.always = []    # rules with other globs, always tried
+        for i in range(start, end):
+            for alternative in rules[i].devpaths:
+                if not _GLOB_CHARS & set(alternative):
+                    self.literals.setdefault(alternative, []).append(i)
+                elif alternative.endswith("/*") and not _GLOB_CHARS & set(alternative[:-2]):
+                    self.dirs.setdefault(alternative[:-1], []).append(i)
+                else:
+                    self.always.append(i)
+
+    def candidates(self, devpath):
+        found = set(self.always)
+        found.update(self.literals.get(devpath, ()))
+        end = devpath.rfind("/")
+        while end > 0:
+            found.update(self.dirs.get(devpath[:end + 1], ()))
+            end = devpath.rfind("/", 0, end)
+        return sorted(found)
+
+
+def compile_rule(line):
+    """A _Rule for one rule line, or None if it neither assigns anything we model nor jumps."""
+    rule = _Rule()
+    for key, op, value in _TOKEN_RE.findall(line):
+        if op in ("==", "!="):
+            if key == "DEVPATH" and op == "==" and not rule.matches:
+                rule.devpaths = value.split("|")
+            if key in _MATCH_KEYS or key.startswith("ENV{"):
+                rule.matches.append((key, op == "!=", compile_pattern(value)))
+            else:
+                # Not modelled: the rule never matches
+                rule.matches.append((None, False, None))
+        elif key == "GOTO":
+            rule.goto = value
+        elif key == "LABEL":
+            rule.label = value
+        elif key.startswith("ENV{") or key in ("TAG", "MODE") or key == "IMPORT{parent}":
+            rule.assigns.append((key, op, value))
+    if not (rule.assigns or rule.goto or rule.label):
+        return None
+    return rule
+
+
+def _is_relevant(rule):
+    for key, _, value in rule.assigns:
+        if key in ("ENV{ID_SEAT}", "ENV{ID_FOR_SEAT}", "TAG") or (key == "IMPORT{parent}" and "ID_SEAT" in value):
+            return True
+    return False
+
+
+def compile_rules(lines):
+    """(rules, labels, runs) for the lines of one rules file, or None if it cannot affect seats."""
+    rules = []
+    pending = ""
+    for raw in lines:
+        if raw.endswith("\\"):
+            pending += raw[:-1]
+            continue
+        text = (pending + raw).strip()
+        pending = ""
+        if not text or text.startswith("#"):
+            continue
+        rule = compile_rule(text)
+        if rule:
+            rules.append(rule)
+    if not any(_is_relevant(rule) for rule in rules):
+        return None
+    labels = {rule.label: i for i, rule in enumerate(rules) if rule.label}
+    runs = {}
+    start = 0
+    while start < len(rules):
+        end = start
+        while end < len(rules) and rules[end].devpaths:
+            end += 1
+        if end - start >= _MIN_RUN:
+            runs[start] = _DevpathRun(rules, start, end)
+        start = end + 1
+    return rules, labels, runs
+
+
+class RuleSimulator:
+    """
+    Predicts {syspath: seat} for a staged rules file. The installed files come from a
+    RulesIndex (same directories, masking and order) and are compiled once per mtime.
+    """
+
+    def __init__(self, udev_db=None, rules_index=None, root="/", own_rules_file="70-multiseat-manager.rules"):
+        self.root = os.path.abspath(root)
+        self.udev_db = udev_db if udev_db is not None else UdevDatabase.load(root=self.root)
+        self.rules_index = rules_index or RulesIndex(root=self.root)
+        self.own_rules_file = own_rules_file
+        self._compiled = {}  # path -> (mtime_ns, size, compiled or None)
+        self._subsystems = {}
+        self._records = None
+
+    def _installed(self):
+        files = []
+        for path in self.rules_index.active_files():
+            name = os.path.basename(path)
+            if name == self.own_rules_file:
+                continue
+            try:
+                st = os.stat(path)
+                cached = self._compiled.get(path)
+                if cached is None or cached[:2] != (st.st_mtime_ns, st.st_size):
+                    with open(path, "r", errors="replace") as f:
+                        cached = (st.st_mtime_ns, st.st_size, compile_rules(f.read().splitlines()))
+                    self._compiled[path] = cached
+            except OSError:
+                continue
+            if cached[2]:
+                files.append((name, cached[2]))
+        return files
+
+    def _subsystem(self, syspath):
+        subsystem = self._subsystems.get(syspath)
+        if subsystem is None:
+            link = os.path.join(self.root, syspath.lstrip("/"), "subsystem")
+            try:
+                subsystem = os.path.basename(os.readlink(link))
+            except OSError:
+                subsystem = ""
+            self._subsystems[syspath] = subsystem
+        return subsystem
+
+    def _device(self, syspath):
+        env = dict(self.udev_db.properties(syspath))
+        env.pop("ID_SEAT", None)
+        tags = {tag for tag in self.udev_db.tags(syspath) if tag == "seat" or not _SEAT_TAG_RE.match(tag)}
+        devpath = syspath[4:] if syspath.startswith("/sys/") else syspath
+        fields = {"ACTION": "add", "DEVPATH": devpath, "KERNEL": os.path.basename(devpath),
+                  "SUBSYSTEM": env.get("SUBSYSTEM") or self._subsystem(syspath)}
+        return env, tags, fields
+
+    @staticmethod
+    def _substitute(value, env, fields):
+        def replace(m):
+            key = m.group(1) or m.group(2)
+            if key:
+                return env.get(key, "")
+            return fields["KERNEL"] if m.group(0) in ("$kernel", "%k") else fields["DEVPATH"]
+        return _SUBST_RE.sub(replace, value) if ("$" in value or "%" in value) else value
+
+    @staticmethod
+    def _matches(rule, env, tags, fields):
+        for key, negate, predicate in rule.matches:
+            if key is None:
+                hit = False
+            elif key == "TAG":
+                hit = any(predicate(tag) for tag in tags)
+            elif key.startswith("ENV{"):
+                hit = predicate(env.get(key[4:-1], ""))
+            else:
+                hit = predicate(fields[key])
+            if hit == negate:
+                return False
+        return True
+
+    def _apply(self, rule, env, tags, fields, parent_env):
+        for key, op, value in rule.assigns:
+            value = self._substitute(value, env, fields)
+            if key == "TAG":
+                if op == "=":
+                    tags.clear()
+                if op == "-=":
+                    tags.discard(value)
+                else:
+                    tags.add(value)
+            elif key == "IMPORT{parent}":
+                if parent_env:
+                    wanted = compile_pattern(value)
+                    env.update({k: v for k, v in parent_env.items() if wanted(k)})
+            elif key.startswith("ENV{"):
+                env[key[4:-1]] = value
+            else:
+                env["MODE"] = value
+
+    def _evaluate(self, files, syspath, parent_env):
+        env, tags, fields = self._device(syspath)
+        for _, (rules, labels, runs) in files:
+            i = 0
+            while i < len(rules):
+                run = runs.get(i)
+                if run is not None:
+                    # Only the rules of the run whose DEVPATH can match; none of them means skip the run
+                    i = run.end
+                    for j in run.candidates(fields["DEVPATH"]):
+                        rule = rules[j]
+                        if self._matches(rule, env, tags, fields):
+                            self._apply(rule, env, tags, fields, parent_env)
+                            if rule.goto is not None:
+                                i = labels.get(rule.goto, len(rules))
+                                break
+                    continue
+                rule = rules[i]
+                i += 1
+                if self._matches(rule, env, tags, fields):
+                    self._apply(rule, env, tags, fields, parent_env)
+                    if rule.goto is not None:
+                        i = labels.get(rule.goto, len(rules))
+        return env, tags
+
+    def _seat_devices(self, target, targets):
+        """target plus its snapshot descendants tagged "seat" that no deeper target claims."""
+        records = self._sorted_records()
+        devices = [target] if "seat" in self.udev_db.tags(target) else []
+        start = bisect.bisect_left(records, target + "/")
+        for syspath in records[start:]:
+            if not syspath.startswith(target + "/"):
+                break
+            if "seat" not in self.udev_db.tags(syspath):
+                continue
+            owner = os.path.dirname(syspath)
+            while owner != target and owner not in targets:
+                owner = os.path.dirname(owner)
+            if owner == target and syspath not in targets:
+                devices.append(syspath)
+        return devices or [target]
+
+    def _sorted_records(self):
+        if self._records is None or len(self._records) != len(self.udev_db.records):
+            self._records = sorted(self.udev_db.records)
+        return self._records
+
+    def predict(self, staged_lines, syspaths=None):
+        """
+        {syspath: seat} with this tool's rules file replaced by staged_lines. syspaths limits
+        the prediction to those devices (their ancestors in the snapshot are evaluated too
+        when a rule imports from the parent); by default every device in the snapshot is predicted.
+        """
+        files = self._installed()
+        staged = compile_rules(staged_lines) if staged_lines else None
+        if staged:
+            files.append((self.own_rules_file, staged))
+            files.sort(key=lambda item: item[0])
+
+        if syspaths is None:
+            wanted = set(self.udev_db.records)
+        else:
+            wanted = set(syspaths)
+            imports = any(key == "IMPORT{parent}" for _, (rules, _, _) in files for rule in rules for key, _, _ in rule.assigns)
+            for syspath in syspaths if imports else ():
+                parent = os.path.dirname(syspath)
+                while len(parent) > len("/sys/devices"):
+                    if parent in self.udev_db.records:
+                        wanted.add(parent)
+                    parent = os.path.dirname(parent)
+
+        envs = {}
+        predicted = {}
+        for syspath in sorted(wanted):
+            parent = os.path.dirname(syspath)
+            while parent not in envs and len(parent) > len("/sys/devices"):
+                parent = os.path.dirname(parent)
+            env, tags = self._evaluate(files, syspath, envs.get(parent))
+            envs[syspath] = env
+            predicted[syspath] = env.get("ID_SEAT") or "seat0"
+        return predicted if syspaths is None else {path: predicted[path] for path in syspaths}
+
+    def check(self, desired, staged_lines):
+        """
+        desired: [(target_path, seat, mode, hw)] as ConfigExecutor lays it out. A device lands
+        on its seat when every seat-tagged node it stands for (itself, or e.g. a GPU's DRM card)
+        is predicted there. Returns (predicted, mismatches): {syspath: seat} for those nodes and
+        {target_path: (desired_seat, predicted_seat)}.
+        """
+        targets = {target_path: seat for target_path, seat, _, _ in desired}
+        nodes = {target: self._seat_devices(target, targets) for target in targets}
+        predicted = self.predict(staged_lines, sorted({node for group in nodes.values() for node in group}))
+        mismatches = {}
+        for target, seat in targets.items():
+            wrong = [predicted[node] for node in nodes[target] if predicted[node] != seat]
+            if wrong:
+                mismatches[target] = (seat, wrong[0])
+        return predicted, mismatches
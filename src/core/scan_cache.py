@@ -0,0 +1,101 @@
+import os
+import json
+import hashlib
+
+from .registry import DeviceRegistry, to_plain
+
+DEFAULT_CACHE_PATH = "~/.cache/multiseat-manager/scan.json"
+# Bump whenever the cached record shape or how it is rebuilt into registry records changes.
+# 2: scans are rebuilt into DeviceRegistry records
+CACHE_VERSION = 2
+
+# Directory listings that change whenever devices are added or removed
+FINGERPRINT_DIRS = [
+    "/sys/bus/usb/devices",
+    "/sys/class/drm",
+    "/sys/class/input",
+    "/sys/class/sound",
+]
+
+
+def compute_fingerprint(config=None, root="/"):
+    """
+    Cheap topology fingerprint: boot_id, the sorted listings of the hotplug-relevant sysfs
+    directories, and every DRM connector status. Aliases are folded in because the scan
+    result bakes them into device names.
+    """
+    digest = hashlib.sha1()
+    try:
+        with open(os.path.join(root, "proc/sys/kernel/random/boot_id"), "r") as f:
+            digest.update(f.read().strip().encode())
+    except OSError:
+        pass
+
+    for directory in FINGERPRINT_DIRS:
+        digest.update(directory.encode() + b"\0")
+        try:
+            entries = sorted(os.listdir(os.path.join(root, directory.lstrip("/"))))
+        except OSError:
+            continue
+        digest.update("\0".join(entries).encode())
+
+        if directory == "/sys/class/drm":
+            for entry in entries:
+                try:
+                    with open(os.path.join(root, directory.lstrip("/"), entry, "status"), "r") as f:
+                        digest.update(f"{entry}={f.read().strip()}".encode())
+                except OSError:
+                    continue
+
+    if config is not None:
+        digest.update(json.dumps(config.aliases, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def load_cached_scan(fingerprint, cache_path=None):
+    """Returns the cached full_scan result as a DeviceRegistry if it was stored under the same fingerprint, else None."""
+    cache_path = os.path.expanduser(cache_path or DEFAULT_CACHE_PATH)
+    try:
+        with open(cache_path, "r") as f:
+            cached = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if cached.get("version") != CACHE_VERSION or cached.get("fingerprint") != fingerprint:
+        return None
+    hardware = cached.get("hardware")
+    return DeviceRegistry.from_dict(hardware) if hardware is not None else None
+
+
+def store_scan(hardware_data, fingerprint, cache_path=None):
+    """Persists a full_scan result. Failures are ignored; the cache is only an accelerator."""
+    cache_path = os.path.expanduser(cache_path or DEFAULT_CACHE_PATH)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "fingerprint": fingerprint, "hardware": to_plain(hardware_data)}, f)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def scans_equal(a, b):
+    return json.dumps(to_plain(a), sort_keys=True) == json.dumps(to_plain(b), sort_keys=True)
+
+
+def load_or_scan(scanner, use_cache=True, parallel=True):
+    """
+    Returns (hardware_data, fingerprint, warm_start): the cached scan when the topology
+    fingerprint is unchanged, else a fresh full_scan() that is stored for next time.
+    The cache describes the host, so it is skipped for scanners on an alternate root.
+    """
+    use_cache = use_cache and scanner.root == "/"
+    fingerprint = compute_fingerprint(scanner.config) if use_cache else None
+    if use_cache:
+        hardware_data = load_cached_scan(fingerprint)
+        if hardware_data is not None:
+            return hardware_data, fingerprint, True
+    hardware_data = scanner.full_scan(parallel=parallel)
+    if use_cache:
+        store_scan(hardware_data, fingerprint)
+    return hardware_data, fingerprint, False
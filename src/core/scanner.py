@@ -1,44 +1,77 @@
 import os
 import re
-import subprocess
+import time
+import queue
+from concurrent.futures import ThreadPoolExecutor
 
 from .config import ConfigManager
+from .udev_db import UdevDatabase
+from .pci_ids import PciIdsIndex, find_pci_ids_file, read_pci_sysfs_ids
+from .syspath_index import SyspathIndex
+from .registry import DeviceRegistry, UsbDevice, GpuDevice, MonitorDevice, InputDevice, AvDevice
+
+def persistent_id_from(syspath, properties):
+    """Stable identifier for a device from its udev properties (database record or uevent)."""
+    # ID_PATH (physical port) is best for desk-centric setups
+    id_path = properties.get("ID_PATH")
+    if id_path:
+        return f"path:{id_path}"
+
+    # ID_SERIAL is good for specific high-end peripherals
+    id_serial = properties.get("ID_SERIAL")
+    if id_serial:
+        return f"serial:{id_serial}"
+
+    # Syspaths under /sys/devices/ are usually stable across reboots based on the bus topology
+    if syspath.startswith("/sys/devices/"):
+        return syspath[len("/sys/devices/"):]
+    return syspath
+
 
 class HardwareScanner:
-    def __init__(self, config_manager=None):
+    def __init__(self, config_manager=None, root="/"):
         self.config = config_manager or ConfigManager()
+        # Alternate filesystem root holding sys/, proc/ and run/ (e.g. a synthetic topology).
+        # Device syspaths are always reported in their canonical /sys/... form.
+        self.root = os.path.abspath(root)
+        self.udev_db = None
+        self.pci_ids = None
+        self.timings = {}
+
+    def host_path(self, path):
+        """Maps a canonical /sys, /proc or /run path onto the scanner's root."""
+        if self.root == "/":
+            return path
+        return os.path.join(self.root, path.lstrip("/"))
+
+    def resolve(self, path):
+        """realpath() of a canonical path inside the scanner's root, returned in canonical form."""
+        if self.root == "/":
+            return os.path.realpath(path)
+        real = os.path.realpath(self.host_path(path))
+        if real.startswith(self.root + "/"):
+            return real[len(self.root):]
+        return real
+
+    def refresh_udev_db(self):
+        """Re-reads the udev database. Called once at the start of every full scan."""
+        self.udev_db = UdevDatabase.load(root=self.root)
+        return self.udev_db
 
     def _get_udev_property(self, syspath, property_name):
-        """Queries udevadm to extract a specific property from a device syspath."""
-        try:
-            res = subprocess.run(["udevadm", "info", "--query=property", "--path", syspath], 
-                                 capture_output=True, text=True, check=True)
-            for line in res.stdout.splitlines():
-                if line.startswith(f"{property_name}="):
-                    return line.split("=", 1)[1].strip()
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            pass
-        return None
+        """Looks up a udev property for a device syspath in the cached udev database."""
+        if self.udev_db is None:
+            self.refresh_udev_db()
+        return self.udev_db.get_property(syspath, property_name)
 
     def _get_persistent_id(self, syspath):
         """
         Generates a stable identifier based on udev ID_PATH or ID_SERIAL.
         Falls back to sysfs physical topology if udev fails.
         """
-        # ID_PATH (physical port) is best for desk-centric setups
-        id_path = self._get_udev_property(syspath, "ID_PATH")
-        if id_path:
-            return f"path:{id_path}"
-            
-        # ID_SERIAL is good for specific high-end peripherals
-        id_serial = self._get_udev_property(syspath, "ID_SERIAL")
-        if id_serial:
-            return f"serial:{id_serial}"
-
-        # Syspaths under /sys/devices/ are usually stable across reboots based on the bus topology
-        if syspath.startswith("/sys/devices/"):
-            return syspath[len("/sys/devices/"):]
-        return syspath
+        if self.udev_db is None:
+            self.refresh_udev_db()
+        return persistent_id_from(syspath, self.udev_db.properties(syspath))
 
     def _decode_edid(self, edid_blob):
         """Extracts human-readable monitor name and manufacturer from an EDID binary blob."""
@@ -81,7 +114,7 @@ class HardwareScanner:
         return None
 
     def _clean_gpu_name(self, vendor_str, device_str):
-        """Cleans verbose lspci output into a short, human-readable GPU marketing name."""
+        """Cleans verbose pci.ids vendor/device names into a short, human-readable GPU marketing name."""
         vendor = vendor_str
         v_brackets = re.findall(r'\[(.*?)\]', vendor)
         if v_brackets:
@@ -106,6 +139,86 @@ class HardwareScanner:
         name = f"{vendor} {device}".strip()
         return name or "Unknown GPU"
 
+    def _pci_gpu_name(self, pci_addr):
+        """Names a PCI display controller from its sysfs IDs, without forking lspci."""
+        ids = read_pci_sysfs_ids(pci_addr, sys_root=self.host_path("/sys"))
+        # PCI base class 0x03 covers VGA, XGA, 3D and other display controllers
+        if not ids or ids["class"] is None or (ids["class"] >> 16) != 0x03:
+            return f"GPU PCI {pci_addr}"
+
+        if self.pci_ids is None:
+            if self.root == "/":
+                self.pci_ids = PciIdsIndex.open()
+            else:
+                self.pci_ids = PciIdsIndex.open(find_pci_ids_file(self.root),
+                                                self.host_path("/var/cache/multiseat-manager/pci.ids.idx"))
+        vendor, device, subsystem = self.pci_ids.lookup(
+            ids["vendor"], ids["device"], ids["subsystem_vendor"], ids["subsystem_device"]
+        )
+        device = device or subsystem
+        if not vendor and not device:
+            return f"GPU PCI {pci_addr}"
+        return self._clean_gpu_name(vendor or f"{ids['vendor']:04x}", device or f"Device {ids['device']:04x}")
+
+    @staticmethod
+    def usb_parent_id(dev_id):
+        """Returns the sysfs name of the hub a USB device hangs off (e.g. 1-2.3 -> 1-2, 1-2 -> usb1)."""
+        parts = dev_id.rsplit(".", 1)
+        if len(parts) > 1:
+            return parts[0]
+        return f"usb{dev_id.split('-')[0]}"
+
+    def _read_usb_device(self, item):
+        """Reads a single /sys/bus/usb/devices/<item> entry into a device node (without children)."""
+        usb_dir = "/sys/bus/usb/devices/"
+        syspath = self.resolve(os.path.join(usb_dir, item))
+        persistent_id = self._get_persistent_id(syspath)
+        
+        name = "Unknown USB Device"
+        manufacturer = ""
+        product = ""
+        try:
+            with open(self.host_path(os.path.join(syspath, "manufacturer")), "r") as f:
+                manufacturer = f.read().strip()
+            with open(self.host_path(os.path.join(syspath, "product")), "r") as f:
+                product = f.read().strip()
+            if manufacturer and product:
+                name = f"{manufacturer} {product}"
+            elif product:
+                name = product
+        except (FileNotFoundError, OSError):
+            if item.startswith("usb"):
+                name = f"Root USB Hub ({item})"
+        
+        is_hub = False
+        try:
+            with open(self.host_path(os.path.join(syspath, "bDeviceClass")), "r") as f:
+                if f.read().strip() == "09":
+                    is_hub = True
+        except FileNotFoundError:
+            if item.startswith("usb"):
+                is_hub = True
+                
+        # Clean up kernel generic strings
+        lower_name = name.lower()
+        if any(x in lower_name for x in ["linux", "generic", "xhci", "ehci", "uhci", "ohci"]):
+            if is_hub and item.startswith("usb"):
+                name = f"Motherboard USB Controller"
+            elif is_hub:
+                name = "Generic USB Hub"
+                
+        alias = self.config.get_alias(persistent_id)
+        
+        return UsbDevice(
+            id=item,
+            syspath=syspath,
+            persistent_id=persistent_id,
+            name=alias if alias else name,
+            is_hub=is_hub,
+            type="usb",
+            children=[]
+        )
+
     def scan_usb_topology(self):
         """
         Scans /sys/bus/usb/devices/ to map USB buses, hubs, and devices.
@@ -114,61 +227,14 @@ class HardwareScanner:
         usb_dir = "/sys/bus/usb/devices/"
         devices_map = {}
         
-        if not os.path.exists(usb_dir):
+        if not os.path.exists(self.host_path(usb_dir)):
             return devices_map
 
         # Map all devices linearly first
-        for item in os.listdir(usb_dir):
+        for item in os.listdir(self.host_path(usb_dir)):
             if ":" in item:
                 continue
-                
-            syspath = os.path.realpath(os.path.join(usb_dir, item))
-            persistent_id = self._get_persistent_id(syspath)
-            
-            name = "Unknown USB Device"
-            manufacturer = ""
-            product = ""
-            try:
-                with open(os.path.join(syspath, "manufacturer"), "r") as f:
-                    manufacturer = f.read().strip()
-                with open(os.path.join(syspath, "product"), "r") as f:
-                    product = f.read().strip()
-                if manufacturer and product:
-                    name = f"{manufacturer} {product}"
-                elif product:
-                    name = product
-            except (FileNotFoundError, OSError):
-                if item.startswith("usb"):
-                    name = f"Root USB Hub ({item})"
-            
-            is_hub = False
-            try:
-                with open(os.path.join(syspath, "bDeviceClass"), "r") as f:
-                    if f.read().strip() == "09":
-                        is_hub = True
-            except FileNotFoundError:
-                if item.startswith("usb"):
-                    is_hub = True
-                    
-            # Clean up kernel generic strings
-            lower_name = name.lower()
-            if any(x in lower_name for x in ["linux", "generic", "xhci", "ehci", "uhci", "ohci"]):
-                if is_hub and item.startswith("usb"):
-                    name = f"Motherboard USB Controller"
-                elif is_hub:
-                    name = "Generic USB Hub"
-                    
-            alias = self.config.get_alias(persistent_id)
-            
-            devices_map[item] = {
-                "id": item,
-                "syspath": syspath,
-                "persistent_id": persistent_id,
-                "name": alias if alias else name,
-                "is_hub": is_hub,
-                "type": "usb",
-                "children": []
-            }
+            devices_map[item] = self._read_usb_device(item)
 
         # Build hierarchy
         hubs_tree = {}
@@ -176,12 +242,7 @@ class HardwareScanner:
             if dev_id.startswith("usb"):
                 hubs_tree[dev_id] = dev_info
             else:
-                parts = dev_id.rsplit(".", 1)
-                if len(parts) > 1:
-                    parent_id = parts[0]
-                else:
-                    parent_id = f"usb{dev_id.split('-')[0]}"
-                
+                parent_id = self.usb_parent_id(dev_id)
                 if parent_id in devices_map:
                     devices_map[parent_id]["children"].append(dev_info)
                 else:
@@ -189,185 +250,198 @@ class HardwareScanner:
                     
         return hubs_tree
 
-    def scan_graphics(self):
-        """
-        Scans /sys/class/drm to find GPUs and child DRM monitors.
-        Parses `lspci -vmm` to find human-readable GPU names.
-        """
-        gpus = []
+    def _read_gpu(self, item, drm_items):
+        """Reads a /sys/class/drm/cardN entry and its connected monitors into a GPU node."""
         drm_dir = "/sys/class/drm/"
-        if not os.path.exists(drm_dir):
-            return gpus
+        item_path = os.path.join(drm_dir, item)
+        syspath = self.resolve(item_path)
+        persistent_id = self._get_persistent_id(syspath)
+        
+        gpu_name = f"GPU ({item})"
+        pci_addr = None
+        try:
+            with open(self.host_path(os.path.join(item_path, "device", "uevent")), "r") as f:
+                for line in f:
+                    if line.startswith("PCI_SLOT_NAME="):
+                        pci_addr = line.split("=", 1)[1].strip()
+                        break
+        except (FileNotFoundError, OSError):
+            pass
+        
+        if not pci_addr:
+            pci_match = re.search(r'([0-9a-fA-F]{4}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-9a-fA-F])', syspath)
+            if pci_match:
+                pci_addr = pci_match.group(1)
 
-        drm_items = os.listdir(drm_dir)
-        for item in drm_items:
-            if item.startswith("card") and "-" not in item:
-                item_path = os.path.join(drm_dir, item)
-                syspath = os.path.realpath(item_path)
-                persistent_id = self._get_persistent_id(syspath)
-                
-                gpu_name = f"GPU ({item})"
-                pci_addr = None
+        # Keep track of the core PCI bus path for the GPU to capture child audio/CEC instances later
+        gpu_pci_syspath = ""
+        if pci_addr:
+            # Strip the final .X function number to just match the device (e.g. 07:00)
+            base_pci = pci_addr.rsplit('.', 1)[0]
+            gpu_pci_syspath = base_pci
+            
+            gpu_name = self._pci_gpu_name(pci_addr)
+        
+        alias = self.config.get_alias(persistent_id)
+        return GpuDevice(
+            syspath=syspath,
+            pci_syspath=gpu_pci_syspath, # Use this to trap HDMI sound/CEC
+            persistent_id=persistent_id,
+            name=alias if alias else gpu_name,
+            type="gpu",
+            monitors=self._read_connectors(item, persistent_id, drm_items),
+            audio_video=[]
+        )
+
+    def _read_connectors(self, item, persistent_id, drm_items):
+        """Returns monitor nodes for every connected cardN-* connector of a DRM card."""
+        drm_dir = "/sys/class/drm/"
+        monitors = []
+        for connector in drm_items:
+            if connector.startswith(f"{item}-"):
+                connector_path = os.path.join(drm_dir, connector)
+                status_path = os.path.join(connector_path, "status")
                 try:
-                    with open(os.path.join(item_path, "device", "uevent"), "r") as f:
-                        for line in f:
-                            if line.startswith("PCI_SLOT_NAME="):
-                                pci_addr = line.split("=", 1)[1].strip()
-                                break
-                except (FileNotFoundError, OSError):
-                    pass
-                
-                if not pci_addr:
-                    pci_match = re.search(r'([0-9a-fA-F]{4}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-9a-fA-F])', syspath)
-                    if pci_match:
-                        pci_addr = pci_match.group(1)
-
-                # Keep track of the core PCI bus path for the GPU to capture child audio/CEC instances later
-                gpu_pci_syspath = ""
-                if pci_addr:
-                    # Strip the final .X function number to just match the device (e.g. 07:00)
-                    base_pci = pci_addr.rsplit('.', 1)[0]
-                    gpu_pci_syspath = base_pci
+                    with open(self.host_path(status_path), "r") as f:
+                        status = f.read().strip()
+                except FileNotFoundError:
+                    status = "unknown"
+                    
+                if status == "connected":
+                    # Use connector name (e.g., DP-1) as a stable identifier part
+                    connector_id = connector.split('-', 1)[1]
+                    monitor_name = f"Display {connector_id}"
                     
+                    edid_path = os.path.join(connector_path, "edid")
                     try:
-                        res = subprocess.run(["lspci", "-vmm", "-s", pci_addr], capture_output=True, text=True)
-                        vendor = ""
-                        device = ""
-                        cls = ""
-                        for line in res.stdout.splitlines():
-                            if line.startswith("Class:"):
-                                cls = line.split(":", 1)[1].strip()
-                            elif line.startswith("Vendor:"):
-                                vendor = line.split(":", 1)[1].strip()
-                            elif line.startswith("Device:"):
-                                device = line.split(":", 1)[1].strip()
-                                
-                        if any(x in cls for x in ["VGA", "Display", "3D"]):
-                            if vendor or device:
-                                gpu_name = self._clean_gpu_name(vendor, device)
-                            else:
-                                gpu_name = f"GPU PCI {pci_addr}"
-                        else:
-                            gpu_name = f"GPU PCI {pci_addr}"
-                    except Exception:
-                        gpu_name = f"GPU PCI {pci_addr}"
-                
-                alias = self.config.get_alias(persistent_id)
-                gpu_info = {
-                    "syspath": syspath,
-                    "pci_syspath": gpu_pci_syspath, # Use this to trap HDMI sound/CEC
-                    "persistent_id": persistent_id,
-                    "name": alias if alias else gpu_name,
-                    "type": "gpu",
-                    "monitors": [],
-                    "audio_video": []
-                }
-                
-                for connector in drm_items:
-                    if connector.startswith(f"{item}-"):
-                        connector_path = os.path.join(drm_dir, connector)
-                        status_path = os.path.join(connector_path, "status")
-                        try:
-                            with open(status_path, "r") as f:
-                                status = f.read().strip()
-                        except FileNotFoundError:
-                            status = "unknown"
-                            
-                        if status == "connected":
-                            # Use connector name (e.g., DP-1) as a stable identifier part
-                            connector_id = connector.split('-', 1)[1]
-                            monitor_name = f"Display {connector_id}"
-                            
-                            edid_path = os.path.join(connector_path, "edid")
-                            try:
-                                with open(edid_path, "rb") as f:
-                                    edid_name = self._decode_edid(f.read())
-                                    if edid_name:
-                                        # Use both EDID name and connector ID to ensure uniqueness
-                                        monitor_name = f"{edid_name} ({connector_id})"
-                            except (FileNotFoundError, PermissionError):
-                                pass
-                                
-                            conn_syspath = os.path.realpath(connector_path)
-                            conn_persistent_id = f"{persistent_id}/{connector_id}" # Stable hierarchy
-                            conn_alias = self.config.get_alias(conn_persistent_id)
-                            
-                            gpu_info["monitors"].append({
-                                "syspath": conn_syspath,
-                                "persistent_id": conn_persistent_id,
-                                "name": conn_alias if conn_alias else monitor_name,
-                                "type": "monitor",
-                                "connector": connector_id
-                            })
-                gpus.append(gpu_info)
-        return gpus
-
-    def scan_input_devices(self):
+                        with open(self.host_path(edid_path), "rb") as f:
+                            edid_name = self._decode_edid(f.read())
+                            if edid_name:
+                                # Use both EDID name and connector ID to ensure uniqueness
+                                monitor_name = f"{edid_name} ({connector_id})"
+                    except (FileNotFoundError, PermissionError):
+                        pass
+                        
+                    conn_syspath = self.resolve(connector_path)
+                    conn_persistent_id = f"{persistent_id}/{connector_id}" # Stable hierarchy
+                    conn_alias = self.config.get_alias(conn_persistent_id)
+                    
+                    monitors.append(MonitorDevice(
+                        syspath=conn_syspath,
+                        persistent_id=conn_persistent_id,
+                        name=conn_alias if conn_alias else monitor_name,
+                        type="monitor",
+                        connector=connector_id
+                    ))
+        return monitors
+
+    def iter_graphics(self):
+        """Yields GPU nodes one DRM card at a time, each with its monitors' EDID already decoded."""
+        drm_dir = "/sys/class/drm/"
+        if not os.path.exists(self.host_path(drm_dir)):
+            return
+
+        drm_items = os.listdir(self.host_path(drm_dir))
+        for item in drm_items:
+            if item.startswith("card") and "-" not in item:
+                yield self._read_gpu(item, drm_items)
+
+    def scan_graphics(self):
+        """
+        Scans /sys/class/drm to find GPUs and child DRM monitors.
+        Resolves human-readable GPU names from sysfs PCI IDs and the pci.ids database.
+        """
+        return list(self.iter_graphics())
+
+    def _read_input_node(self, ev):
+        """
+        Reads capabilities of a single /sys/class/input/eventN node.
+        Returns None for nodes that are not human input devices.
+        """
+        path = os.path.join("/sys/class/input", ev)
+        
+        name_path = os.path.join(path, "device", "name")
+        caps_ev_path = os.path.join(path, "device", "capabilities", "ev")
+        caps_key_path = os.path.join(path, "device", "capabilities", "key")
+        phys_path_file = os.path.join(path, "device", "phys")
+        
+        if not os.path.exists(self.host_path(name_path)) or not os.path.exists(self.host_path(caps_ev_path)):
+            return None
+            
+        with open(self.host_path(name_path), "r") as f:
+            device_name = f.read().strip()
+        
+        with open(self.host_path(caps_ev_path), "r") as f:
+            ev_bits_hex = f.read().strip()
+        ev_bits = int(ev_bits_hex, 16) if ev_bits_hex else 0
+        
+        # Check capability bits: EV_REL is bit 2, EV_ABS is bit 3
+        has_rel = bool((ev_bits >> 2) & 1)
+        has_abs = bool((ev_bits >> 3) & 1)
+        
+        key_count = 0
+        if os.path.exists(self.host_path(caps_key_path)):
+            with open(self.host_path(caps_key_path), "r") as f:
+                key_str = f.read().strip()
+            for chunk in key_str.split():
+                key_count += bin(int(chunk, 16)).count("1")
+
+        # Input constraints: Relaxed to catch macro pads and foot pedals
+        is_valid = False
+        if has_rel or has_abs:
+            is_valid = True
+        elif key_count > 1: # Reduced from 5 to catch macro pads
+            is_valid = True
+        
+        name_l = device_name.lower()
+        # Still filter out noisy power buttons and internal HDMI/DP event nodes
+        if "hdmi" in name_l or "dp" in name_l or "power button" in name_l or "vga" in name_l:
+            is_valid = False
+            
+        if not is_valid:
+            return None
+        
+        # Try to get the physical path, fallback to the device folder path
+        phys_path = ""
+        if os.path.exists(self.host_path(phys_path_file)):
+            with open(self.host_path(phys_path_file), "r") as f:
+                phys_path = f.read().strip()
+        if not phys_path:
+            phys_path = self.resolve(os.path.join(path, "device"))
+
+        return {
+            "path": path,
+            "name": device_name,
+            "phys_path": phys_path,
+            "has_rel": has_rel,
+            "has_abs": has_abs,
+            "key_count": key_count
+        }
+
+    def scan_input_devices(self, event_nodes=None):
         """
         Scans sysfs input interfaces to map human-readable input devices (Keyboards, Mice, etc).
         Groups multiple event nodes sharing the same physical path into a single logical device.
+        event_nodes restricts the scan to the given eventN names (used for hotplug rescans).
         """
         grouped_devices = {}
         input_dir = "/sys/class/input"
 
         try:
-            if not os.path.exists(input_dir):
+            if not os.path.exists(self.host_path(input_dir)):
                 return []
+
+            if event_nodes is None:
+                event_nodes = os.listdir(self.host_path(input_dir))
                 
-            for ev in os.listdir(input_dir):
+            for ev in event_nodes:
                 if not ev.startswith("event"):
                     continue
-                    
-                path = os.path.join(input_dir, ev)
-                
-                name_path = os.path.join(path, "device", "name")
-                caps_ev_path = os.path.join(path, "device", "capabilities", "ev")
-                caps_key_path = os.path.join(path, "device", "capabilities", "key")
-                phys_path_file = os.path.join(path, "device", "phys")
-                
-                if not os.path.exists(name_path) or not os.path.exists(caps_ev_path):
-                    continue
-                    
-                with open(name_path, "r") as f:
-                    device_name = f.read().strip()
-                
-                with open(caps_ev_path, "r") as f:
-                    ev_bits_hex = f.read().strip()
-                ev_bits = int(ev_bits_hex, 16) if ev_bits_hex else 0
-                
-                # Check capability bits: EV_REL is bit 2, EV_ABS is bit 3
-                has_rel = bool((ev_bits >> 2) & 1)
-                has_abs = bool((ev_bits >> 3) & 1)
-                
-                key_count = 0
-                if os.path.exists(caps_key_path):
-                    with open(caps_key_path, "r") as f:
-                        key_str = f.read().strip()
-                    for chunk in key_str.split():
-                        key_count += bin(int(chunk, 16)).count("1")
-
-                # Input constraints: Relaxed to catch macro pads and foot pedals
-                is_valid = False
-                if has_rel or has_abs:
-                    is_valid = True
-                elif key_count > 1: # Reduced from 5 to catch macro pads
-                    is_valid = True
-                
-                name_l = device_name.lower()
-                # Still filter out noisy power buttons and internal HDMI/DP event nodes
-                if "hdmi" in name_l or "dp" in name_l or "power button" in name_l or "vga" in name_l:
-                    is_valid = False
-                    
-                if not is_valid:
+
+                node = self._read_input_node(ev)
+                if not node:
                     continue
-                
-                # Try to get the physical path, fallback to the device folder path
-                phys_path = ""
-                if os.path.exists(phys_path_file):
-                    with open(phys_path_file, "r") as f:
-                        phys_path = f.read().strip()
-                if not phys_path:
-                    phys_path = os.path.realpath(os.path.join(path, "device"))
+                phys_path = node["phys_path"]
                 
                 if phys_path not in grouped_devices:
                     grouped_devices[phys_path] = {
@@ -382,21 +456,22 @@ class HardwareScanner:
                     
                 group = grouped_devices[phys_path]
                 group["device_nodes"].append(ev)
-                group["names"].append(device_name)
-                group["has_rel"] = group["has_rel"] or has_rel
-                group["has_abs"] = group["has_abs"] or has_abs
-                group["key_count"] = max(group["key_count"], key_count)
+                group["names"].append(node["name"])
+                group["has_rel"] = group["has_rel"] or node["has_rel"]
+                group["has_abs"] = group["has_abs"] or node["has_abs"]
+                group["key_count"] = max(group["key_count"], node["key_count"])
                 
                 if not group["syspath"]:
+                    path = node["path"]
                     try:
-                        group["syspath"] = os.path.realpath(path)
+                        group["syspath"] = self.resolve(path)
                         group["persistent_id"] = self._get_persistent_id(group["syspath"])
                     except OSError:
                         group["syspath"] = path
                         group["persistent_id"] = path
                         
         except Exception as e:
-            return [{"error": f"Failed to read sysfs inputs: {e}"}]
+            return [InputDevice(error=f"Failed to read sysfs inputs: {e}")]
             
         # Collapse groups into finalized list
         inputs = []
@@ -420,164 +495,296 @@ class HardwareScanner:
                 
             final_name = alias if alias else best_name
             
-            inputs.append({
-                "syspath": group["syspath"],
-                "persistent_id": group["persistent_id"],
-                "name": f"{icon} {final_name}",
-                "type": "input",
-                "nodes": group["device_nodes"]
-            })
+            inputs.append(InputDevice(
+                syspath=group["syspath"],
+                persistent_id=group["persistent_id"],
+                name=f"{icon} {final_name}",
+                type="input",
+                nodes=group["device_nodes"]
+            ))
             
         return inputs
 
+    def _read_sound_card(self, item):
+        """Reads a /sys/class/sound/cardN entry, including monitor names from its ELD files."""
+        syspath = self.resolve(f"/sys/class/sound/{item}")
+        persistent_id = self._get_persistent_id(syspath)
+        name = f"Sound Card ({item})"
+        
+        try:
+            with open(self.host_path(os.path.join(syspath, "id")), "r") as f:
+                name = f"Sound ({f.read().strip()})"
+        except OSError:
+            pass
+            
+        eld_monitors = []
+        proc_dir = f"/proc/asound/{item}"
+        if os.path.exists(self.host_path(proc_dir)):
+            for f in os.listdir(self.host_path(proc_dir)):
+                if f.startswith("eld"):
+                    try:
+                        with open(self.host_path(os.path.join(proc_dir, f)), "r") as fp:
+                            for line in fp:
+                                if line.startswith("monitor_name"):
+                                    parts = line.split(maxsplit=1)
+                                    if len(parts) > 1:
+                                        eld_monitors.append(parts[1].strip())
+                    except OSError:
+                        pass
+            
+        return AvDevice(
+            syspath=syspath,
+            persistent_id=persistent_id,
+            name=self.config.get_alias(persistent_id) or name,
+            type="audio",
+            eld_monitors=eld_monitors,
+            children=[]
+        )
+
+    def _read_video_device(self, item, av_devices):
+        """
+        Reads a /sys/class/video4linux entry. If it shares a bus parent with a known sound
+        card the two are merged into one camera_mic node and None is returned.
+        """
+        syspath = self.resolve(f"/sys/class/video4linux/{item}")
+        persistent_id = self._get_persistent_id(syspath)
+        
+        name = "Webcam"
+        try:
+            with open(self.host_path(os.path.join(syspath, "name")), "r") as f:
+                name = f"Cam ({f.read().strip()})"
+        except OSError:
+            pass
+
+        # If this webcam shares a bus parent (like a USB module) with an Audio device, group them!
+        parent_syspath = os.path.dirname(syspath) 
+        while parent_syspath != "/" and "usb" not in os.path.basename(parent_syspath) and "pci" not in os.path.basename(parent_syspath):
+            parent_syspath = os.path.dirname(parent_syspath)
+
+        for av_path, av_item in av_devices.items():
+            if av_path.startswith(parent_syspath):
+                # It's a combo Audio/Video webcam
+                av_item["name"] = self.config.get_alias(av_item["persistent_id"]) or name.replace("Cam", "Webcam/Mic")
+                av_item["type"] = "camera_mic"
+                return None
+                
+        return AvDevice(
+            syspath=syspath,
+            persistent_id=persistent_id,
+            name=self.config.get_alias(persistent_id) or name,
+            type="camera",
+            children=[]
+        )
+
     def scan_av_devices(self):
         """Scans ALSA Soundcards and V4L2 Webcams, clustering them by physical hw."""
         av_devices = {}
 
         # 1. ALSA Soundcards
-        if os.path.exists("/sys/class/sound/"):
-            for item in os.listdir("/sys/class/sound/"):
+        if os.path.exists(self.host_path("/sys/class/sound/")):
+            for item in os.listdir(self.host_path("/sys/class/sound/")):
                 if item.startswith("card"): 
-                    syspath = os.path.realpath(f"/sys/class/sound/{item}")
-                    persistent_id = self._get_persistent_id(syspath)
-                    name = f"Sound Card ({item})"
-                    
-                    try:
-                        with open(os.path.join(syspath, "id"), "r") as f:
-                            name = f"Sound ({f.read().strip()})"
-                    except OSError:
-                        pass
-                        
-                    eld_monitors = []
-                    proc_dir = f"/proc/asound/{item}"
-                    if os.path.exists(proc_dir):
-                        for f in os.listdir(proc_dir):
-                            if f.startswith("eld"):
-                                try:
-                                    with open(os.path.join(proc_dir, f), "r") as fp:
-                                        for line in fp:
-                                            if line.startswith("monitor_name"):
-                                                parts = line.split(maxsplit=1)
-                                                if len(parts) > 1:
-                                                    eld_monitors.append(parts[1].strip())
-                                except OSError:
-                                    pass
-                        
-                    dev_data = {
-                        "syspath": syspath,
-                        "persistent_id": persistent_id,
-                        "name": self.config.get_alias(persistent_id) or name,
-                        "type": "audio",
-                        "eld_monitors": eld_monitors,
-                        "children": []
-                    }
-                    if syspath not in av_devices:
-                        av_devices[syspath] = dev_data
+                    dev_data = self._read_sound_card(item)
+                    if dev_data["syspath"] not in av_devices:
+                        av_devices[dev_data["syspath"]] = dev_data
                         
         # 2. V4L2 Webcams
-        if os.path.exists("/sys/class/video4linux/"):
-            for item in os.listdir("/sys/class/video4linux/"):
-                syspath = os.path.realpath(f"/sys/class/video4linux/{item}")
-                persistent_id = self._get_persistent_id(syspath)
-                
-                name = "Webcam"
-                try:
-                    with open(os.path.join(syspath, "name"), "r") as f:
-                        name = f"Cam ({f.read().strip()})"
-                except OSError:
-                    pass
-
-                # If this webcam shares a bus parent (like a USB module) with an Audio device, group them!
-                parent_syspath = os.path.dirname(syspath) 
-                while parent_syspath != "/" and "usb" not in os.path.basename(parent_syspath) and "pci" not in os.path.basename(parent_syspath):
-                    parent_syspath = os.path.dirname(parent_syspath)
-
-                matched = False
-                for av_path, av_item in av_devices.items():
-                    if av_path.startswith(parent_syspath):
-                        # It's a combo Audio/Video webcam
-                        av_item["name"] = self.config.get_alias(av_item["persistent_id"]) or name.replace("Cam", "Webcam/Mic")
-                        av_item["type"] = "camera_mic"
-                        matched = True
-                        break
-                        
-                if not matched:
-                    av_devices[syspath] = {
-                        "syspath": syspath,
-                        "persistent_id": persistent_id,
-                        "name": self.config.get_alias(persistent_id) or name,
-                        "type": "camera",
-                        "children": []
-                    }
+        if os.path.exists(self.host_path("/sys/class/video4linux/")):
+            for item in os.listdir(self.host_path("/sys/class/video4linux/")):
+                cam = self._read_video_device(item, av_devices)
+                if cam:
+                    av_devices[cam["syspath"]] = cam
                     
         return list(av_devices.values())
 
-    def full_scan(self):
-        """Runs all hardware scans and returns the structured dictionary."""
-        usb_tree = self.scan_usb_topology()
-        graphics = self.scan_graphics()
-        inputs = self.scan_input_devices()
-        av_devices = self.scan_av_devices()
+    @staticmethod
+    def build_gpu_index(graphics):
+        """Indexes GPUs by PCI device so any function below them (HDMI audio, DP audio) resolves to its GPU."""
+        index = SyspathIndex()
+        for gpu in graphics:
+            if gpu.get("pci_syspath"):
+                index.add_pci_device(gpu["pci_syspath"], gpu)
+        return index
+
+    def _trap_av(self, av, graphics, gpu_index=None):
+        """
+        Nests an HDMI/DP audio device under the GPU sharing its PCI device (and, where
+        possible, under the monitor named in its ELD data). Returns True if it was trapped.
+        """
+        if gpu_index is None:
+            gpu_index = self.build_gpu_index(graphics)
+        # av syspath looks like /sys/devices/pci0000:00/.../0000:07:00.1/sound/card1
+        # gpu pci_syspath is "0000:07:00"
+        gpu = gpu_index.find_owner(av.get("syspath", ""))
+        if gpu is None:
+            return False
+
+        # Rename generic HDMI Audio
+        if any(x in av["name"].upper() for x in ["HDMI", "DP", "GENERIC", "HDA"]):
+            av["name"] = "Monitor Audio Output"
+
+        # Try to pair with a specific monitor based on ELD
+        paired = False
+        for mon in gpu["monitors"]:
+            mon_name_l = mon["name"].lower()
+            if any(e.lower() in mon_name_l or mon_name_l in e.lower() for e in av.get("eld_monitors", [])):
+                if "audio_video" not in mon:
+                    mon["audio_video"] = []
+                mon["audio_video"].append(av)
+                paired = True
+                break
+
+        if not paired:
+            # Fallback: if there's only 1 monitor, just pair it
+            if len(gpu["monitors"]) == 1:
+                mon = gpu["monitors"][0]
+                if "audio_video" not in mon:
+                    mon["audio_video"] = []
+                mon["audio_video"].append(av)
+                paired = True
+
+        if not paired:
+            gpu["audio_video"].append(av)
+        return True
+
+    def _hide_used_usb(self, nodes, used_syspaths):
+        """
+        Flags USB nodes whose subtree contains an input or AV device already listed elsewhere.
+        used_syspaths is a SyspathIndex or an iterable of syspaths.
+        """
+        if not isinstance(used_syspaths, SyspathIndex):
+            used_syspaths = SyspathIndex(used_syspaths)
+        for node in nodes:
+            if used_syspaths.has_descendant(node.get("syspath", "")):
+                node["hidden_by_input"] = True
+            else:
+                node.pop("hidden_by_input", None)
+            if "children" in node:
+                self._hide_used_usb(node["children"], used_syspaths)
+
+    def _timed(self, phase, func):
+        start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            self.timings[phase] = time.perf_counter() - start
+
+    def format_timings(self):
+        """Renders the wall-clock time of each phase of the last full_scan, in milliseconds."""
+        order = ["udev", "usb", "drm", "input", "av", "merge", "total"]
+        phases = sorted(self.timings, key=lambda p: order.index(p) if p in order else len(order))
+        return "\n".join(f"{phase:>8}: {self.timings[phase] * 1000:8.1f} ms" for phase in phases)
+
+    # Scan phases in merge order, with the hardware_data category each one fills
+    SCAN_PHASES = [("usb", "usb"), ("drm", "graphics"), ("input", "inputs"), ("av", "av")]
+
+    def _iter_phase(self, phase):
+        if phase == "usb":
+            # Root hubs carry their whole subtree
+            return iter(self.scan_usb_topology().values())
+        if phase == "drm":
+            return self.iter_graphics()
+        if phase == "input":
+            return iter(self.scan_input_devices())
+        return iter(self.scan_av_devices())
+
+    def _run_phase(self, phase, sink):
+        start = time.perf_counter()
+        try:
+            for item in self._iter_phase(phase):
+                sink.put((phase, item))
+        finally:
+            self.timings[phase] = time.perf_counter() - start
+            sink.put((phase, None))
+
+    def iter_scan(self, parallel=False, max_workers=4):
+        """
+        Streaming form of full_scan(). Yields (action, category, item) tuples shaped like
+        HotplugModel changes as soon as devices are read: ("add", category, record) for every
+        USB root hub (with its subtree), GPU, input device and AV device, then the merge
+        step's ("remove", "av", ...) and ("change", "graphics" | "usb", ...) updates, and
+        finally ("done", "all", registry) carrying the same DeviceRegistry full_scan() returns.
+        With parallel=True the phases run on a bounded thread pool and their devices are
+        yielded in arrival order; the final registry is still assembled in a fixed order.
+        """
+        self.timings = {}
+        total_start = time.perf_counter()
+        self._timed("udev", self.refresh_udev_db)
+
+        collected = {phase: [] for phase, _ in self.SCAN_PHASES}
+        categories = dict(self.SCAN_PHASES)
+        if parallel:
+            sink = queue.Queue()
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(self.SCAN_PHASES)))) as pool:
+                futures = [pool.submit(self._run_phase, phase, sink) for phase, _ in self.SCAN_PHASES]
+                running = len(futures)
+                while running:
+                    phase, item = sink.get()
+                    if item is None:
+                        running -= 1
+                        continue
+                    collected[phase].append(item)
+                    yield ("add", categories[phase], item)
+                for future in futures:
+                    future.result()
+        else:
+            for phase, category in self.SCAN_PHASES:
+                start = time.perf_counter()
+                for item in self._iter_phase(phase):
+                    collected[phase].append(item)
+                    yield ("add", category, item)
+                self.timings[phase] = time.perf_counter() - start
+
+        usb_tree = {node["id"]: node for node in collected["usb"]}
+        graphics = collected["drm"]
+        inputs = collected["input"]
+        av_devices = collected["av"]
+        merge_start = time.perf_counter()
         
         # Collapse HDMI/CEC interfaces directly inside their parent GPUs.
         # This removes "HDA NVidia" or "HDA ATI HDMI" soundcards from the main generic lists.
+        gpu_index = self.build_gpu_index(graphics)
         filtered_av = []
+        changes = []
+        changed_gpus = {}
         for av in av_devices:
-            trapped = False
-            for gpu in graphics:
-                # av syspath looks like /sys/class/sound/card1 -> /sys/devices/pci0000:00/.../0000:07:00.1/...
-                # gpu pci_syspath is "0000:07:00"
-                if gpu.get("pci_syspath") and gpu["pci_syspath"] in av.get("syspath", ""):
-                    
-                    # Rename generic HDMI Audio
-                    if any(x in av["name"].upper() for x in ["HDMI", "DP", "GENERIC", "HDA"]):
-                        av["name"] = "Monitor Audio Output"
-
-                    # Try to pair with a specific monitor based on ELD
-                    paired = False
-                    for mon in gpu["monitors"]:
-                        mon_name_l = mon["name"].lower()
-                        if any(e.lower() in mon_name_l or mon_name_l in e.lower() for e in av.get("eld_monitors", [])):
-                            if "audio_video" not in mon:
-                                mon["audio_video"] = []
-                            mon["audio_video"].append(av)
-                            paired = True
-                            break
-                    
-                    if not paired:
-                        # Fallback: if there's only 1 monitor, just pair it
-                        if len(gpu["monitors"]) == 1:
-                            mon = gpu["monitors"][0]
-                            if "audio_video" not in mon:
-                                mon["audio_video"] = []
-                            mon["audio_video"].append(av)
-                            paired = True
-                    
-                    if not paired:
-                        gpu["audio_video"].append(av)
-                        
-                    trapped = True
-                    break
-            if not trapped:
+            gpu = gpu_index.find_owner(av.get("syspath", ""))
+            if gpu is not None and self._trap_av(av, graphics, gpu_index):
+                changes.append(("remove", "av", av))
+                changed_gpus[id(gpu)] = gpu
+            else:
                 filtered_av.append(av)
-                
+        changes += [("change", "graphics", gpu) for gpu in changed_gpus.values()]
+
         # Do the same check to hide generic USB nodes containing these interfaces
-        combined_syspaths = [inp.get("syspath", "") for inp in inputs if "syspath" in inp] + \
-                            [av.get("syspath", "") for av in av_devices if "syspath" in av]
-        
-        def _hide_used_usb(nodes):
-            for node in nodes:
-                node_sys = node.get("syspath", "")
-                if any(ext_sys.startswith(node_sys) for ext_sys in combined_syspaths):
-                    node["hidden_by_input"] = True
-                if "children" in node:
-                    _hide_used_usb(node["children"])
-                    
-        _hide_used_usb(usb_tree.values())
+        used_index = SyspathIndex([inp["syspath"] for inp in inputs if inp.get("syspath")] +
+                                  [av["syspath"] for av in av_devices if av.get("syspath")])
+        self._hide_used_usb(usb_tree.values(), used_index)
+        stack = list(usb_tree.values())
+        while stack:
+            node = stack.pop()
+            if node.get("hidden_by_input"):
+                changes.append(("change", "usb", node))
+            stack.extend(node.get("children", []))
+
+        self.timings["merge"] = time.perf_counter() - merge_start
+        self.timings["total"] = time.perf_counter() - total_start
+        yield from changes
         
-        return {
-            "usb": usb_tree,
-            "graphics": graphics,
-            "inputs": inputs,
-            "av": filtered_av
-        }
+        yield ("done", "all", DeviceRegistry(
+            usb=usb_tree,
+            graphics=graphics,
+            inputs=inputs,
+            av=filtered_av
+        ))
+
+    def full_scan(self, parallel=False, max_workers=4):
+        """
+        Runs all hardware scans and returns a DeviceRegistry ({"usb", "graphics", "inputs", "av"}).
+        With parallel=True the USB, DRM, input and AV scans run on a bounded thread pool;
+        their results are merged in a fixed order so the output matches a serial scan.
+        Per-phase wall-clock times are recorded in self.timings.
+        """
+        for action, _, item in self.iter_scan(parallel=parallel, max_workers=max_workers):
+            if action == "done":
+                return item
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Session helper: started once per application session (one pkexec prompt) with one end of
+a socketpair as stdin/stdout, it serves requests until that socket closes. Only the
+process that spawned it holds the other end, so no further authorization is needed.
+
+Frames are [u32 length][u8 kind][payload]; kind "J" carries one JSON object. Requests
+carry an "id" and an "op"; the reply echoes the id with "ok" (and "error" on failure).
+Streaming requests also send {"id": ..., "event": ...} frames.
+
+Input events travel as kind "E" frames instead: [u32 request id] followed by 18-byte
+records [u16 device index][u16 type][u16 code][i32 value][u64 kernel timestamp, us].
+The identify reply carries the table mapping device indexes to persistent_ids, so each
+event costs a fixed 18 bytes however long the IDs are.
+
+    hello                                     -> {"pid", "version"}
+    identify devices=[[node, persistent_id]]  -> {"opened", "table", "hotplug"}, then "E" frames with the key events
+             [types=[1]] [debounce_ms=0]         and {"event": "device", "action": "add"/"remove", "index",
+                                                 "persistent_id", "node", "syspath", "name"} as nodes come and go
+    stats target=<identify id>                -> {"stats"}: the session's event counters and the helper's CPU time
+    cancel target=<identify id>               -> {"stats"} of the ended session
+    open path=/dev/input/eventN               -> reply with the opened fd attached (SCM_RIGHTS)
+    apply changes=<changes.json>              -> {"event": "progress", ...} per step, then {"failed"}
+    quit
+"""
+import os
+import sys
+import json
+import stat
+import array
+import select
+import socket
+import time
+import struct
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+PROTOCOL_VERSION = 2
+KIND_JSON = ord("J")
+KIND_INPUT = ord("E")
+_HEADER = struct.Struct("!IB")
+_BATCH = struct.Struct("!I")
+_RECORD = struct.Struct("!HHHiQ")
+INPUT_DIR = "/dev/input/"
+EV_KEY = 1
+
+
+def encode_frame(kind, payload):
+    return _HEADER.pack(len(payload), kind) + payload
+
+
+def encode_message(message):
+    return encode_frame(KIND_JSON, json.dumps(message).encode())
+
+
+def encode_records(request_id, records):
+    """One "E" frame for records [(device index, type, code, value, timestamp_us)]."""
+    return encode_frame(KIND_INPUT, _BATCH.pack(request_id) + b"".join(_RECORD.pack(*r) for r in records))
+
+
+def decode_records(payload):
+    """(request id, [(device index, type, code, value, timestamp_us)]) of an "E" frame payload."""
+    (request_id,) = _BATCH.unpack_from(payload)
+    return request_id, list(_RECORD.iter_unpack(payload[_BATCH.size:]))
+
+
+def _cpu_seconds():
+    times = os.times()
+    return times.user + times.system
+
+
+class FrameReader:
+    """Reassembles frames from arbitrary chunks of the byte stream."""
+
+    def __init__(self):
+        self.buffer = b""
+
+    def feed(self, data):
+        """Complete (kind, payload) frames in data and whatever was buffered before it."""
+        self.buffer += data
+        frames = []
+        while len(self.buffer) >= _HEADER.size:
+            length, kind = _HEADER.unpack_from(self.buffer)
+            end = _HEADER.size + length
+            if len(self.buffer) < end:
+                break
+            frames.append((kind, self.buffer[_HEADER.size:end]))
+            self.buffer = self.buffer[end:]
+        return frames
+
+
+class SessionHelper:
+    def __init__(self, sock):
+        self.sock = sock
+        self.epoll = select.epoll()
+        self.epoll.register(sock.fileno(), select.EPOLLIN)
+        self.reader = FrameReader()
+        self.identify = {}  # request id -> InputWatcher
+        self.started = {}  # request id -> (monotonic time, helper CPU seconds) when identify began
+        self.hotplug = None  # UeventMonitor while any identify session runs
+        self.running = True
+
+    def send(self, message, fds=()):
+        data = encode_message(message)
+        if fds:
+            self.sock.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))])
+        else:
+            self.sock.sendall(data)
+
+    def handle(self, request):
+        request_id = request.get("id")
+        handler = getattr(self, "op_" + str(request.get("op")), None)
+        if handler is None:
+            self.send({"id": request_id, "ok": False, "error": f"unknown op {request.get('op')!r}"})
+            return
+        try:
+            handler(request_id, request)
+        except Exception as e:
+            self.send({"id": request_id, "ok": False, "error": str(e)})
+
+    def op_hello(self, request_id, request):
+        self.send({"id": request_id, "ok": True, "pid": os.getpid(), "version": PROTOCOL_VERSION})
+
+    def op_identify(self, request_id, request):
+        from src.core.evdev_listener import InputWatcher
+
+        watcher = InputWatcher(self.epoll, types=request.get("types", [EV_KEY]),
+                               debounce_ms=request.get("debounce_ms", 0))
+        for path, pid in request.get("devices", []):
+            if os.path.realpath(path).startswith(INPUT_DIR):
+                watcher.add(path, pid)
+        self.start_hotplug()
+        if not watcher.devices and self.hotplug is None:
+            self.send({"id": request_id, "ok": False, "error": "no input devices could be opened"})
+            return
+        self.identify[request_id] = watcher
+        self.started[request_id] = (time.monotonic(), _cpu_seconds())
+        self.send({"id": request_id, "ok": True, "opened": len(watcher.devices), "table": watcher.table,
+                   "hotplug": self.hotplug is not None})
+
+    def session_stats(self, target):
+        watcher = self.identify.get(target)
+        if watcher is None:
+            raise ValueError(f"no identify session {target!r}")
+        wall, cpu = self.started[target]
+        wall_s = time.monotonic() - wall
+        cpu_s = _cpu_seconds() - cpu
+        return {**watcher.stats, "devices": len(watcher.devices), "wall_s": round(wall_s, 3),
+                "cpu_s": round(cpu_s, 3), "cpu_percent": round(100 * cpu_s / wall_s, 2) if wall_s else 0.0}
+
+    def op_stats(self, request_id, request):
+        self.send({"id": request_id, "ok": True, "stats": self.session_stats(request.get("target"))})
+
+    def op_cancel(self, request_id, request):
+        target = request.get("target")
+        stats = self.session_stats(target) if target in self.identify else None
+        watcher = self.identify.pop(target, None)
+        self.started.pop(target, None)
+        if watcher:
+            watcher.close()
+        if not self.identify:
+            self.stop_hotplug()
+        self.send({"id": request_id, "ok": True, "stats": stats})
+
+    def start_hotplug(self):
+        if self.hotplug is not None:
+            return
+        from src.core.hotplug import UeventMonitor
+        try:
+            self.hotplug = UeventMonitor()
+        except OSError:
+            # No netlink access: identify still works for the devices present at start
+            return
+        self.epoll.register(self.hotplug.fileno(), select.EPOLLIN)
+
+    def stop_hotplug(self):
+        if self.hotplug is not None:
+            self.epoll.unregister(self.hotplug.fileno())
+            self.hotplug.close()
+            self.hotplug = None
+
+    def announce(self, request_id, action, index, pid, node, syspath="", name=""):
+        self.send({"id": request_id, "event": "device", "action": action, "index": index,
+                   "persistent_id": pid, "node": node, "syspath": syspath, "name": name})
+
+    def read_uevents(self):
+        from src.core.evdev_listener import input_node_event
+
+        for event in self.hotplug.receive():
+            change = input_node_event(event)
+            if change is None:
+                continue
+            action, node, syspath, pid, name = change
+            if not os.path.realpath(node).startswith(INPUT_DIR):
+                continue
+            for request_id, watcher in self.identify.items():
+                if action == "add":
+                    index = watcher.add(node, pid)
+                    if index is not None:
+                        self.announce(request_id, "add", index, pid, node, syspath, name)
+                else:
+                    fd = watcher.find(node)
+                    if fd is not None:
+                        index = watcher.remove(fd)
+                        self.announce(request_id, "remove", index, watcher.table[index], node, syspath)
+
+    def op_open(self, request_id, request):
+        path = os.path.realpath(request.get("path", ""))
+        if not path.startswith(INPUT_DIR) or not stat.S_ISCHR(os.stat(path).st_mode):
+            raise ValueError(f"not an input device node: {request.get('path')!r}")
+        fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+        try:
+            self.send({"id": request_id, "ok": True, "path": path}, fds=[fd])
+        finally:
+            os.close(fd)
+
+    def op_apply(self, request_id, request):
+        from src.core.apply_helper import validate_request, apply_changes
+
+        with open(request.get("changes", ""), "r") as f:
+            changes = json.load(f)
+        validate_request(changes)
+        failed = apply_changes(changes, emit=lambda event: self.send({"id": request_id, "event": "progress", **event}))
+        self.send({"id": request_id, "ok": not failed, "failed": failed})
+
+    def op_quit(self, request_id, request):
+        self.send({"id": request_id, "ok": True})
+        self.running = False
+
+    def read_input(self, fd, pending):
+        for request_id, watcher in self.identify.items():
+            if fd in watcher.devices:
+                _, index, node = watcher.devices[fd]
+                records = watcher.read(fd)
+                if records is None:
+                    self.announce(request_id, "remove", index, watcher.table[index], node)
+                elif records:
+                    pending.setdefault(request_id, []).extend(records)
+                return
+
+    def serve(self):
+        pending = {}  # request id -> records read in this wakeup
+        try:
+            while self.running:
+                for fd, _ in self.epoll.poll():
+                    if fd == self.sock.fileno():
+                        data = self.sock.recv(65536)
+                        if not data:
+                            return
+                        for kind, payload in self.reader.feed(data):
+                            if kind == KIND_JSON:
+                                self.handle(json.loads(payload))
+                        continue
+                    if self.hotplug is not None and fd == self.hotplug.fileno():
+                        self.read_uevents()
+                        continue
+                    self.read_input(fd, pending)
+                if pending:
+                    # Everything that arrived in one wakeup goes out as one frame per session
+                    self.sock.sendall(b"".join(encode_records(request_id, records)
+                                               for request_id, records in pending.items()))
+                    pending.clear()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            for watcher in self.identify.values():
+                watcher.close()
+            self.stop_hotplug()
+            self.epoll.close()
+
+
+def main():
+    sock = socket.socket(fileno=os.dup(0))
+    # stdout is the same socket; keep stray prints out of the frame stream
+    sys.stdout = sys.stderr
+    SessionHelper(sock).serve()
+
+
+if __name__ == "__main__":
+    main()
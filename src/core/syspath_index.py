@@ -0,0 +1,64 @@
+import re
+import bisect
+
+# "0000:07:00.1" -> device "0000:07:00", function 1. Some hosts (VMD) use 5+ digit domains.
+_PCI_FUNCTION_RE = re.compile(r"^([0-9a-f]{4,}:[0-9a-f]{2}:[0-9a-f]{2})\.[0-7]$")
+
+
+def pci_device_of(component):
+    """Returns the function-less PCI address for a sysfs path component, or None."""
+    match = _PCI_FUNCTION_RE.match(component)
+    return match.group(1) if match else None
+
+
+class SyspathIndex:
+    """
+    Sorted index over sysfs device paths.
+    find_owner() walks a path's ancestors and returns the value registered for the
+    nearest one, where a PCI device entry claims every function of that device
+    (a GPU at 0000:07:00.0 owns the HDMI audio at 0000:07:00.1). has_descendant()
+    answers "does anything indexed live at or below this path" with one bisect.
+    """
+
+    def __init__(self, paths=()):
+        self._owners = {}
+        self._pci_owners = {}
+        self._sorted = sorted(set(p.rstrip("/") for p in paths if p))
+
+    def add(self, path, value=None):
+        path = path.rstrip("/")
+        self._owners[path] = value
+        pos = bisect.bisect_left(self._sorted, path)
+        if pos == len(self._sorted) or self._sorted[pos] != path:
+            self._sorted.insert(pos, path)
+
+    def add_pci_device(self, pci_device, value):
+        """Registers value as the owner of every function of pci_device ("0000:07:00")."""
+        self._pci_owners[pci_device] = value
+
+    def find_owner(self, path):
+        path = path.rstrip("/")
+        while path and path != "/":
+            if path in self._owners:
+                return self._owners[path]
+            parent, _, component = path.rpartition("/")
+            if self._pci_owners:
+                pci_device = pci_device_of(component)
+                if pci_device in self._pci_owners:
+                    return self._pci_owners[pci_device]
+            path = parent
+        return None
+
+    def has_descendant(self, path):
+        """True if an indexed path equals path or lies below it."""
+        path = path.rstrip("/")
+        if not path:
+            return bool(self._sorted)
+        pos = bisect.bisect_left(self._sorted, path)
+        if pos < len(self._sorted) and self._sorted[pos] == path:
+            return True
+        pos = bisect.bisect_left(self._sorted, path + "/", pos)
+        return pos < len(self._sorted) and self._sorted[pos].startswith(path + "/")
+
+    def __len__(self):
+        return len(self._sorted) + len(self._pci_owners)
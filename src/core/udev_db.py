@@ -0,0 +1,191 @@
+import os
+import subprocess
+
+UDEV_DATA_DIR = "/run/udev/data"
+
+
+class UdevDatabase:
+    """
+    In-memory index of the udev device database, keyed by resolved syspath.
+    Built once per scan so that property lookups never fork `udevadm`.
+    """
+
+    def __init__(self, records=None):
+        # syspath -> {"properties": {KEY: VALUE}, "tags": set()}
+        self.records = records or {}
+
+    @classmethod
+    def load(cls, data_dir=UDEV_DATA_DIR, root="/"):
+        """
+        Reads every entry of /run/udev/data. Falls back to a single
+        `udevadm info --export-db` dump if the directory is unavailable.
+        With an alternate root (synthetic topologies) only the data directory is read.
+        """
+        root = os.path.abspath(root)
+        if root != "/":
+            return cls(cls._read_data_dir(os.path.join(root, data_dir.lstrip("/")), root) or {})
+        records = cls._read_data_dir(data_dir)
+        if records is None:
+            records = cls._read_export_db()
+        return cls(records or {})
+
+    @staticmethod
+    def _parse_record(lines):
+        properties = {}
+        tags = set()
+        for line in lines:
+            if len(line) < 3 or line[1] != ":":
+                continue
+            kind, value = line[0], line[2:].strip()
+            if kind == "E" and "=" in value:
+                key, val = value.split("=", 1)
+                properties[key] = val
+            elif kind == "G" and value:
+                tags.add(value)
+        # `--export-db` dumps only carry tags through the TAGS property
+        if not tags and properties.get("TAGS"):
+            tags.update(t for t in properties["TAGS"].split(":") if t)
+        return {"properties": properties, "tags": tags}
+
+    @staticmethod
+    def _syspath_for_entry(name, net_index, root="/"):
+        """Maps a /run/udev/data filename (c13:64, b8:0, n3, +usb:1-1) to its canonical syspath."""
+        candidate = None
+        if name[0] in ("c", "b") and ":" in name:
+            kind = "char" if name[0] == "c" else "block"
+            candidate = f"/sys/dev/{kind}/{name[1:]}"
+        elif name[0] == "n":
+            candidate = net_index.get(name[1:])
+        elif name[0] == "+" and ":" in name:
+            subsystem, sysname = name[1:].split(":", 1)
+            candidate = f"/sys/bus/{subsystem}/devices/{sysname}"
+            if not os.path.exists(os.path.join(root, candidate[1:])):
+                candidate = f"/sys/class/{subsystem}/{sysname}"
+
+        if not candidate:
+            return None
+        host_candidate = os.path.join(root, candidate[1:])
+        if not os.path.exists(host_candidate):
+            return None
+        real = os.path.realpath(host_candidate)
+        if root != "/" and real.startswith(root + "/"):
+            real = real[len(root):]
+        return real
+
+    @staticmethod
+    def _read_net_index(root="/"):
+        net_index = {}
+        net_dir = "/sys/class/net"
+        try:
+            for iface in os.listdir(os.path.join(root, net_dir[1:])):
+                try:
+                    with open(os.path.join(root, net_dir[1:], iface, "ifindex"), "r") as f:
+                        net_index[f.read().strip()] = os.path.join(net_dir, iface)
+                except OSError:
+                    continue
+        except OSError:
+            pass
+        return net_index
+
+    @classmethod
+    def _read_data_dir(cls, data_dir, root="/"):
+        try:
+            entries = os.listdir(data_dir)
+        except OSError:
+            return None
+
+        records = {}
+        net_index = None
+        for name in entries:
+            if not name:
+                continue
+            if name[0] == "n" and net_index is None:
+                net_index = cls._read_net_index(root)
+            syspath = cls._syspath_for_entry(name, net_index or {}, root)
+            if not syspath:
+                continue
+            try:
+                with open(os.path.join(data_dir, name), "r", errors="replace") as f:
+                    records[syspath] = cls._parse_record(f.read().splitlines())
+            except OSError:
+                continue
+        return records
+
+    @classmethod
+    def _read_export_db(cls):
+        try:
+            res = subprocess.run(["udevadm", "info", "--export-db"],
+                                 capture_output=True, text=True, check=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+        return cls.parse_export_db(res.stdout)
+
+    @classmethod
+    def parse_export_db(cls, text):
+        """Parses `udevadm info --export-db` output (P:/E:/G: blocks separated by blank lines)."""
+        records = {}
+        devpath = None
+        lines = []
+        for line in text.splitlines() + [""]:
+            if not line.strip():
+                if devpath:
+                    records["/sys" + devpath] = cls._parse_record(lines)
+                devpath = None
+                lines = []
+            elif line.startswith("P: "):
+                devpath = line[3:].strip()
+            else:
+                lines.append(line)
+        return records
+
+    def properties(self, syspath):
+        record = self.records.get(syspath)
+        return record["properties"] if record else {}
+
+    def get_property(self, syspath, property_name):
+        return self.properties(syspath).get(property_name)
+
+    def tags(self, syspath):
+        record = self.records.get(syspath)
+        return record["tags"] if record else set()
+
+    def __len__(self):
+        return len(self.records)
+
+
+def read_seat_assignments(data_dir=UDEV_DATA_DIR, root="/"):
+    """
+    {syspath: seat} for every device udev has tagged "seat" with an ID_SEAT other than seat0,
+    which is where logind's seat membership comes from. One sweep of /run/udev/data; only
+    entries that mention ID_SEAT are parsed and resolved to a syspath, so this is much
+    cheaper than UdevDatabase.load(). Returns None if the directory cannot be read.
+    """
+    root = os.path.abspath(root)
+    host_dir = data_dir if root == "/" else os.path.join(root, data_dir.lstrip("/"))
+    try:
+        entries = os.listdir(host_dir)
+    except OSError:
+        return None
+
+    assignments = {}
+    net_index = None
+    for name in entries:
+        if not name:
+            continue
+        try:
+            with open(os.path.join(host_dir, name), "r", errors="replace") as f:
+                text = f.read()
+        except OSError:
+            continue
+        if "E:ID_SEAT=" not in text:
+            continue
+        record = UdevDatabase._parse_record(text.splitlines())
+        seat = record["properties"].get("ID_SEAT")
+        if not seat or seat == "seat0" or "seat" not in record["tags"]:
+            continue
+        if name[0] == "n" and net_index is None:
+            net_index = UdevDatabase._read_net_index(root)
+        syspath = UdevDatabase._syspath_for_entry(name, net_index or {}, root)
+        if syspath:
+            assignments[syspath] = seat
+    return assignments
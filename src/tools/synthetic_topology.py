@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Builds fake sysfs/procfs/udev trees for benchmarking and regression-testing the
+hardware scanner without real hardware. Point HardwareScanner(root=...) at the result.
+
+    python -m src.tools.synthetic_topology --seats 2 8 16 64
+"""
+import os
+import sys
+import math
+import time
+import shutil
+import argparse
+import tempfile
+
+EV_KEYBOARD = "120013"   # SYN, KEY, MSC, LED, REP
+EV_MOUSE = "17"          # SYN, KEY, REL, MSC
+KEYS_KEYBOARD = "fffffffffffffffe ffffffffffffffff ffffffffffffffff"
+KEYS_MOUSE = "1f0000 0 0 0 0"
+
+MONITOR_MODELS = [("DEL", "DELL U2720Q"), ("SAM", "LS27A600U"), ("GSM", "LG HDR 4K"), ("BNQ", "BenQ GW2480")]
+
+PCI_IDS = """10de  NVIDIA Corporation
+\t1aef  GA102 High Definition Audio Controller
+\t2206  GA102 [GeForce RTX 3080]
+\t\t1043 87b3  TUF Gaming GeForce RTX 3080
+8086  Intel Corporation
+\t15e9  Thunderbolt 3 USB Controller
+"""
+
+
+def build_edid(mfg, name):
+    """Returns a 128-byte EDID base block carrying a manufacturer ID and a monitor-name descriptor."""
+    edid = bytearray(128)
+    edid[0:8] = b"\x00\xff\xff\xff\xff\xff\xff\x00"
+    mfg_id = 0
+    for ch in mfg:
+        mfg_id = (mfg_id << 5) | (ord(ch) - ord('A') + 1)
+    edid[8] = (mfg_id >> 8) & 0xff
+    edid[9] = mfg_id & 0xff
+    text = name.encode("ascii")[:13]
+    text = text + b"\x0a" + b" " * (12 - len(text)) if len(text) < 13 else text
+    edid[54:72] = b"\x00\x00\x00\xfc\x00" + text
+    edid[127] = (-sum(edid[:127])) & 0xff
+    return bytes(edid)
+
+
+class TopologyBuilder:
+    """Writes one synthetic machine under root. Paths passed around are canonical (/sys/...)."""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.counters = {"event": 0, "input": 0, "sound": 1, "usbdev": 1, "hid": 1}
+        self.stats = {"gpus": 0, "connectors": 0, "monitors": 0, "usb_devices": 0, "event_nodes": 0, "sound_cards": 0}
+
+    def host(self, path):
+        return os.path.join(self.root, path.lstrip("/"))
+
+    def write(self, path, content, mode="w"):
+        host = self.host(path)
+        os.makedirs(os.path.dirname(host), exist_ok=True)
+        with open(host, mode) as f:
+            f.write(content)
+
+    def mkdir(self, path):
+        os.makedirs(self.host(path), exist_ok=True)
+
+    def link(self, link_path, target_path):
+        """Relative symlink, like the kernel's /sys/class and /sys/bus entries."""
+        link_host = self.host(link_path)
+        os.makedirs(os.path.dirname(link_host), exist_ok=True)
+        if not os.path.lexists(link_host):
+            os.symlink(os.path.relpath(self.host(target_path), os.path.dirname(link_host)), link_host)
+
+    def udev_record(self, name, properties, tags=()):
+        lines = [f"E:{key}={value}" for key, value in properties.items()]
+        lines += [f"G:{tag}" for tag in tags]
+        self.write(f"/run/udev/data/{name}", "\n".join(lines) + "\n")
+
+    def char_device(self, syspath, major, minor):
+        self.write(f"{syspath}/dev", f"{major}:{minor}\n")
+        self.link(f"/sys/dev/char/{major}:{minor}", syspath)
+
+    # -- PCI / DRM -------------------------------------------------------
+
+    def pci_function(self, syspath, addr, vendor, device, cls, subsystem=(0x1043, 0x87b3)):
+        self.write(f"{syspath}/vendor", f"0x{vendor:04x}\n")
+        self.write(f"{syspath}/device", f"0x{device:04x}\n")
+        self.write(f"{syspath}/subsystem_vendor", f"0x{subsystem[0]:04x}\n")
+        self.write(f"{syspath}/subsystem_device", f"0x{subsystem[1]:04x}\n")
+        self.write(f"{syspath}/class", f"0x{cls:06x}\n")
+        self.write(f"{syspath}/uevent", f"PCI_SLOT_NAME={addr}\n")
+        self.link(f"/sys/bus/pci/devices/{addr}", syspath)
+
+    def add_gpu(self, index, connectors, connected):
+        bus = index + 1
+        bridge = f"/sys/devices/pci0000:00/0000:00:{1 + index // 8:02x}.{index % 8}"
+        gpu_addr = f"0000:{bus:02x}:00.0"
+        audio_addr = f"0000:{bus:02x}:00.1"
+        gpu_path = f"{bridge}/{gpu_addr}"
+        audio_path = f"{bridge}/{audio_addr}"
+        self.pci_function(gpu_path, gpu_addr, 0x10de, 0x2206, 0x030000)
+        self.pci_function(audio_path, audio_addr, 0x10de, 0x1aef, 0x040300)
+
+        card = f"{gpu_path}/drm/card{index}"
+        self.mkdir(card)
+        self.link(f"{card}/device", gpu_path)
+        self.link(f"/sys/class/drm/card{index}", card)
+        self.char_device(card, 226, index)
+        self.udev_record(f"c226:{index}", {"ID_PATH": f"pci-{gpu_addr}", "ID_FOR_SEAT": f"drm-pci-{gpu_addr.replace(':', '_').replace('.', '_')}"},
+                         tags=("seat", "master-of-seat", "uaccess"))
+        self.stats["gpus"] += 1
+
+        monitor_names = []
+        for c in range(connectors):
+            conn = f"card{index}-DP-{c + 1}"
+            conn_path = f"{card}/{conn}"
+            is_connected = c < connected
+            self.write(f"{conn_path}/status", "connected\n" if is_connected else "disconnected\n")
+            if is_connected:
+                mfg, model = MONITOR_MODELS[(index + c) % len(MONITOR_MODELS)]
+                self.write(f"{conn_path}/edid", build_edid(mfg, model), mode="wb")
+                monitor_names.append(model)
+                self.stats["monitors"] += 1
+            self.link(f"/sys/class/drm/{conn}", conn_path)
+            self.stats["connectors"] += 1
+
+        # HDMI/DP audio function with one ELD file per connector
+        self.add_sound_card(audio_path, audio_addr, "NVidia", monitor_names)
+
+    # -- Sound -----------------------------------------------------------
+
+    def add_sound_card(self, pci_path, pci_addr, card_id, eld_monitors=()):
+        number = self.counters["sound"]
+        self.counters["sound"] += 1
+        card_path = f"{pci_path}/sound/card{number}"
+        self.write(f"{card_path}/id", f"{card_id}\n")
+        self.link(f"/sys/class/sound/card{number}", card_path)
+        self.udev_record(f"+sound:card{number}", {"ID_PATH": f"pci-{pci_addr}"}, tags=("seat",))
+        for i, monitor in enumerate(eld_monitors):
+            self.write(f"/proc/asound/card{number}/eld#{i}.0",
+                       f"monitor_present\t\t1\neld_valid\t\t1\nmonitor_name\t\t{monitor}\n")
+        self.stats["sound_cards"] += 1
+
+    # -- USB / input -------------------------------------------------------
+
+    def add_usb_device(self, syspath, name, manufacturer, product, is_hub, id_path):
+        self.write(f"{syspath}/manufacturer", f"{manufacturer}\n")
+        self.write(f"{syspath}/product", f"{product}\n")
+        self.write(f"{syspath}/bDeviceClass", "09\n" if is_hub else "00\n")
+        self.link(f"/sys/bus/usb/devices/{name}", syspath)
+        minor = self.counters["usbdev"]
+        self.counters["usbdev"] += 1
+        self.char_device(syspath, 189, minor)
+        self.udev_record(f"c189:{minor}", {"ID_PATH": id_path, "ID_SERIAL": f"{manufacturer}_{product}_{minor}".replace(" ", "_")},
+                         tags=("seat",) if is_hub else ())
+        self.stats["usb_devices"] += 1
+
+    def add_input_nodes(self, iface_path, phys, id_path, nodes):
+        """nodes: list of (name, ev_bits, key_bits). All nodes share one phys path (one logical device)."""
+        hid = self.counters["hid"]
+        self.counters["hid"] += 1
+        for node_name, ev_bits, key_bits in nodes:
+            input_n = self.counters["input"]
+            event_n = self.counters["event"]
+            self.counters["input"] += 1
+            self.counters["event"] += 1
+            input_path = f"{iface_path}/0003:046D:C31C.{hid:04X}/input/input{input_n}"
+            self.write(f"{input_path}/name", f"{node_name}\n")
+            self.write(f"{input_path}/phys", f"{phys}\n")
+            self.write(f"{input_path}/capabilities/ev", f"{ev_bits}\n")
+            self.write(f"{input_path}/capabilities/key", f"{key_bits}\n")
+            event_path = f"{input_path}/event{event_n}"
+            self.mkdir(event_path)
+            self.link(f"{event_path}/device", input_path)
+            self.link(f"/sys/class/input/event{event_n}", event_path)
+            self.link(f"/sys/class/input/input{input_n}", input_path)
+            self.char_device(event_path, 13, 64 + event_n)
+            self.udev_record(f"c13:{64 + event_n}", {"ID_PATH": id_path, "ID_INPUT": "1"}, tags=("seat", "uaccess"))
+            self.stats["event_nodes"] += 1
+
+    def add_usb_controller(self, index):
+        bus = index + 1
+        if index == 0:
+            pci_path = "/sys/devices/pci0000:00/0000:00:14.0"
+            addr = "0000:00:14.0"
+        else:
+            domain_bus = 0x40 + index
+            addr = f"0000:{domain_bus:02x}:00.0"
+            pci_path = f"/sys/devices/pci0000:{domain_bus:02x}/{addr}"
+        self.pci_function(pci_path, addr, 0x8086, 0x15e9, 0x0c0330)
+        root_hub = f"{pci_path}/usb{bus}"
+        self.add_usb_device(root_hub, f"usb{bus}", "Linux 6.8.0 xhci-hcd", "xHCI Host Controller", True, f"pci-{addr}")
+        return root_hub, bus, addr
+
+    def add_desk(self, controller, port, hub_depth, desk_index):
+        """A hub chain hub_depth deep with a keyboard and a mouse on the last hub."""
+        root_hub, bus, addr = controller
+        name = f"{bus}-{port}"
+        path = f"{root_hub}/{name}"
+        port_path = f"{port}"
+        for depth in range(hub_depth):
+            self.add_usb_device(path, name, "Generic", "USB2.1 Hub", True, f"pci-{addr}-usb-0:{port_path}")
+            if depth < hub_depth - 1:
+                name = f"{name}.1"
+                path = f"{path}/{name}"
+                port_path = f"{port_path}.1"
+
+        hub_name, hub_path, hub_port = name, path, port_path
+        if hub_depth == 0:
+            hub_name, hub_path, hub_port = f"usb{bus}", root_hub, ""
+
+        def child(port_no):
+            if hub_depth == 0:
+                return f"{bus}-{port + port_no - 1}", f"{root_hub}/{bus}-{port + port_no - 1}", f"{port + port_no - 1}"
+            return f"{hub_name}.{port_no}", f"{hub_path}/{hub_name}.{port_no}", f"{hub_port}.{port_no}"
+
+        kb_name, kb_path, kb_port = child(2)
+        self.add_usb_device(kb_path, kb_name, "Logitech", f"K120 Keyboard {desk_index}", False, f"pci-{addr}-usb-0:{kb_port}")
+        kb_iface = f"{kb_path}/{kb_name}:1.0"
+        self.link(f"/sys/bus/usb/devices/{kb_name}:1.0", kb_iface)
+        self.add_input_nodes(kb_iface, f"usb-{addr}-{kb_port}/input0", f"pci-{addr}-usb-0:{kb_port}:1.0", [
+            (f"Logitech K120 {desk_index} Keyboard", EV_KEYBOARD, KEYS_KEYBOARD),
+            (f"Logitech K120 {desk_index} Consumer Control", "13", "3ff 0 0 0"),
+        ])
+
+        mouse_name, mouse_path, mouse_port = child(3)
+        self.add_usb_device(mouse_path, mouse_name, "Logitech", f"G203 Mouse {desk_index}", False, f"pci-{addr}-usb-0:{mouse_port}")
+        mouse_iface = f"{mouse_path}/{mouse_name}:1.0"
+        self.link(f"/sys/bus/usb/devices/{mouse_name}:1.0", mouse_iface)
+        self.add_input_nodes(mouse_iface, f"usb-{addr}-{mouse_port}/input0", f"pci-{addr}-usb-0:{mouse_port}:1.0", [
+            (f"Logitech G203 {desk_index} Mouse", EV_MOUSE, KEYS_MOUSE),
+        ])
+
+
+def generate_topology(root, gpus=2, connectors=2, connected=None, desks=2, hub_depth=1,
+                      ports_per_controller=8, extra_inputs=0, onboard_sound=True):
+    """
+    Writes a synthetic machine under root and returns a dict of generated device counts.
+    gpus x connectors DRM connectors (the first `connected` per GPU carry EDID blobs and an
+    ELD entry on the GPU's HDMI audio function), `desks` USB hub chains hub_depth deep with a
+    keyboard and mouse each, and extra_inputs additional keyboards straight on the root hubs.
+    """
+    builder = TopologyBuilder(root)
+    connected = connectors if connected is None else min(connected, connectors)
+    for d in ("/sys/bus/usb/devices", "/sys/class/drm", "/sys/class/input", "/sys/class/sound", "/run/udev/data"):
+        builder.mkdir(d)
+    builder.write("/proc/sys/kernel/random/boot_id", "00000000-0000-4000-8000-000000000000\n")
+    builder.write("/usr/share/hwdata/pci.ids", PCI_IDS)
+
+    for i in range(gpus):
+        builder.add_gpu(i, connectors, connected)
+
+    if onboard_sound:
+        pch = "/sys/devices/pci0000:00/0000:00:1f.3"
+        builder.pci_function(pch, "0000:00:1f.3", 0x8086, 0xa348, 0x040300)
+        builder.add_sound_card(pch, "0000:00:1f.3", "PCH")
+
+    total_usb_slots = desks + extra_inputs
+    controllers = [builder.add_usb_controller(i)
+                   for i in range(max(1, math.ceil(total_usb_slots / ports_per_controller)))]
+    for desk in range(desks):
+        controller = controllers[desk // ports_per_controller]
+        # Each desk on a root port of its own; ports step by 3 so hub_depth=0 desks do not collide
+        builder.add_desk(controller, 1 + (desk % ports_per_controller) * 3, hub_depth, desk)
+    for extra in range(extra_inputs):
+        slot = desks + extra
+        controller = controllers[slot // ports_per_controller]
+        builder.add_desk(controller, 1 + (slot % ports_per_controller) * 3, 0, slot)
+
+    return builder.stats
+
+
+def topology_for_seats(seats):
+    """Scaling preset: one monitor, keyboard and mouse per seat, four connectors per GPU."""
+    return {
+        "gpus": max(1, math.ceil(seats / 4)),
+        "connectors": 4,
+        "connected": min(4, seats),
+        "desks": seats,
+        "hub_depth": 2,
+    }
+
+
+def topology_for_devices(count):
+    """Scaling preset by rough device count: each desk adds two hubs, two USB devices and three event nodes."""
+    desks = max(1, round(count / 8))
+    return {
+        "gpus": max(1, math.ceil(desks / 4)),
+        "connectors": 4,
+        "connected": min(4, desks),
+        "desks": desks,
+        "hub_depth": 2,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic sysfs trees and time the hardware scanner on them.")
+    parser.add_argument("--seats", type=int, nargs="+", default=[2, 8, 16, 64])
+    parser.add_argument("--keep", metavar="DIR", help="write the trees under DIR instead of a temporary directory")
+    parser.add_argument("--repeat", type=int, default=3, help="scans per topology (best time is reported)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+    from src.core.config import ConfigManager
+    from src.core.scanner import HardwareScanner
+
+    base = args.keep or tempfile.mkdtemp(prefix="multiseat-topology-")
+    config = ConfigManager(os.path.join(base, "aliases.json"))
+    print(f"{'seats':>6} {'gpus':>5} {'usb':>5} {'events':>7} {'serial ms':>10} {'parallel ms':>12}")
+    try:
+        for seats in args.seats:
+            root = os.path.join(base, f"seats-{seats}")
+            stats = generate_topology(root, **topology_for_seats(seats))
+            scanner = HardwareScanner(config, root=root)
+            best = {}
+            for parallel in (False, True):
+                times = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    scanner.full_scan(parallel=parallel)
+                    times.append(time.perf_counter() - start)
+                best[parallel] = min(times) * 1000
+            print(f"{seats:>6} {stats['gpus']:>5} {stats['usb_devices']:>5} {stats['event_nodes']:>7} "
+                  f"{best[False]:>10.1f} {best[True]:>12.1f}")
+    finally:
+        if not args.keep:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
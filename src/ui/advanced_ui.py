@@ -1,16 +1,20 @@
+import traceback
+
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QLabel, 
     QTreeWidget, QTreeWidgetItem, QScrollArea, QAbstractItemView, QPushButton,
-    QTreeWidgetItemIterator, QMenu
+    QTreeWidgetItemIterator, QMenu, QMessageBox
 )
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QColor, QAction
 
-from src.core.input_listener import InputListenerThread
+from src.ui.hotplug_watcher import HotplugWatcher
+from src.ui.scan_worker import ScanThread
 from src.ui.display_overlay import OverlayManager
 from src.core.executor import ConfigExecutor
-from src.core.backup import save_configuration, load_configuration
-from src.ui.review_dialog import ReviewDialog
+from src.ui.profile_dialogs import save_configuration, load_configuration
+from src.core.registry import DeviceRecord
+from src.core.profile import build_seat_matcher, plan_moves
 
 class DraggableTree(QTreeWidget):
     def __init__(self, title, main_window=None):
@@ -116,6 +120,8 @@ class DraggableTree(QTreeWidget):
             index = source_parent.indexOfChild(item)
             taken_item = source_parent.takeChild(index)
             target_group.addChild(taken_item)
+            if self.main_window:
+                self.main_window.update_prediction()
 
     def dropEvent(self, event):
         source = event.source()
@@ -173,11 +179,20 @@ class DraggableTree(QTreeWidget):
             # Accept event but tell Qt we handled the action to avoid default drop behavior
             event.setDropAction(Qt.DropAction.IgnoreAction)
             event.accept()
+            if self.main_window:
+                self.main_window.update_prediction()
         else:
             event.ignore()
 
     def add_gpu(self, gpu_data):
         gpu_item = QTreeWidgetItem(self.grp_graphics, [gpu_data.get("name")])
+        self.populate_gpu_item(gpu_item, gpu_data)
+        return gpu_item
+
+    def populate_gpu_item(self, gpu_item, gpu_data):
+        """(Re)builds the monitor and audio rows nested under a GPU row."""
+        gpu_item.takeChildren()
+        gpu_item.setText(0, gpu_data.get("name"))
         gpu_item.setData(0, Qt.ItemDataRole.UserRole, {"type": "gpu", "hw": gpu_data})
         for mon in gpu_data.get("monitors", []):
             mon_item = QTreeWidgetItem(gpu_item, [f"📺 {mon.get('name')}"])
@@ -209,6 +224,17 @@ class DraggableTree(QTreeWidget):
         child_item.setData(0, Qt.ItemDataRole.UserRole, {"type": "usb_child", "hw": child_data})
         for grandchild in child_data.get("children", []):
             self._add_usb_child(child_item, grandchild)
+
+    def find_hw_item(self, item_types, syspath):
+        """Returns the row of the given types whose hardware has this syspath, or None."""
+        iterator = QTreeWidgetItemIterator(self)
+        while iterator.value():
+            item = iterator.value()
+            data = item.data(0, Qt.ItemDataRole.UserRole)
+            if data and data.get("type") in item_types and data.get("hw", {}).get("syspath") == syspath:
+                return item
+            iterator += 1
+        return None
             
     def add_input(self, input_data):
         if "error" in input_data:
@@ -221,10 +247,20 @@ class DraggableTree(QTreeWidget):
         av_item.setData(0, Qt.ItemDataRole.UserRole, {"type": "av", "hw": av_data})
 
 
+# Tree row types for each hotplug model category
+HOTPLUG_ITEM_TYPES = {
+    "usb": ["usb_hub", "usb_child"],
+    "graphics": ["gpu"],
+    "inputs": ["input"],
+    "av": ["av"],
+}
+
+
 class AdvancedSetupWindow(QMainWindow):
-    def __init__(self, hardware_data, on_wizard_request=None, initial_mapping=None):
+    def __init__(self, hardware_data, on_wizard_request=None, initial_mapping=None, scanner=None):
         super().__init__()
         self.hardware_data = hardware_data
+        self.scanner = scanner
         self.on_wizard_request = on_wizard_request
         self.initial_mapping = initial_mapping or {}
         self.setWindowTitle("Multiseat Manager - Advanced Manual Setup")
@@ -275,12 +311,22 @@ class AdvancedSetupWindow(QMainWindow):
         btn_apply = QPushButton("Apply Configuration")
         btn_apply.setStyleSheet("background-color: #2b579a; color: white; font-weight: bold; padding: 10px;")
         btn_apply.clicked.connect(self.apply_configuration)
+
+        # Offline check of where the generated rules would put every device
+        self.prediction_label = QLabel("")
+        self.prediction_label.setWordWrap(True)
+        self.simulator = None
         
         btn_save = QPushButton("Save Config...")
         btn_save.clicked.connect(self.save_config)
         
         btn_load = QPushButton("Load Config...")
         btn_load.clicked.connect(self.load_config)
+
+        self.btn_rescan = QPushButton("Rescan Hardware")
+        self.btn_rescan.clicked.connect(self.rescan_hardware)
+        self.btn_rescan.setEnabled(self.scanner is not None)
+        self.scan_thread = None
         
         control_layout.addWidget(btn_wizard)
         control_layout.addSpacing(20)
@@ -290,7 +336,9 @@ class AdvancedSetupWindow(QMainWindow):
         control_layout.addWidget(self.btn_identify_inp)
         control_layout.addWidget(btn_save)
         control_layout.addWidget(btn_load)
+        control_layout.addWidget(self.btn_rescan)
         control_layout.addSpacing(10)
+        control_layout.addWidget(self.prediction_label)
         control_layout.addWidget(btn_apply)
         main_layout.addLayout(control_layout)
         
@@ -306,8 +354,148 @@ class AdvancedSetupWindow(QMainWindow):
         if self.initial_mapping:
             self.apply_mapping(self.initial_mapping)
 
+        # Live hotplug updates: new hubs, keyboards and monitors appear without a restart
+        self.hotplug_watcher = None
+        if self.scanner:
+            self.hotplug_watcher = HotplugWatcher(self.scanner, self.hardware_data, parent=self)
+            self.hotplug_watcher.device_added.connect(self.on_hotplug_added)
+            self.hotplug_watcher.device_removed.connect(self.on_hotplug_removed)
+            self.hotplug_watcher.device_changed.connect(self.on_hotplug_changed)
+
+    def _find_hw_item(self, category, hw):
+        for tree in self.get_all_trees():
+            item = tree.find_hw_item(HOTPLUG_ITEM_TYPES[category], hw.get("syspath"))
+            if item:
+                return tree, item
+        return None, None
+
+    def _add_usb_node(self, hw):
+        if hw.get("hidden_by_input"):
+            return
+        parent_id = self.scanner.usb_parent_id(hw["id"]) if not hw["id"].startswith("usb") else None
+        for tree in self.get_all_trees():
+            iterator = QTreeWidgetItemIterator(tree)
+            while iterator.value():
+                item = iterator.value()
+                data = item.data(0, Qt.ItemDataRole.UserRole)
+                if parent_id and data and data.get("type") in HOTPLUG_ITEM_TYPES["usb"] and data.get("hw", {}).get("id") == parent_id:
+                    tree._add_usb_child(item, hw)
+                    return
+                iterator += 1
+        self.seat0_tree.add_usb_hub(hw)
+
+    def on_hotplug_added(self, category, hw):
+        if category == "usb":
+            self._add_usb_node(hw)
+        elif category == "graphics":
+            self.seat0_tree.add_gpu(hw)
+        elif category == "inputs":
+            self.seat0_tree.add_input(hw)
+        elif category == "av":
+            self.seat0_tree.add_av(hw)
+
+    def on_hotplug_removed(self, category, hw):
+        _, item = self._find_hw_item(category, hw)
+        if item and item.parent():
+            item.parent().removeChild(item)
+
+    def on_hotplug_changed(self, category, hw):
+        if hw is None:
+            self._rebuild_from_model()
+            return
+        tree, item = self._find_hw_item(category, hw)
+        if category == "usb":
+            if item and hw.get("hidden_by_input"):
+                item.parent().removeChild(item)
+            elif not item:
+                self._add_usb_node(hw)
+            else:
+                item.setText(0, hw.get("name"))
+            return
+        if not item:
+            self.on_hotplug_added(category, hw)
+        elif category == "graphics":
+            tree.populate_gpu_item(item, hw)
+        else:
+            data = item.data(0, Qt.ItemDataRole.UserRole)
+            data["hw"] = hw
+            item.setData(0, Qt.ItemDataRole.UserRole, data)
+            item.setText(0, hw.get("name") + (" 🔒" if hw.get("restrict_access") else ""))
+
+    def _rebuild_from_model(self):
+        """Repopulates every tree after a full rescan, keeping current seat placements."""
+        current = self.collect_staging_map()
+        for tree in self.get_all_trees():
+            for grp in [tree.grp_graphics, tree.grp_inputs, tree.grp_av, tree.grp_usb]:
+                grp.takeChildren()
+        self._populate_initial_hardware(self.seat0_tree)
+        self.apply_mapping(current)
+
+    def rescan_hardware(self):
+        """
+        Clears the trees and repopulates seat0 row by row from a streaming scan, so devices
+        appear while slower probes are still running. Seat placements are restored once the
+        scan completes.
+        """
+        if not self.scanner or (self.scan_thread and self.scan_thread.isRunning()):
+            return
+        self._pending_mapping = self.collect_staging_map()
+        for tree in self.get_all_trees():
+            for grp in [tree.grp_graphics, tree.grp_inputs, tree.grp_av, tree.grp_usb]:
+                grp.takeChildren()
+
+        self.btn_rescan.setEnabled(False)
+        self.btn_rescan.setText("Scanning...")
+        self.scan_thread = ScanThread(self.scanner, stream=True)
+        self.scan_thread.device_event.connect(self.on_scan_event)
+        self.scan_thread.scan_finished.connect(self.on_rescan_finished)
+        self.scan_thread.scan_failed.connect(self.on_rescan_failed)
+        self.scan_thread.start()
+
+    def on_scan_event(self, action, category, hw):
+        # Streamed scan events share the hotplug (action, category, item) shape
+        if action == "add":
+            self.on_hotplug_added(category, hw)
+        elif action == "remove":
+            self.on_hotplug_removed(category, hw)
+        else:
+            self.on_hotplug_changed(category, hw)
+
+    def on_rescan_finished(self, registry):
+        # Update in place: the launcher, wizard and hotplug watcher share this registry
+        self.hardware_data.clear()
+        self.hardware_data.update(registry)
+        # The rescan read a fresh udev database
+        self.simulator = None
+        self.apply_mapping(self._pending_mapping)
+        self.btn_rescan.setText("Rescan Hardware")
+        self.btn_rescan.setEnabled(True)
+
+    def on_rescan_failed(self, message):
+        # Fall back to the previous model
+        for tree in self.get_all_trees():
+            for grp in [tree.grp_graphics, tree.grp_inputs, tree.grp_av, tree.grp_usb]:
+                grp.takeChildren()
+        self._populate_initial_hardware(self.seat0_tree)
+        self.apply_mapping(self._pending_mapping)
+        self.btn_rescan.setText("Rescan Hardware")
+        self.btn_rescan.setEnabled(True)
+        QMessageBox.warning(self, "Rescan Failed", f"Hardware scan failed:\n{message}")
+
+    def closeEvent(self, event):
+        if self.scan_thread and self.scan_thread.isRunning():
+            self.scan_thread.wait()
+        if self.hotplug_watcher:
+            self.hotplug_watcher.stop()
+        if self.input_listener:
+            self.stop_input_listener()
+        super().closeEvent(event)
+
     def apply_mapping(self, mapping_dict):
         """Moves items from seat0 to their target seats based on persistent_id or syspath."""
+        # Identifiers can be dicts from wizard/load, device records from a rebuild or strings from live_mapping.
+        target_trees = []
+        seat_identifiers = []
         for seat_name, identifiers in mapping_dict.items():
             if seat_name == "seat_count" or seat_name == "seat0":
                 continue
@@ -321,68 +509,35 @@ class AdvancedSetupWindow(QMainWindow):
             
             if not target_tree:
                 continue
-                
-            # Normalize identifiers to strings (they could be dicts from wizard/load or strings from live_mapping)
-            normalized_ids = []
-            for ident in identifiers:
-                if isinstance(ident, dict):
-                    normalized_ids.append(ident.get("id") or ident.get("persistent_id") or ident.get("syspath"))
-                elif isinstance(ident, str):
-                    normalized_ids.append(ident)
-                
-            items_to_move = []
-            
-            def find_matching_items(parent_item):
-                for i in range(parent_item.childCount()):
-                    child = parent_item.child(i)
-                    hw_data = child.data(0, Qt.ItemDataRole.UserRole).get("hw", {}) if child.data(0, Qt.ItemDataRole.UserRole) else {}
-                    pid = hw_data.get("persistent_id")
-                    syspath = hw_data.get("syspath")
-                    pci_syspath = hw_data.get("pci_syspath")
-                    
-                    match = False
-                    matched_ident_obj = None
-                    for ident in identifiers:
-                        # Extract string value for matching
-                        ident_str = ""
-                        if isinstance(ident, dict):
-                            ident_str = ident.get("id") or ident.get("persistent_id") or ident.get("syspath")
-                        elif isinstance(ident, str):
-                            ident_str = ident
-                            
-                        if not ident_str:
-                            continue
-                            
-                        if pid == ident_str or syspath == ident_str or pci_syspath == ident_str:
-                            match = True
-                            matched_ident_obj = ident
-                            break
-                        if syspath and (ident_str.startswith(syspath) or syspath.startswith(ident_str)):
-                            match = True
-                            matched_ident_obj = ident
-                            break
-                        if pci_syspath and (ident_str.startswith(pci_syspath) or pci_syspath.startswith(ident_str)):
-                            match = True
-                            matched_ident_obj = ident
-                            break
-                        if pid and (pid.endswith(ident_str) or ident_str.endswith(pid)):
-                            match = True
-                            matched_ident_obj = ident
-                            break
-                                
-                    if match:
-                        # Restore restrict_access state if it came from a profile load
-                        if isinstance(matched_ident_obj, dict) and matched_ident_obj.get("restrict_access"):
-                            target_tree.toggle_restrict_access(child, hw_data, True)
-                            
-                        items_to_move.append((parent_item, child, target_tree))
-                    else:
-                        find_matching_items(child)
-            
-            for grp in [self.seat0_tree.grp_graphics, self.seat0_tree.grp_inputs, self.seat0_tree.grp_av, self.seat0_tree.grp_usb]:
-                find_matching_items(grp)
-                        
-            for src_grp, item, tgt_tree in items_to_move:
+
+            target_trees.append(target_tree)
+            seat_identifiers.append(identifiers)
+
+        matcher = build_seat_matcher(seat_identifiers)
+        if not matcher:
+            return
+
+        def item_hw(item):
+            data = item.data(0, Qt.ItemDataRole.UserRole)
+            return data.get("hw", {}) if data else {}
+
+        moves = plan_moves(
+            [self.seat0_tree.grp_graphics, self.seat0_tree.grp_inputs, self.seat0_tree.grp_av, self.seat0_tree.grp_usb],
+            matcher, len(target_trees),
+            lambda item: [item.child(i) for i in range(item.childCount())],
+            item_hw,
+        )
+
+        items_to_move = []
+        for target_tree, seat_moves in zip(target_trees, moves):
+            for src_grp, item, matched_ident_obj in seat_moves:
+                # Restore restrict_access state if it came from a profile load
+                if isinstance(matched_ident_obj, (dict, DeviceRecord)) and matched_ident_obj.get("restrict_access"):
+                    target_tree.toggle_restrict_access(item, item_hw(item), True)
+            items_to_move.append([(src_grp, item, target_tree) for src_grp, item, _ in seat_moves])
+
+        for seat_moves in items_to_move:
+            for src_grp, item, tgt_tree in seat_moves:
                 src_grp.removeChild(item)
                 hw_type = item.data(0, Qt.ItemDataRole.UserRole).get("type")
                 if hw_type == "gpu":
@@ -393,6 +548,7 @@ class AdvancedSetupWindow(QMainWindow):
                     tgt_tree.grp_av.addChild(item)
                 else:
                     tgt_tree.grp_inputs.addChild(item)
+        self.update_prediction()
 
     def get_all_trees(self):
         trees = [self.seat0_tree]
@@ -424,18 +580,35 @@ class AdvancedSetupWindow(QMainWindow):
             self.overlay_manager.show_all_gpu_overlays(gpus)
 
     def toggle_input_listener(self):
-        if self.input_listener and self.input_listener.isRunning():
-            self.input_listener.stop()
-            self.input_listener = None
-            self.btn_identify_inp.setText("Listen for Input")
-            self.btn_identify_inp.setStyleSheet("")
+        if self.input_listener and self.input_listener.is_active():
+            self.stop_input_listener()
         else:
-            self.input_listener = InputListenerThread(self.hardware_data.get("inputs", []))
+            from src.ui.input_listener import InputListener
+            self.input_listener = InputListener(self.hardware_data.get("inputs", []), parent=self)
             self.input_listener.device_identified.connect(self.on_device_identified)
+            self.input_listener.device_plugged.connect(self.on_listener_device_plugged)
+            self.input_listener.failed.connect(self.on_input_listener_failed)
             self.input_listener.start()
             self.btn_identify_inp.setText("Listening... (Press Key)")
             self.btn_identify_inp.setStyleSheet("background-color: #d15c5c; color: white; padding: 10px;")
             
+    def stop_input_listener(self):
+        if self.input_listener:
+            self.input_listener.stop()
+            self.input_listener.deleteLater()
+            self.input_listener = None
+        self.btn_identify_inp.setText("Listen for Input")
+        self.btn_identify_inp.setStyleSheet("")
+
+    def on_input_listener_failed(self, message):
+        self.stop_input_listener()
+        QMessageBox.warning(self, "Input Listener Failed", f"Could not listen for input:\n{message}")
+
+    def on_listener_device_plugged(self, announcement):
+        # The hotplug watcher adds the row; here we only confirm the new device is being listened to
+        name = announcement.get("name") or announcement.get("persistent_id")
+        self.btn_identify_inp.setText(f"Listening... (Press Key, new: {name})")
+
     def on_device_identified(self, persistent_id):
         # Stop listening after one hit
         self.toggle_input_listener()
@@ -457,7 +630,8 @@ class AdvancedSetupWindow(QMainWindow):
                 iterator += 1
 
 
-    def apply_configuration(self):
+    def collect_apply_map(self):
+        """{seat_name: [hw_data, ...]} for every assignable row, nested USB children included."""
         staging_map = {}
         for tree in self.get_all_trees():
             seat_name = tree.headerItem().text(0)
@@ -478,14 +652,41 @@ class AdvancedSetupWindow(QMainWindow):
             # Extract from all groups in this tree
             for grp in [tree.grp_graphics, tree.grp_inputs, tree.grp_av, tree.grp_usb]:
                 extract_hw(grp)
-                    
+        return staging_map
+
+    def update_prediction(self):
+        """Runs the rules Apply would generate through the offline simulator and shows any device that would land elsewhere."""
+        try:
+            if self.simulator is None:
+                from src.core.rules_sim import RuleSimulator
+                root = self.scanner.root if self.scanner else "/"
+                self.simulator = RuleSimulator(self.scanner.udev_db if self.scanner else None, root=root)
+            executor = ConfigExecutor(parent_widget=self)
+            staging_map = self.collect_apply_map()
+            _, mismatches = executor.predict(staging_map, self.simulator)
+        except Exception as e:
+            # Advisory only: a broken udev database or rules file must not break editing
+            traceback.print_exc()
+            self.prediction_label.setText(f"Rules check failed: {e}")
+            return
+        if not mismatches:
+            self.prediction_label.setText("Rules check: every device lands on its seat.")
+            return
+        names = {target: hw.get("name", target) for target, _, _, hw in executor.desired_layout(staging_map)}
+        lines = [f"{names.get(target, target)}: {got} instead of {want}" for target, (want, got) in sorted(mismatches.items())]
+        self.prediction_label.setText("Rules check: would land elsewhere\n" + "\n".join(lines))
+
+    def apply_configuration(self):
+        staging_map = self.collect_apply_map()
         executor = ConfigExecutor(parent_widget=self)
         staging_dir = executor.generate_staging(staging_map)
         if staging_dir:
-            dialog = ReviewDialog(staging_dir, self)
+            from src.ui.review_dialog import ReviewDialog
+            dialog = ReviewDialog(staging_dir, self, plan=executor.last_plan)
             dialog.exec()
 
-    def save_config(self):
+    def collect_staging_map(self):
+        """Returns {seat_name: [hw_data, ...]} for the top-level rows of every seat column."""
         staging_map = {}
         for tree in self.get_all_trees():
             seat_name = tree.headerItem().text(0)
@@ -496,7 +697,10 @@ class AdvancedSetupWindow(QMainWindow):
                 for i in range(grp.childCount()):
                     hw_data = grp.child(i).data(0, Qt.ItemDataRole.UserRole).get("hw", {})
                     staging_map[seat_name].append(hw_data)
-        save_configuration(self, staging_map)
+        return staging_map
+
+    def save_config(self):
+        save_configuration(self, self.collect_staging_map())
         
     def load_config(self):
         new_map = load_configuration(self)
@@ -562,3 +766,4 @@ class AdvancedSetupWindow(QMainWindow):
                 self.seat0_tree.grp_av.addChild(item)
             else:
                 self.seat0_tree.grp_inputs.addChild(item)
+        self.update_prediction()
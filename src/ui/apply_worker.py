@@ -0,0 +1,37 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class ApplyThread(QThread):
+    """
+    Sends a staged changes.json to the session helper (authorizing it first if this session
+    has not yet) and forwards each progress event as it arrives.
+    """
+    progress = pyqtSignal(dict)
+    apply_finished = pyqtSignal(int, str)  # 0 on success, 126 if authorization failed; error text
+
+    def __init__(self, changes_path):
+        super().__init__()
+        self.changes_path = changes_path
+
+    def run(self):
+        from src.core.helper_client import get_session
+        try:
+            session = get_session()
+        except PermissionError as e:
+            self.apply_finished.emit(126, str(e))
+            return
+        except Exception as e:
+            self.apply_finished.emit(1, str(e))
+            return
+
+        request_id, events = session.subscribe("apply", changes=self.changes_path)
+        try:
+            while True:
+                message = events.get()
+                if message.get("event") == "progress":
+                    self.progress.emit({k: v for k, v in message.items() if k not in ("id", "event")})
+                elif "event" not in message:
+                    break
+        finally:
+            session.release(request_id)
+        self.apply_finished.emit(0 if message.get("ok") else 1, message.get("error", ""))
@@ -0,0 +1,59 @@
+from PyQt6.QtCore import QObject, QSocketNotifier, QTimer, pyqtSignal
+
+from src.core.hotplug import UeventMonitor, HotplugModel
+
+
+class HotplugWatcher(QObject):
+    """
+    Bridges the uevent netlink socket into the Qt event loop.
+    Bursts of uevents (a hub with four devices produces dozens) are coalesced for
+    a short window, applied to the shared hardware model, and re-emitted per device.
+    """
+    # (category, hw_data) where category is "usb", "graphics", "inputs" or "av"
+    device_added = pyqtSignal(str, object)
+    device_removed = pyqtSignal(str, object)
+    device_changed = pyqtSignal(str, object)
+
+    def __init__(self, scanner, hardware_data, parent=None, settle_ms=250):
+        super().__init__(parent)
+        self.model = HotplugModel(scanner, hardware_data)
+        self.pending = []
+        self.monitor = None
+        self.notifier = None
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(settle_ms)
+        self.flush_timer.timeout.connect(self.flush)
+
+        try:
+            self.monitor = UeventMonitor()
+        except OSError:
+            # No netlink access (containers, sandboxes): hotplug updates are simply unavailable
+            return
+        self.notifier = QSocketNotifier(self.monitor.fileno(), QSocketNotifier.Type.Read, self)
+        self.notifier.activated.connect(self.on_readable)
+
+    def is_active(self):
+        return self.monitor is not None
+
+    def on_readable(self):
+        events = self.monitor.receive()
+        if events:
+            self.pending.extend(events)
+            self.flush_timer.start()
+
+    def flush(self):
+        events, self.pending = self.pending, []
+        signals = {"add": self.device_added, "remove": self.device_removed, "change": self.device_changed}
+        for action, category, item in self.model.apply_events(events):
+            signals[action].emit(category, item)
+
+    def stop(self):
+        self.flush_timer.stop()
+        if self.notifier:
+            self.notifier.setEnabled(False)
+            self.notifier = None
+        if self.monitor:
+            self.monitor.close()
+            self.monitor = None
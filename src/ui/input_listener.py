@@ -0,0 +1,91 @@
+from PyQt6.QtCore import QObject, QSocketNotifier, pyqtSignal
+
+
+class InputListener(QObject):
+    """
+    Identify session on the shared session helper, driven by the Qt event loop: helper
+    messages wake a QSocketNotifier, so starting and stopping costs no thread and no join.
+    """
+    # Emits the persistent_id of the device that was touched
+    device_identified = pyqtSignal(str)
+    # Input nodes plugged in or removed while listening: the helper's device announcement
+    device_plugged = pyqtSignal(object)
+    device_unplugged = pyqtSignal(object)
+    # The session ended on its own (authorization refused, helper gone): the error text
+    failed = pyqtSignal(str)
+
+    def __init__(self, hardware_inputs, parent=None):
+        super().__init__(parent)
+        self.hardware_inputs = hardware_inputs
+        self.session = None
+        self.request_id = None
+        self.events = None
+        self.notifier = None
+        self.table = []
+
+    def start(self):
+        from src.core.helper_client import get_session, identify_options, NotifyingQueue
+
+        devices = []
+        for inp in self.hardware_inputs:
+            # We only track valid "human" input devices passed from scanner
+            if "error" in inp:
+                continue
+            for node in inp.get("nodes", []):
+                devices.append([f"/dev/input/{node}", inp.get('persistent_id')])
+
+        self.events = NotifyingQueue()
+        self.notifier = QSocketNotifier(self.events.read_fd, QSocketNotifier.Type.Read, self)
+        self.notifier.activated.connect(self.on_readable)
+        try:
+            # Does not wait for the polkit prompt: the identify request queues up behind it
+            self.session = get_session(wait=False)
+        except OSError as e:
+            self.events.put({"ok": False, "error": str(e)})
+            return
+        self.request_id, _ = self.session.subscribe("identify", events=self.events, devices=devices,
+                                                    **identify_options())
+
+    def is_active(self):
+        return self.notifier is not None
+
+    def on_readable(self):
+        from src.core.helper_client import touched_devices, update_table
+
+        if self.events is None:
+            return
+        # Everything that arrived since the last wakeup is handled as one burst
+        records = []
+        for message in self.events.drain():
+            if message.get("event") == "records":
+                records.extend(message["records"])
+            elif message.get("event") == "device":
+                update_table(self.table, message)
+                if message["action"] == "add":
+                    self.device_plugged.emit(message)
+                else:
+                    self.device_unplugged.emit(message)
+            elif not message.get("ok"):
+                self.stop()
+                self.failed.emit(message.get("error") or "input helper is not running")
+                return
+            else:
+                self.table = message.get("table", [])
+        for persistent_id in touched_devices(records, self.table):
+            if self.events is None:
+                break  # A slot stopped us after the first hit
+            self.device_identified.emit(persistent_id)
+
+    def stop(self):
+        """Ends the session at once: the cancel is sent without waiting for its acknowledgement."""
+        if self.notifier is not None:
+            self.notifier.setEnabled(False)
+            self.notifier.deleteLater()
+            self.notifier = None
+        if self.session is not None and self.request_id is not None:
+            self.session.cancel(self.request_id)
+        self.session = None
+        self.request_id = None
+        if self.events is not None:
+            self.events.close()
+            self.events = None
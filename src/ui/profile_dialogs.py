@@ -0,0 +1,43 @@
+import os
+from PyQt6.QtWidgets import QFileDialog, QMessageBox
+
+from src.core.backup import read_profile, write_profile
+
+
+def save_configuration(parent_widget, staging_map):
+    """Prompts for a destination and saves the seat mapping as a JSON profile."""
+    file_path, _ = QFileDialog.getSaveFileName(
+        parent_widget, 
+        "Save Multiseat Profile", 
+        os.path.expanduser("~"), 
+        "JSON Files (*.json);;All Files (*)"
+    )
+    if not file_path:
+        return
+        
+    try:
+        file_path = write_profile(file_path, staging_map)
+        QMessageBox.information(parent_widget, "Saved", f"Profile successfully saved to:\n{file_path}")
+    except Exception as e:
+        QMessageBox.critical(parent_widget, "Save Error", f"Failed to save profile:\n{str(e)}")
+
+
+def load_configuration(parent_widget):
+    """
+    Prompts user for a JSON file, deserializes it, 
+    and returns a mapping dictionary ready for apply_mapping().
+    """
+    file_path, _ = QFileDialog.getOpenFileName(
+        parent_widget, 
+        "Load Multiseat Profile", 
+        os.path.expanduser("~"), 
+        "JSON Files (*.json);;All Files (*)"
+    )
+    if not file_path:
+        return None
+        
+    try:
+        return read_profile(file_path)
+    except Exception as e:
+        QMessageBox.critical(parent_widget, "Load Error", f"Failed to load profile:\n{str(e)}")
+        return None
@@ -2,14 +2,15 @@ import os
 import subprocess
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton, 
-    QTabWidget, QTextEdit, QMessageBox
+    QTabWidget, QTextEdit, QMessageBox, QLabel, QProgressBar
 )
 from PyQt6.QtGui import QFont
 
 class ReviewDialog(QDialog):
-    def __init__(self, staging_dir, parent=None):
+    def __init__(self, staging_dir, parent=None, plan=None):
         super().__init__(parent)
         self.staging_dir = staging_dir
+        self.plan = plan
         self.setWindowTitle("Review Configuration Changes")
         self.resize(800, 600)
         self.init_ui()
@@ -17,6 +18,11 @@ class ReviewDialog(QDialog):
     def init_ui(self):
         layout = QVBoxLayout(self)
 
+        if self.plan is not None:
+            plan_label = QLabel("Planned changes:\n" + "\n".join(f"• {line}" for line in self.plan.summary()))
+            plan_label.setWordWrap(True)
+            layout.addWidget(plan_label)
+
         self.tabs = QTabWidget()
         layout.addWidget(self.tabs)
 
@@ -47,6 +53,15 @@ class ReviewDialog(QDialog):
         btn_install = QPushButton("Install Now (sudo)")
         btn_install.setStyleSheet("background-color: #d32f2f; color: white; font-weight: bold; padding: 5px 15px;")
         btn_install.clicked.connect(self.install_now)
+        self.btn_install = btn_install
+
+        # Per-device progress streamed back by apply_helper.py
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+        self.progress_log = QLabel()
+        self.progress_log.setVisible(False)
+        layout.addWidget(self.progress_log)
 
         btn_layout.addWidget(btn_open_folder)
         btn_layout.addStretch()
@@ -62,24 +77,46 @@ class ReviewDialog(QDialog):
             QMessageBox.warning(self, "Error", f"Could not launch file manager:\n{str(e)}")
 
     def install_now(self):
-        script_path = os.path.join(self.staging_dir, "apply_config.sh")
-        if not os.path.exists(script_path):
-            QMessageBox.critical(self, "Error", "apply_config.sh not found in staging directory!")
+        from src.core.executor import CHANGES_FILE_NAME
+        from src.ui.apply_worker import ApplyThread
+
+        changes_path = os.path.join(self.staging_dir, CHANGES_FILE_NAME)
+        if not os.path.exists(changes_path):
+            QMessageBox.critical(self, "Error", f"{CHANGES_FILE_NAME} not found in staging directory!")
             return
 
-        try:
-            result = subprocess.run(
-                ["pkexec", "bash", script_path],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                QMessageBox.information(self, "Success", "Configuration applied successfully!")
-                self.accept()
-            elif result.returncode in (126, 127):
-                QMessageBox.warning(self, "Permission Denied", "Authentication was cancelled or failed. Configuration was not applied.")
-            else:
-                QMessageBox.critical(self, "Execution Failed", f"Failed to apply configuration (Code {result.returncode}):\n{result.stderr}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"An error occurred:\n{str(e)}")
+        self.btn_install.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.progress_log.setVisible(True)
+        self.progress_log.setText("Waiting for authentication...")
+        self.report = ""
+        self.apply_thread = ApplyThread(changes_path)
+        self.apply_thread.progress.connect(self.on_apply_progress)
+        self.apply_thread.apply_finished.connect(self.on_apply_finished)
+        self.apply_thread.start()
+
+    def on_apply_progress(self, event):
+        step = event.get("step")
+        if step == "start":
+            self.progress_bar.setMaximum(max(event.get("total", 0), 1))
+        elif step == "done":
+            self.report = f"Applied in {event.get('ms', 0):.0f} ms ({event.get('failed', 0)} step(s) failed)"
+            self.progress_log.setText(self.report)
+        else:
+            self.progress_bar.setValue(event.get("index", 0))
+            target = event.get("path") or event.get("action") or ""
+            status = f"{event.get('ms', 0):.0f} ms" if event.get("ok") else f"failed: {event.get('error', '')}"
+            self.progress_log.setText(f"{step} {target} {event.get('seat', '')} ({status})".replace("  ", " "))
+
+    def on_apply_finished(self, returncode, stderr):
+        self.btn_install.setEnabled(True)
+        if returncode == 0:
+            QMessageBox.information(self, "Success", "\n".join(["Configuration applied successfully!", self.report]).strip())
+            self.accept()
+        elif returncode in (126, 127):
+            self.progress_log.setText("")
+            QMessageBox.warning(self, "Permission Denied", "Authentication was cancelled or failed. Configuration was not applied.")
+        else:
+            QMessageBox.critical(self, "Execution Failed",
+                                 f"Failed to apply configuration (Code {returncode}):\n{self.report}\n{stderr}".strip())
@@ -0,0 +1,56 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from src.core.scan_cache import load_or_scan
+from src.core.loginctl_api import get_live_mapping
+
+
+class ScanThread(QThread):
+    """
+    Runs HardwareScanner.full_scan off the UI thread. With stream=True every device event
+    from HardwareScanner.iter_scan is forwarded through device_event as it is discovered.
+    """
+    device_event = pyqtSignal(str, str, object)
+    scan_finished = pyqtSignal(object)
+    scan_failed = pyqtSignal(str)
+
+    def __init__(self, scanner, parallel=True, stream=False):
+        super().__init__()
+        self.scanner = scanner
+        self.parallel = parallel
+        self.stream = stream
+
+    def run(self):
+        try:
+            if not self.stream:
+                self.scan_finished.emit(self.scanner.full_scan(parallel=self.parallel))
+                return
+            for action, category, item in self.scanner.iter_scan(parallel=self.parallel):
+                if action == "done":
+                    self.scan_finished.emit(item)
+                else:
+                    self.device_event.emit(action, category, item)
+        except Exception as e:
+            self.scan_failed.emit(str(e))
+
+
+class StartupScanThread(QThread):
+    """
+    The launcher's first load: cached or fresh scan plus the live seat mapping from
+    loginctl, so the window can be shown before either finishes.
+    """
+    loaded = pyqtSignal(object, object, object, bool)  # hardware_data, live_mapping, fingerprint, warm_start
+    scan_failed = pyqtSignal(str)
+
+    def __init__(self, scanner, use_cache=True):
+        super().__init__()
+        self.scanner = scanner
+        self.use_cache = use_cache
+
+    def run(self):
+        try:
+            hardware_data, fingerprint, warm_start = load_or_scan(self.scanner, use_cache=self.use_cache)
+            live_mapping = get_live_mapping()
+        except Exception as e:
+            self.scan_failed.emit(str(e))
+            return
+        self.loaded.emit(hardware_data, live_mapping, fingerprint, warm_start)
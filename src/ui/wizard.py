@@ -1,10 +1,11 @@
+import os
+
 from PyQt6.QtWidgets import (
     QWizard, QWizardPage, QVBoxLayout, QLabel, QSpinBox, 
-    QListWidget, QPushButton, QHBoxLayout, QListWidgetItem, QComboBox
+    QListWidget, QPushButton, QHBoxLayout, QListWidgetItem, QComboBox, QMessageBox
 )
 from PyQt6.QtCore import Qt
 
-from src.core.input_listener import InputListenerThread
 from src.ui.display_overlay import OverlayManager
 
 class IntroPage(QWizardPage):
@@ -38,6 +39,7 @@ class SeatSetupPage(QWizardPage):
         
         self.hardware_data = hardware_data
         self.assignments = []
+        self.plugged = {}  # persistent_id -> helper announcement for inputs plugged in while listening
         
         layout = QVBoxLayout(self)
         
@@ -94,14 +96,26 @@ class SeatSetupPage(QWizardPage):
             self.assigned_list.addItem(self.gpu_combo.currentText())
 
     def toggle_identify_inputs(self):
-        if self.listener and self.listener.isRunning():
+        if self.listener and self.listener.is_active():
             self.stop_listening()
         else:
-            self.listener = InputListenerThread(self.hardware_data.get("inputs", []))
+            from src.ui.input_listener import InputListener
+            self.listener = InputListener(self.hardware_data.get("inputs", []), parent=self)
             self.listener.device_identified.connect(self.on_device_identified)
+            self.listener.device_plugged.connect(self.on_device_plugged)
+            self.listener.failed.connect(self.on_listener_failed)
             self.btn_identify_inputs.setText("Listening... (Press a key/button)")
             self.listener.start()
-            
+
+    def on_listener_failed(self, message):
+        self.stop_listening()
+        QMessageBox.warning(self, "Input Listener Failed", f"Could not listen for input:\n{message}")
+
+    def on_device_plugged(self, announcement):
+        name = announcement.get("name") or announcement.get("persistent_id")
+        self.plugged[announcement["persistent_id"]] = announcement
+        self.btn_identify_inputs.setText(f"Listening... (new: {name})")
+
     def on_device_identified(self, persistent_id):
         self.stop_listening()
         dev_name = persistent_id
@@ -111,6 +125,12 @@ class SeatSetupPage(QWizardPage):
                 dev_name = inp.get("name")
                 inp_data = inp
                 break
+        if inp_data is None and persistent_id in self.plugged:
+            # Plugged in after the scan: build the entry from the helper's announcement
+            plugged = self.plugged[persistent_id]
+            dev_name = f"⌨️ {plugged.get('name') or persistent_id}"
+            inp_data = {"type": "input", "name": dev_name, "persistent_id": persistent_id,
+                        "syspath": plugged.get("syspath", ""), "nodes": [os.path.basename(plugged["node"])]}
                 
         if inp_data and not any(a.get("persistent_id") == persistent_id for a in self.assignments):
             self.assignments.append(inp_data)
@@ -121,6 +141,7 @@ class SeatSetupPage(QWizardPage):
     def stop_listening(self):
         if self.listener:
             self.listener.stop()
+            self.listener.deleteLater()
             self.listener = None
         self.btn_identify_inputs.setText("Click/Type on Device to Identify")
         
@@ -0,0 +1,97 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+from src.core import apply_helper
+from src.core.apply_plan import ApplyPlan
+
+USB = "/sys/devices/pci0000:00/0000:00:14.0/usb1/1-2"
+GPU = "/sys/devices/pci0000:00/0000:00:02.0"
+
+
+class FakeManager:
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = fail
+        self.closed = False
+
+    def attach_device(self, seat, path):
+        if path in self.fail:
+            raise OSError("No such device")
+        self.calls.append(("attach", seat, path))
+
+    def flush_devices(self):
+        self.calls.append(("flush",))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRun:
+    def __init__(self):
+        self.commands = []
+
+    def __call__(self, cmd, **kwargs):
+        self.commands.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+
+class TestApplyHelper(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.rules_dir = os.path.join(self.tmp, "rules.d")
+        os.makedirs(self.rules_dir)
+        self.source = os.path.join(self.tmp, apply_helper.RULES_FILE_NAME)
+        with open(self.source, "w") as f:
+            f.write('TAG=="seat", DEVPATH=="/devices/pci0000:00/0000:00:02.0", ENV{ID_SEAT}="seat1"\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def request(self):
+        plan = ApplyPlan()
+        plan.attach = [("seat1", GPU), ("seat1", USB)]
+        plan.rules_add = ["rule"]
+        plan.rules_text = "rule\n"
+        plan.retrigger = [GPU, USB]
+        return plan.to_request(self.source, 5)
+
+    def test_applies_whole_change_set_and_streams_progress(self):
+        events, manager, run = [], FakeManager(fail=(USB,)), FakeRun()
+        request = self.request()
+        apply_helper.validate_request(request)
+        failed = apply_helper.apply_changes(request, logind=manager, run=run,
+                                            rules_dir=self.rules_dir, emit=events.append)
+
+        self.assertEqual(failed, 1)
+        self.assertTrue(os.path.exists(os.path.join(self.rules_dir, apply_helper.RULES_FILE_NAME)))
+        self.assertEqual(manager.calls, [("attach", "seat1", GPU)])
+        self.assertTrue(manager.closed)
+        self.assertEqual(run.commands[0], ["udevadm", "control", "--reload-rules"])
+        self.assertIn(f"--parent-match={USB}", run.commands[1])
+
+        self.assertEqual(events[0], {"step": "start", "total": 5})
+        steps = [(e["step"], e["index"], e["ok"]) for e in events[1:-1]]
+        self.assertEqual(steps, [("rules", 1, True), ("attach", 2, True), ("attach", 3, False),
+                                 ("reload", 4, True), ("retrigger", 5, True)])
+        self.assertIn("No such device", events[3]["error"])
+        self.assertEqual((events[-1]["step"], events[-1]["failed"]), ("done", 1))
+        json.dumps(events)
+
+    def test_rejects_malformed_requests(self):
+        for change in ({"attach": [["seat1; rm -rf /", USB]]},
+                       {"detach": ["/sys/../etc/shadow"]},
+                       {"retrigger": ["/dev/input/event3"]},
+                       {"rules": {"install": "/tmp/evil.rules", "remove": False}},
+                       {"version": 2}):
+            request = self.request()
+            request.update(change)
+            with self.assertRaises(ValueError):
+                apply_helper.validate_request(request)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.executor import ConfigExecutor, RULES_FILE_NAME
+from src.core.rules_index import RulesIndex
+
+GPU_PATH = "/sys/devices/pci0000:00/0000:00:01.0/0000:01:00.0"
+GPU = {"name": "GPU", "type": "gpu", "syspath": GPU_PATH + "/drm/card0", "pci_syspath": "0000:01:00",
+       "persistent_id": "path:pci-0000:01:00.0"}
+KEYBOARD = {"name": "Keyboard", "type": "input", "syspath": "/sys/devices/pci0000:00/usb1/1-2",
+            "persistent_id": "path:pci-0000:00:14.0-usb-0:2"}
+
+
+class TestApplyPlan(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "root")
+        self.rules_dir = os.path.join(self.root, "etc/udev/rules.d")
+        os.makedirs(self.rules_dir)
+        self.executor = ConfigExecutor()
+        self.executor.staging_dir = os.path.join(self.tmp.name, "staging")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def stage(self, staging_map, live=None):
+        self.executor.generate_staging(staging_map, live_assignments=live or {},
+                                       rules_index=RulesIndex(root=self.root).refresh())
+        with open(os.path.join(self.executor.staging_dir, "apply_config.sh")) as f:
+            return self.executor.last_plan, f.read()
+
+    def install(self):
+        """Pretend apply_config.sh ran: install the staged rules file."""
+        shutil.copy(os.path.join(self.executor.staging_dir, RULES_FILE_NAME), self.rules_dir)
+
+    def test_reapplying_installed_layout_is_a_noop(self):
+        layout = {"seat0": [KEYBOARD], "seat1": [GPU]}
+        plan, script = self.stage(layout)
+        self.assertEqual(plan.attach, [("seat1", GPU_PATH)])
+        self.assertEqual(len(plan.rules_add), 4)
+        self.install()
+
+        plan, script = self.stage(layout, live={GPU_PATH: "seat1"})
+        self.assertTrue(plan.is_noop)
+        self.assertNotIn("udevadm", script)
+        self.assertNotIn("loginctl", script)
+        self.assertNotIn("cp ", script)
+
+    def pin_keyboard(self, seat):
+        """The 72-seat-*.rules file the attach of an earlier apply left behind."""
+        with open(os.path.join(self.rules_dir, "72-seat-input-pci-0000_00_14_0-usb-0_2.rules"), "w") as f:
+            f.write(f'TAG=="seat", ENV{{ID_FOR_SEAT}}=="input-pci-0000_00_14_0-usb-0_2", ENV{{ID_SEAT}}="{seat}"\n')
+
+    def test_moving_back_to_seat0_removes_rules(self):
+        self.stage({"seat1": [GPU, dict(KEYBOARD, restrict_access=True)]})
+        self.install()
+        self.pin_keyboard("seat1")
+
+        plan, script = self.stage({"seat0": [KEYBOARD], "seat1": [GPU]}, live={GPU_PATH: "seat1", KEYBOARD["syspath"]: "seat1"})
+        self.assertEqual(plan.attach, [])
+        self.assertEqual(plan.detach, [KEYBOARD["syspath"]])
+        self.assertFalse(plan.flush)
+        self.assertEqual(plan.rules_add, [])
+        self.assertEqual(len(plan.rules_remove), 1)
+        self.assertEqual(plan.retrigger, [KEYBOARD["syspath"]])
+        self.assertIn("udevadm control --reload-rules", script)
+        self.assertIn(f"loginctl attach seat0 {KEYBOARD['syspath']}", script)
+
+        plan, script = self.stage({"seat0": [KEYBOARD, GPU]}, live={GPU_PATH: "seat1", KEYBOARD["syspath"]: "seat1"})
+        self.assertTrue(plan.flush)
+        self.assertIn("loginctl flush-devices", script)
+
+    def test_loginctl_pins_are_detached_or_flushed(self):
+        self.pin_keyboard("seat2")
+
+        plan, script = self.stage({"seat0": [KEYBOARD], "seat1": [GPU]})
+        self.assertEqual(plan.detach, [KEYBOARD["syspath"]])
+        self.assertIn(f"loginctl attach seat0 {KEYBOARD['syspath']}", script)
+
+        plan, script = self.stage({"seat0": [KEYBOARD, GPU]})
+        self.assertTrue(plan.flush)
+        self.assertIn("loginctl flush-devices", script)
+        self.assertFalse(plan.rules_changed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks.run import compare_results, run_benchmarks
+from src.core.backup import read_profile
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_compare_flags_only_real_regressions(self):
+        baseline = {"full_scan": {"100": 0.100, "10": 0.001}}
+        results = {"full_scan": {"100": 0.130, "10": 0.0019, "1000": 5.0}}
+        self.assertEqual(compare_results(results, baseline, 20), [("full_scan", "100", 0.100, 0.130)])
+        self.assertEqual(compare_results(results, baseline, 50), [])
+
+    def test_small_run_covers_every_benchmark(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            results = run_benchmarks([10], names=["full_scan", "generate_staging", "resolve_profile"],
+                                     repeat=1, workdir=tmp)
+        self.assertEqual(set(results), {"full_scan", "generate_staging", "resolve_profile"})
+        self.assertTrue(all(results[name]["10"] > 0 for name in results))
+
+    def test_read_profile_normalizes_legacy_lists(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.json")
+            with open(path, "w") as f:
+                json.dump({"seat1": ["path:pci-0000:01:00.0", {"id": "kbd", "restrict_access": True}]}, f)
+            self.assertEqual(read_profile(path), {"seat1": [{"id": "path:pci-0000:01:00.0"},
+                                                            {"id": "kbd", "restrict_access": True}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import io
+import json
+import sys
+import subprocess
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from src.cli import main
+from src.core.config import ConfigManager
+from src.core.profile import resolve_profile
+from src.core.scanner import HardwareScanner
+from src.tools.synthetic_topology import generate_topology
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Loaded only by the subcommands that need them, never for --help
+DEFERRED_MODULES = ["src.core.scanner", "src.core.scan_cache", "src.core.loginctl_api", "src.core.executor",
+                    "src.core.profile", "src.core.rules_sim", "src.core.helper_client", "src.core.session_helper",
+                    "src.core.apply_helper", "src.core.logind_dbus", "jeepney"]
+STARTUP_BUDGET_S = 0.1
+
+
+class TestHeadlessCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "root")
+        self.aliases = os.path.join(self.tmp.name, "aliases.json")
+        generate_topology(self.root, gpus=2, connectors=2, desks=2)
+        self.hardware = HardwareScanner(ConfigManager(self.aliases), root=self.root).full_scan()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_cli(self, *argv):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = main(list(argv))
+        return code, out.getvalue()
+
+    def test_cli_does_not_import_qt(self):
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, src.cli; print(sorted(m for m in sys.modules if m.startswith('PyQt')))"],
+            cwd=APP_DIR, capture_output=True, text=True, check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_help_starts_fast_without_core_modules(self):
+        script = ("import sys, time\n"
+                  "start = time.perf_counter()\n"
+                  "import src.cli\n"
+                  "src.cli.build_parser().format_help()\n"
+                  "elapsed = time.perf_counter() - start\n"
+                  f"print(elapsed, [m for m in {DEFERRED_MODULES!r} if m in sys.modules])")
+        result = subprocess.run([sys.executable, "-c", script], cwd=APP_DIR, capture_output=True, text=True, check=True)
+        elapsed, loaded = result.stdout.split(" ", 1)
+        self.assertEqual(loaded.strip(), "[]")
+        self.assertLess(float(elapsed), STARTUP_BUDGET_S)
+
+    def test_scan_json(self):
+        code, output = self.run_cli("scan", "--json", "--root", self.root, "--config", self.aliases)
+        self.assertEqual(code, 0)
+        data = json.loads(output)
+        self.assertEqual([gpu["syspath"] for gpu in data["graphics"]], [gpu["syspath"] for gpu in self.hardware["graphics"]])
+        self.assertEqual(len(data["inputs"]), len(self.hardware["inputs"]))
+
+    def test_resolve_profile_moves_gpu_and_inputs(self):
+        gpu = self.hardware["graphics"][1]
+        keyboard = self.hardware["inputs"][0]
+        mapping = {"seat1": [{"id": gpu["persistent_id"]}, {"id": keyboard["persistent_id"], "restrict_access": True}]}
+
+        staging_map = resolve_profile(self.hardware, mapping)
+        self.assertEqual([hw["syspath"] for hw in staging_map["seat1"]], [gpu["syspath"], keyboard["syspath"]])
+        self.assertTrue(staging_map["seat1"][1].get("restrict_access"))
+        self.assertNotIn(gpu["syspath"], [hw["syspath"] for hw in staging_map["seat0"]])
+        self.assertIn(self.hardware["graphics"][0]["syspath"], [hw["syspath"] for hw in staging_map["seat0"]])
+
+    def test_stage_writes_rules(self):
+        profile = os.path.join(self.tmp.name, "profile.json")
+        with open(profile, "w") as f:
+            json.dump({"seat1": [self.hardware["graphics"][1]["persistent_id"]]}, f)
+        output = os.path.join(self.tmp.name, "staging")
+
+        code, _ = self.run_cli("stage", profile, "--output", output, "--root", self.root, "--config", self.aliases)
+        self.assertEqual(code, 0)
+        with open(os.path.join(output, "70-multiseat-manager.rules")) as f:
+            self.assertIn('ENV{ID_SEAT}="seat1"', f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,6 @@
+import os
 import sys
+import tempfile
 import unittest
 from unittest.mock import MagicMock
 
@@ -87,18 +89,18 @@ class TestDragDropToRules(unittest.TestCase):
                     staging_map[seat_name].append(hw_data)
 
         executor = ConfigExecutor()
-        staging_dir = executor.generate_staging(staging_map)
-
-        with open(f"{staging_dir}/70-multiseat-manager.rules", "r") as f:
-            rules = f.read()
-
-        # Verify rules include the correct PCI syspath tagging for GPU and the nested DRM|sound tag
-        self.assertIn('DEVPATH=="/devices/pci0000:00/0000:00:01.0/0000:01:00.0"', rules)
-        self.assertIn('DEVPATH=="/devices/pci0000:00/0000:00:01.0/0000:01:00.0/*", SUBSYSTEM=="drm"', rules)
-        self.assertIn('DEVPATH=="/devices/pci0000:00/0000:00:01.0/0000:01:00.0/*", SUBSYSTEM=="graphics"', rules)
-        self.assertIn('DEVPATH=="/devices/pci0000:00/0000:00:01.0/0000:01:00.0/*", SUBSYSTEM=="sound"', rules)
-        # Verify input rule exists
-        self.assertIn('DEVPATH=="/devices/pci1/usb1/input1"', rules)
+        with tempfile.TemporaryDirectory() as tmp:
+            executor.staging_dir = os.path.join(tmp, "staging")
+            staging_dir = executor.generate_staging(staging_map)
+            with open(f"{staging_dir}/70-multiseat-manager.rules", "r") as f:
+                rules = f.read()
+
+        # Verify the seat1 rule covers the GPU's PCI function and everything below it (DRM, sound) plus the input
+        gpu = "/devices/pci0000:00/0000:00:01.0/0000:01:00.0"
+        self.assertIn(f'DEVPATH=="{gpu}|{gpu}/*|/devices/pci1/usb1/input1", ENV{{ID_SEAT}}="seat1", GOTO="multiseat_manager_end"', rules)
+        # Events without the seat tag skip the whole file
+        self.assertIn('TAG!="seat", GOTO="multiseat_manager_end"', rules)
+        self.assertTrue(rules.rstrip().endswith('LABEL="multiseat_manager_end"'))
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,80 @@
+import os
+import select
+import struct
+import unittest
+
+from src.core.evdev_listener import InputWatcher, EV_KEY
+
+EV_SYN, EV_REL = 0, 2
+BTN_LEFT = 0x110
+_EVENT = struct.Struct("llHHi")
+
+
+class PipeDevice:
+    """Stands in for an evdev.InputDevice: the test writes input_event structs into a pipe."""
+
+    def __init__(self):
+        self.fd, self.write_fd = os.pipe()
+        os.set_blocking(self.fd, False)
+
+    def send(self, events):
+        data = b"".join(_EVENT.pack(us // 1000000, us % 1000000, event_type, code, value)
+                        for us, event_type, code, value in events)
+        os.write(self.write_fd, data)
+
+    def close(self):
+        os.close(self.fd)
+        os.close(self.write_fd)
+
+
+def mouse_packets(start_us, count, rate_hz=8000):
+    """count motion reports (REL_X, REL_Y, SYN_REPORT) at rate_hz, like a gaming mouse."""
+    events = []
+    for i in range(count):
+        us = start_us + i * 1000000 // rate_hz
+        events += [(us, EV_REL, 0, 1), (us, EV_REL, 1, -1), (us, EV_SYN, 0, 0)]
+    return events
+
+
+class TestInputWatcher(unittest.TestCase):
+    def setUp(self):
+        self.epoll = select.epoll()
+        self.watcher = InputWatcher(self.epoll, types=[EV_KEY], debounce_ms=250)
+        self.device = PipeDevice()
+        self.index = self.watcher.watch(self.device, "usb:mouse", "/dev/input/event5")
+
+    def tearDown(self):
+        self.watcher.close()
+        self.epoll.close()
+
+    def test_motion_floods_are_dropped_and_clicks_debounced(self):
+        records = []
+        # One second of an 8 kHz mouse, with clicks at 100 ms (reported), 200 ms (inside the
+        # debounce window) and 600 ms (reported again)
+        clicks = {800: 100000, 1600: 200000, 4800: 600000}
+        for start in range(0, 8000, 800):
+            events = mouse_packets(start * 125, 800)
+            if start in clicks:
+                events += [(clicks[start], EV_KEY, BTN_LEFT, 1), (clicks[start] + 50, EV_KEY, BTN_LEFT, 0)]
+            self.device.send(events)
+            records += self.watcher.read(self.device.fd)
+
+        self.assertEqual([(r[0], r[2], r[3], r[4]) for r in records],
+                         [(self.index, BTN_LEFT, 1, 100000), (self.index, BTN_LEFT, 1, 600000)])
+        stats = self.watcher.stats
+        self.assertEqual(stats["events"], 24006)
+        self.assertEqual(stats["filtered"], 24000)
+        self.assertEqual(stats["debounced"], 4)
+        self.assertEqual(stats["delivered"], 2)
+
+    def test_unreadable_device_is_dropped(self):
+        # Any read error but EAGAIN (ENODEV after an unplug) removes the node for good
+        directory = os.open(os.path.dirname(os.path.abspath(__file__)), os.O_RDONLY)
+        os.dup2(directory, self.device.fd)
+        os.close(directory)
+        self.assertIsNone(self.watcher.read(self.device.fd))
+        self.assertEqual(self.watcher.devices, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
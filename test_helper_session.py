@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+from src.core import helper_client
+from src.core.evdev_listener import input_node_event
+from src.core.session_helper import FrameReader, KIND_INPUT, EV_KEY, encode_message, encode_records, decode_records
+
+HELPER = [sys.executable, helper_client.SESSION_HELPER_SCRIPT]
+
+
+class TestHelperSession(unittest.TestCase):
+    def setUp(self):
+        self.session = helper_client.HelperSession(command=HELPER).start()
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.session.close()
+        shutil.rmtree(self.tmp)
+
+    def test_one_helper_serves_repeated_requests(self):
+        pid = self.session.helper_pid
+        for _ in range(3):
+            reply = self.session.request("hello", timeout=5)
+            self.assertEqual(reply["pid"], pid)
+        self.assertFalse(self.session.request("bogus", timeout=5)["ok"])
+        self.assertTrue(self.session.is_alive())
+
+    def test_identify_without_devices_fails_and_open_is_restricted(self):
+        request_id, events = self.session.subscribe("identify", devices=[["/dev/input/event999", "usb:x"]])
+        reply = events.get(timeout=5)
+        # Without any device the session only makes sense while hotplug is watched
+        self.assertEqual(reply["ok"], reply.get("hotplug", False))
+        self.session.cancel(request_id)
+        with self.assertRaises(OSError):
+            self.session.open_device("/etc/passwd")
+
+    def test_apply_streams_progress(self):
+        changes = os.path.join(self.tmp, "changes.json")
+        with open(changes, "w") as f:
+            json.dump({"version": 1, "rules": {"install": None, "remove": False}, "flush": False,
+                       "attach": [], "detach": [], "reload": False, "retrigger": [], "settle_timeout": 1}, f)
+        request_id, events = self.session.subscribe("apply", changes=changes)
+        messages = [events.get(timeout=5) for _ in range(3)]
+        self.assertEqual([m.get("step") for m in messages[:2]], ["start", "done"])
+        self.assertEqual(messages[2], {"id": request_id, "ok": True, "failed": 0})
+
+    def test_helper_exits_with_session(self):
+        process = self.session.process
+        self.session.close()
+        self.assertIsNotNone(process.poll())
+        self.assertFalse(self.session.request("hello", timeout=5)["ok"])
+
+    def test_cancelled_authorization(self):
+        with self.assertRaises(PermissionError):
+            helper_client.HelperSession(command=["sh", "-c", "exit 126"]).start()
+
+    def test_frames_survive_arbitrary_chunking(self):
+        stream = encode_message({"id": 1}) + encode_message({"id": 2, "event": "input"})
+        reader = FrameReader()
+        frames = [frame for i in range(len(stream)) for frame in reader.feed(stream[i:i + 1])]
+        self.assertEqual([json.loads(payload)["id"] for _, payload in frames], [1, 2])
+
+    def test_input_records_are_compact_and_bursts_coalesce(self):
+        records = [(1, EV_KEY, 30, 1, 1000), (1, EV_KEY, 30, 2, 1030), (0, EV_KEY, 272, 0, 1040),
+                   (0, 2, 0, 5, 1050), (0, EV_KEY, 272, 1, 1060), (1, EV_KEY, 31, 1, 1070)]
+        frame = encode_records(7, records)
+        self.assertEqual(len(frame), 5 + 4 + 18 * len(records))
+        [(kind, payload)] = FrameReader().feed(frame)
+        self.assertEqual(kind, KIND_INPUT)
+        self.assertEqual(decode_records(payload), (7, records))
+        self.assertEqual(helper_client.touched_devices(records, ["usb:mouse", "usb:keyboard"]),
+                         ["usb:keyboard", "usb:mouse"])
+
+    def test_hotplugged_input_nodes_are_announced_with_persistent_ids(self):
+        devpath = "/devices/pci0000:00/0000:00:14.0/usb1/1-4/1-4:1.0/0003:046D:C31C.0005/input/input9/event9"
+        added = input_node_event({"ACTION": "add", "SUBSYSTEM": "input", "DEVPATH": devpath,
+                                  "DEVNAME": "/dev/input/event9", "ID_INPUT": "1", "ID_INPUT_KEYBOARD": "1",
+                                  "ID_PATH": "pci-0000:00:14.0-usb-0:4:1.0"})
+        self.assertEqual(added[:4], ("add", "/dev/input/event9", "/sys" + devpath, "path:pci-0000:00:14.0-usb-0:4:1.0"))
+        removed = input_node_event({"ACTION": "remove", "SUBSYSTEM": "input", "DEVPATH": devpath, "DEVNAME": "input/event9"})
+        self.assertEqual(removed[:2], ("remove", "/dev/input/event9"))
+        # Not classified as input by udev, or not an event node
+        self.assertIsNone(input_node_event({"ACTION": "add", "SUBSYSTEM": "input", "DEVPATH": devpath,
+                                            "DEVNAME": "/dev/input/event9"}))
+        self.assertIsNone(input_node_event({"ACTION": "add", "SUBSYSTEM": "input", "DEVPATH": devpath[:-7],
+                                            "ID_INPUT": "1"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import socket
+import struct
+import unittest
+
+from src.core.hotplug import parse_uevent, HotplugModel
+from src.core.scanner import HardwareScanner
+from src.core.config import ConfigManager
+
+USB_ROOT = "/sys/devices/pci0000:00/0000:00:14.0/usb1"
+
+
+class StubScanner(HardwareScanner):
+    """Serves USB/input reads from memory instead of sysfs."""
+
+    def __init__(self):
+        super().__init__(ConfigManager("/tmp/test_hotplug_aliases.json"))
+        self.input_nodes = {}
+
+    def _read_usb_device(self, item):
+        syspath = USB_ROOT
+        if item != "usb1":
+            parent = self.usb_parent_id(item)
+            syspath = self._read_usb_device(parent)["syspath"] + "/" + item
+        return {"id": item, "syspath": syspath, "persistent_id": item, "name": f"USB {item}",
+                "is_hub": item in ("usb1", "1-2"), "type": "usb", "children": []}
+
+    def _read_input_node(self, ev):
+        if ev not in self.input_nodes:
+            return None
+        return {"path": self.input_nodes[ev], "name": ev, "phys_path": f"phys-{ev}",
+                "has_rel": False, "has_abs": False, "key_count": 100}
+
+    def scan_input_devices(self, event_nodes=None):
+        return [{"syspath": self.input_nodes[ev], "persistent_id": ev, "name": f"Input {ev}",
+                 "type": "input", "nodes": [ev]} for ev in event_nodes]
+
+
+class TestHotplug(unittest.TestCase):
+    def test_parse_kernel_and_libudev_messages(self):
+        kernel = b"add@/devices/usb1/1-2\x00ACTION=add\x00DEVPATH=/devices/usb1/1-2\x00SUBSYSTEM=usb\x00"
+        self.assertEqual(parse_uevent(kernel)["SUBSYSTEM"], "usb")
+
+        props = b"ACTION=remove\x00DEVPATH=/devices/usb1/1-2\x00SUBSYSTEM=usb\x00ID_PATH=pci-usb-0:2\x00"
+        header = struct.pack("=8sIIIIIIII", b"libudev\x00", socket.htonl(0xfeedcafe), 40, 40, len(props), 0, 0, 0, 0)
+        event = parse_uevent(header + props)
+        self.assertEqual(event["ACTION"], "remove")
+        self.assertEqual(event["ID_PATH"], "pci-usb-0:2")
+        self.assertIsNone(parse_uevent(b"garbage"))
+
+    def test_usb_and_input_deltas(self):
+        scanner = StubScanner()
+        root = scanner._read_usb_device("usb1")
+        hardware_data = {"usb": {"usb1": root}, "graphics": [], "inputs": [], "av": []}
+        model = HotplugModel(scanner, hardware_data)
+
+        changes = model.apply_events([
+            {"ACTION": "add", "DEVPATH": f"{USB_ROOT}/1-2"[4:], "SUBSYSTEM": "usb", "DEVTYPE": "usb_device"},
+            {"ACTION": "add", "DEVPATH": f"{USB_ROOT}/1-2/1-2.1"[4:], "SUBSYSTEM": "usb", "DEVTYPE": "usb_device"},
+        ])
+        self.assertEqual([(a, c) for a, c, _ in changes], [("add", "usb"), ("add", "usb")])
+        hub = root["children"][0]
+        self.assertEqual(hub["id"], "1-2")
+        self.assertEqual(hub["children"][0]["id"], "1-2.1")
+
+        # A keyboard event node under the new device hides its raw USB node
+        scanner.input_nodes["event7"] = f"{USB_ROOT}/1-2/1-2.1/1-2.1:1.0/input/input7/event7"
+        changes = model.apply_events([
+            {"ACTION": "add", "DEVPATH": scanner.input_nodes["event7"][4:], "SUBSYSTEM": "input"},
+        ])
+        self.assertIn(("add", "inputs"), [(a, c) for a, c, _ in changes])
+        self.assertTrue(hub["children"][0].get("hidden_by_input"))
+
+        changes = model.apply_events([
+            {"ACTION": "remove", "DEVPATH": scanner.input_nodes["event7"][4:], "SUBSYSTEM": "input"},
+            {"ACTION": "remove", "DEVPATH": f"{USB_ROOT}/1-2/1-2.1"[4:], "SUBSYSTEM": "usb", "DEVTYPE": "usb_device"},
+        ])
+        self.assertEqual(hardware_data["inputs"], [])
+        self.assertEqual(hub["children"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
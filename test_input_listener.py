@@ -0,0 +1,86 @@
+import sys
+import time
+import threading
+import unittest
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop
+
+from src.core import helper_client
+from src.core.session_helper import EV_KEY
+from src.ui.input_listener import InputListener
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+HELPER = [sys.executable, helper_client.SESSION_HELPER_SCRIPT]
+
+
+def spin(condition, timeout_ms=5000):
+    """Runs the Qt event loop until condition() holds or the timeout passes."""
+    deadline = time.monotonic() + timeout_ms / 1000
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 20)
+    return condition()
+
+
+class QuietSession:
+    """A running session that accepts requests but never answers; the test feeds the replies."""
+
+    def is_alive(self):
+        return True
+
+    def subscribe(self, op, events=None, **fields):
+        return 1, events
+
+    def cancel(self, request_id):
+        pass
+
+    def close(self):
+        pass
+
+
+class TestInputListener(unittest.TestCase):
+    def setUp(self):
+        helper_client._session = helper_client.HelperSession(command=HELPER).start()
+
+    def tearDown(self):
+        helper_client.close_session()
+
+    def test_toggling_costs_no_threads_and_no_waiting(self):
+        threads = threading.active_count()
+        for _ in range(3):
+            listener = InputListener([])
+            listener.start()
+            started = time.monotonic()
+            listener.stop()
+            self.assertLess(time.monotonic() - started, 0.05)
+            self.assertFalse(listener.is_active())
+        self.assertEqual(threading.active_count(), threads)
+        # The helper dropped every cancelled session and still answers
+        self.assertTrue(helper_client.get_session().request("hello", timeout=5)["ok"])
+
+    def test_bursts_are_handled_in_one_wakeup(self):
+        helper_client.close_session()
+        helper_client._session = QuietSession()
+        listener = InputListener([])
+        hits = []
+        listener.device_identified.connect(hits.append)
+        listener.start()
+        listener.events.put({"ok": True, "table": ["usb:keyboard", "usb:mouse"]})
+        listener.events.put({"event": "records", "records": [(1, EV_KEY, 272, 1, 10), (0, EV_KEY, 30, 1, 20)]})
+        listener.events.put({"event": "records", "records": [(1, EV_KEY, 272, 1, 30)]})
+        self.assertTrue(spin(lambda: hits))
+        self.assertEqual(hits, ["usb:mouse", "usb:keyboard"])
+        listener.stop()
+
+    def test_lost_helper_reports_failure(self):
+        listener = InputListener([])
+        errors = []
+        listener.failed.connect(errors.append)
+        listener.start()
+        helper_client._session.process.kill()
+        self.assertTrue(spin(lambda: errors))
+        self.assertFalse(listener.is_active())
+
+
+if __name__ == '__main__':
+    unittest.main()
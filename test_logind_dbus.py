@@ -0,0 +1,102 @@
+import shutil
+import subprocess
+import threading
+import unittest
+
+from src.core import logind_dbus
+
+try:
+    from jeepney import HeaderFields, MessageType, new_error, new_method_return
+    from jeepney.bus_messages import message_bus
+    from jeepney.io.blocking import open_dbus_connection
+except ImportError:
+    open_dbus_connection = None
+
+SEAT_PATH = "/org/freedesktop/login1/seat/"
+SEATS = {
+    "seat0": {"Id": ("s", "seat0"), "CanGraphical": ("b", True), "Sessions": ("a(so)", [("2", "/org/freedesktop/login1/session/_32")])},
+    "seat1": {"Id": ("s", "seat1"), "CanGraphical": ("b", True), "Sessions": ("a(so)", [])},
+}
+
+
+class FakeLogind(threading.Thread):
+    """Stand-in org.freedesktop.login1 answering ListSeats, Properties.GetAll, AttachDevice and FlushDevices."""
+
+    def __init__(self, address):
+        super().__init__(daemon=True)
+        self.conn = open_dbus_connection(bus=address)
+        self.conn.send_and_get_reply(message_bus.RequestName(logind_dbus.LOGIN1_BUS_NAME))
+        self.running = True
+        self.calls = []
+        self.bodies = []
+
+    def run(self):
+        while self.running:
+            try:
+                msg = self.conn.receive(timeout=0.05)
+            except TimeoutError:
+                continue
+            except OSError:
+                return
+            if msg.header.message_type != MessageType.method_call:
+                continue
+            member = msg.header.fields.get(HeaderFields.member)
+            path = msg.header.fields.get(HeaderFields.path)
+            self.calls.append(member)
+            self.bodies.append(msg.body)
+            if member == "ListSeats":
+                reply = new_method_return(msg, "a(so)", ([(seat, SEAT_PATH + seat) for seat in SEATS],))
+            elif member == "GetAll" and path.startswith(SEAT_PATH) and path[len(SEAT_PATH):] in SEATS:
+                reply = new_method_return(msg, "a{sv}", (SEATS[path[len(SEAT_PATH):]],))
+            elif member == "AttachDevice" and msg.body[0] in SEATS:
+                reply = new_method_return(msg)
+            elif member == "FlushDevices":
+                reply = new_method_return(msg)
+            else:
+                reply = new_error(msg, "org.freedesktop.DBus.Error.UnknownMethod")
+            self.conn.send(reply)
+
+    def stop(self):
+        self.running = False
+        self.join()
+        self.conn.close()
+
+
+@unittest.skipIf(open_dbus_connection is None or not shutil.which("dbus-daemon"), "needs jeepney and dbus-daemon")
+class TestLogindDbus(unittest.TestCase):
+    def setUp(self):
+        self.daemon = subprocess.Popen(["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+                                       stdout=subprocess.PIPE, text=True)
+        self.address = self.daemon.stdout.readline().strip()
+        self.logind = FakeLogind(self.address)
+        self.logind.start()
+
+    def tearDown(self):
+        self.logind.stop()
+        self.daemon.terminate()
+        self.daemon.wait()
+        self.daemon.stdout.close()
+
+    def test_query_seats_over_one_connection(self):
+        seats = logind_dbus.query_seats(bus=self.address)
+        self.assertEqual(list(seats), ["seat0", "seat1"])
+        self.assertEqual(seats["seat1"]["Id"], "seat1")
+        self.assertTrue(seats["seat1"]["CanGraphical"])
+        self.assertEqual(seats["seat0"]["Sessions"], [("2", "/org/freedesktop/login1/session/_32")])
+        self.assertEqual(self.logind.calls, ["ListSeats", "GetAll", "GetAll"])
+
+    def test_manager_batches_attaches_on_one_connection(self):
+        with logind_dbus.LogindManager(bus=self.address) as manager:
+            manager.attach_device("seat1", "/sys/devices/pci0000:00/0000:00:14.0/usb1/1-2")
+            manager.flush_devices()
+            with self.assertRaises(Exception):
+                manager.attach_device("seat9", "/sys/devices/platform/foo")
+        self.assertEqual(self.logind.calls, ["AttachDevice", "FlushDevices", "AttachDevice"])
+        self.assertEqual(self.logind.bodies[0], ("seat1", "/sys/devices/pci0000:00/0000:00:14.0/usb1/1-2", False))
+
+    def test_unreachable_bus_returns_none(self):
+        self.assertIsNone(logind_dbus.query_seats(bus="unix:path=/nonexistent/bus"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from src.core.pci_ids import PciIdsIndex
+
+PCI_IDS = """# Sample pci.ids
+10de  NVIDIA Corporation
+\t2206  GA102 [GeForce RTX 3080]
+\t\t1043 87b3  TUF Gaming GeForce RTX 3080
+\t2484  GA104 [GeForce RTX 3070]
+1002  Advanced Micro Devices, Inc. [AMD/ATI]
+\t73bf  Navi 21 [Radeon RX 6800/6800 XT / 6900 XT]
+C 03  Display controller
+\t00  VGA compatible controller
+"""
+
+
+class TestPciIdsIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ids_path = os.path.join(self.tmp.name, "pci.ids")
+        self.index_path = os.path.join(self.tmp.name, "cache", "pci.ids.idx")
+        with open(self.ids_path, "w") as f:
+            f.write(PCI_IDS)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookup(self):
+        index = PciIdsIndex.open(self.ids_path, self.index_path)
+        self.assertEqual(len(index), 6)
+        self.assertEqual(index.lookup(0x10de, 0x2206, 0x1043, 0x87b3),
+                         ("NVIDIA Corporation", "GA102 [GeForce RTX 3080]", "TUF Gaming GeForce RTX 3080"))
+        self.assertEqual(index.lookup(0x1002, 0x73bf)[1], "Navi 21 [Radeon RX 6800/6800 XT / 6900 XT]")
+        self.assertEqual(index.lookup(0x10de, 0xffff), ("NVIDIA Corporation", None, None))
+        self.assertEqual(index.lookup(0x8086, 0x1234), (None, None, None))
+
+    def test_index_is_reused_and_rebuilt_on_change(self):
+        PciIdsIndex.open(self.ids_path, self.index_path)
+        built_mtime = os.stat(self.index_path).st_mtime_ns
+        PciIdsIndex.open(self.ids_path, self.index_path)
+        self.assertEqual(os.stat(self.index_path).st_mtime_ns, built_mtime)
+
+        with open(self.ids_path, "w") as f:
+            f.write("8086  Intel Corporation\n" + PCI_IDS)
+        os.utime(self.ids_path, ns=(built_mtime + 10**9, built_mtime + 10**9))
+        index = PciIdsIndex.open(self.ids_path, self.index_path)
+        self.assertEqual(index.lookup(0x8086, 0x56a0)[0], "Intel Corporation")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import json
+import unittest
+
+from src.core.registry import DeviceRegistry, GpuDevice, IdentifierMatcher, InputDevice, to_plain
+
+SCAN = {
+    "usb": {"usb1": {"id": "usb1", "syspath": "/sys/devices/pci0000:00/0000:00:14.0/usb1", "persistent_id": "path:pci-0000:00:14.0",
+                     "name": "Motherboard USB Controller", "is_hub": True, "type": "usb", "children": [
+                         {"id": "1-2", "syspath": "/sys/devices/pci0000:00/0000:00:14.0/usb1/1-2", "persistent_id": "path:pci-0000:00:14.0-usb-0:2",
+                          "name": "Hub", "is_hub": True, "type": "usb", "children": [], "hidden_by_input": True}]}},
+    "graphics": [{"syspath": "/sys/devices/pci0000:00/0000:00:01.0/0000:01:00.0/drm/card0", "pci_syspath": "0000:01:00",
+                  "persistent_id": "path:pci-0000:01:00.0", "name": "GPU", "type": "gpu", "audio_video": [],
+                  "monitors": [{"syspath": "/sys/devices/pci0000:00/0000:00:01.0/0000:01:00.0/drm/card0/card0-DP-1",
+                                "persistent_id": "path:pci-0000:01:00.0/DP-1", "name": "Display DP-1", "type": "monitor",
+                                "connector": "DP-1", "audio_video": [{"syspath": "/sys/devices/pci0000:00/0000:00:01.0/0000:01:00.1/sound/card1",
+                                                                     "persistent_id": "path:pci-0000:01:00.1", "name": "Monitor Audio Output",
+                                                                     "type": "audio", "eld_monitors": [], "children": []}]}]}],
+    "inputs": [{"syspath": "/sys/devices/pci0000:00/0000:00:14.0/usb1/1-2/1-2.1/1-2.1:1.0/input/input3/event3",
+                "persistent_id": "path:pci-0000:00:14.0-usb-0:2.1:1.0", "name": "Keyboard", "type": "input", "nodes": ["event3"]}],
+    "av": [],
+}
+
+
+class TestDeviceRegistry(unittest.TestCase):
+    def test_records_behave_like_dicts(self):
+        record = InputDevice(name="Keyboard", nodes=["event3"])
+        self.assertEqual(record["name"], "Keyboard")
+        self.assertNotIn("syspath", record)
+        self.assertIsNone(record.get("syspath"))
+        record["restrict_access"] = True
+        record["custom"] = 1
+        self.assertEqual(dict(record), {"name": "Keyboard", "nodes": ["event3"], "restrict_access": True, "custom": 1})
+        self.assertTrue(record.pop("restrict_access"))
+        record.clear()
+        self.assertEqual(len(record), 0)
+        with self.assertRaises(AttributeError):
+            record.__dict__
+
+    def test_round_trip_and_lookups(self):
+        registry = DeviceRegistry.from_dict(json.loads(json.dumps(SCAN)))
+        self.assertEqual(to_plain(registry), SCAN)
+        gpu = registry["graphics"][0]
+        self.assertIsInstance(gpu, GpuDevice)
+        self.assertIs(registry.by_pci_device("0000:01:00"), gpu)
+        self.assertIs(registry.lookup("path:pci-0000:01:00.0/DP-1"), gpu["monitors"][0])
+        self.assertEqual(registry.by_syspath("/sys/devices/pci0000:00/0000:00:14.0/usb1/1-2")["id"], "1-2")
+
+        registry["inputs"].append(InputDevice(persistent_id="new", type="input"))
+        self.assertIsNone(registry.by_persistent_id("new"))
+        registry.invalidate()
+        self.assertIsNotNone(registry.by_persistent_id("new"))
+
+    def test_matcher_agrees_with_linear_rules(self):
+        identifiers = ["/sys/devices/pci0000:00/0000:00:14.0/usb1/1-2/1-2.1", {"id": "0000:01:00", "restrict_access": True},
+                       "usb-0:2.1:1.0", {"id": "path:pci-0000:00:14.0-usb-0:2.1:1.0/extra"}, "unrelated"]
+
+        def linear(pid, syspath, pci):
+            for ident in identifiers:
+                text = ident if isinstance(ident, str) else ident["id"]
+                if text in (pid, syspath, pci) or \
+                        (syspath and (text.startswith(syspath) or syspath.startswith(text))) or \
+                        (pci and (text.startswith(pci) or pci.startswith(text))) or \
+                        (pid and (pid.endswith(text) or text.endswith(pid))):
+                    return ident
+            return None
+
+        matcher = IdentifierMatcher((i if isinstance(i, str) else i["id"], i) for i in identifiers)
+        registry = DeviceRegistry.from_dict(SCAN)
+        for device in registry.iter_devices():
+            args = (device.get("persistent_id"), device.get("syspath"), device.get("pci_syspath"))
+            self.assertIs(matcher.match(*args), linear(*args), args)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import stat
+import subprocess
+import tempfile
+import unittest
+
+from src.core.executor import ConfigExecutor
+from src.core.rules_index import RulesIndex
+
+GPU = {"name": "GPU", "type": "gpu", "syspath": "/sys/devices/pci0000:00/0000:00:01.0/0000:01:00.0/drm/card0",
+       "pci_syspath": "0000:01:00"}
+KEYBOARD = {"name": "Keyboard", "type": "input", "syspath": "/sys/devices/pci0000:00/usb1/1-2"}
+
+
+class TestScopedRetrigger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.executor = ConfigExecutor()
+        self.executor.staging_dir = os.path.join(self.tmp.name, "staging")
+        self.rules = RulesIndex(root=os.path.join(self.tmp.name, "root"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def script(self, staging_map, live_assignments):
+        self.executor.generate_staging(staging_map, live_assignments=live_assignments, rules_index=self.rules)
+        with open(os.path.join(self.executor.staging_dir, "apply_config.sh")) as f:
+            return f.read()
+
+    def run_retrigger(self, script, udevadm_body):
+        """Runs the retrigger part of a script against a fake udevadm that logs its arguments."""
+        bin_dir = os.path.join(self.tmp.name, "bin")
+        os.makedirs(bin_dir, exist_ok=True)
+        log = os.path.join(self.tmp.name, "udevadm.log")
+        fake = os.path.join(bin_dir, "udevadm")
+        with open(fake, "w") as f:
+            f.write(f'#!/bin/sh\necho "$@" >> {log}\n{udevadm_body}\n')
+        os.chmod(fake, os.stat(fake).st_mode | stat.S_IEXEC)
+        retrigger = script[script.index("start="):]
+        result = subprocess.run(["sh", "-c", retrigger], capture_output=True, text=True,
+                                env=dict(os.environ, PATH=bin_dir + os.pathsep + os.environ["PATH"]))
+        with open(log) as f:
+            return result.stdout, f.read().splitlines()
+
+    def test_only_changed_devices_are_retriggered(self):
+        script = self.script({"seat0": [KEYBOARD], "seat1": [GPU]}, {})
+        self.assertNotIn("udevadm trigger\n", script)
+        self.assertIn("--parent-match=/sys/devices/pci0000:00/0000:00:01.0/0000:01:00.0", script)
+        self.assertNotIn("--parent-match=/sys/devices/pci0000:00/usb1/1-2", script)
+
+        output, calls = self.run_retrigger(script, "exit 0")
+        self.assertEqual(calls, ["trigger --action=change --settle --parent-match=/sys/devices/pci0000:00/0000:00:01.0/0000:01:00.0"])
+        self.assertRegex(output, r"Seats ready after \d+ ms \(1 device\(s\) retriggered\)")
+
+    def test_falls_back_to_bounded_settle(self):
+        script = self.script({"seat1": [GPU, KEYBOARD]}, {})
+        _, calls = self.run_retrigger(script, 'case "$*" in *--settle*) exit 1;; esac')
+        self.assertEqual(len(calls), 3)
+        self.assertNotIn("--settle", calls[1])
+        self.assertEqual(calls[2], "settle --timeout=15")
+
+    def test_unchanged_assignments_skip_trigger(self):
+        script = self.script({"seat1": [GPU]}, {"/sys/devices/pci0000:00/0000:00:01.0/0000:01:00.0": "seat1"})
+        self.assertNotIn("udevadm trigger", script)
+        self.assertNotIn("loginctl attach", script)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.rules_gen import generate_rules, END_LABEL
+from src.core.rules_index import RulesIndex, parse_rules_file
+
+HUB = "/sys/devices/pci0000:00/0000:00:14.0/usb1/1-2"
+GPU = "/sys/devices/pci0000:00/0000:00:01.0/0000:01:00.0"
+
+
+def hw(name, type_="input"):
+    data = {"name": name, "type": type_}
+    if type_ == "gpu":
+        data["pci_syspath"] = "0000:01:00"
+    return data
+
+
+class TestRulesGen(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_one_rule_per_seat_with_collapsed_hub(self):
+        desired = [
+            (GPU, "seat1", None, hw("GPU", "gpu")),
+            (f"{HUB}/1-2.1/1-2.1:1.0/input/input3/event3", "seat1", None, hw("Keyboard")),
+            (f"{HUB}/1-2.2/1-2.2:1.0/input/input4/event4", "seat1", None, hw("Mouse")),
+            # Same root hub, but a seat0 device sits under it: usb1 must not collapse
+            ("/sys/devices/pci0000:00/0000:00:14.0/usb1/1-3/1-3:1.0/input/input5/event5", "seat0", None, hw("Other")),
+            ("/sys/devices/pci0000:00/0000:00:14.0/usb1/1-4/1-4:1.0/input/input6/event6", "seat2", "0600", hw("Pad")),
+        ]
+        lines = generate_rules(desired)
+        rules = [line for line in lines if line and not line.startswith("#")]
+        self.assertEqual(rules[:2], [f'ACTION=="remove", GOTO="{END_LABEL}"', f'TAG!="seat", GOTO="{END_LABEL}"'])
+        self.assertEqual(rules[-1], f'LABEL="{END_LABEL}"')
+        self.assertEqual(rules[2], f'DEVPATH=="/devices/pci0000:00/0000:00:01.0/0000:01:00.0|'
+                                   f'/devices/pci0000:00/0000:00:01.0/0000:01:00.0/*|'
+                                   f'/devices/pci0000:00/0000:00:14.0/usb1/1-2/*", '
+                                   f'ENV{{ID_SEAT}}="seat1", GOTO="{END_LABEL}"')
+        self.assertIn('ENV{ID_SEAT}="seat2", MODE="0600"', rules[3])
+        self.assertEqual(generate_rules([(GPU, "seat0", None, hw("GPU", "gpu"))]), [])
+
+        # The rules index resolves alternatives and collapsed prefixes back to the device
+        path = os.path.join(self.tmp, "70-multiseat-manager.rules")
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        self.assertEqual(len(parse_rules_file(path)), 2)
+        index = RulesIndex(dirs=[self.tmp]).refresh()
+        self.assertEqual(index.lookup(GPU).seat, "seat1")
+        self.assertEqual(index.lookup(f"{GPU}/drm/card0").seat, "seat1")
+        self.assertEqual(index.lookup(f"{HUB}/1-2.1/1-2.1:1.0/input/input3/event3").seat, "seat1")
+        self.assertIsNone(index.lookup(HUB))
+        self.assertEqual(index.lookup("/sys/devices/pci0000:00/0000:00:14.0/usb1/1-4/1-4:1.0/input/input6/event6").mode, "0600")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import time
+import unittest
+
+from src.core.executor import ConfigExecutor
+from src.core.rules_index import RulesIndex, parse_rule_line, path_tag
+
+GPU_PCI = "/sys/devices/pci0000:00/0000:00:01.0/0000:01:00.0"
+
+
+class TestRulesIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.write("/etc/udev/rules.d/70-multiseat-manager.rules",
+                   '# Keyboard\n'
+                   'TAG=="seat", DEVPATH=="/devices/pci0000:00/usb1/1-2", ENV{ID_SEAT}="seat1", MODE="0600"\n'
+                   'TAG=="seat", DEVPATH=="/devices/pci0000:00/0000:00:01.0/0000:01:00.0/*", SUBSYSTEM=="drm", \\\n'
+                   '    ENV{ID_SEAT}="seat1"\n')
+        self.write("/etc/udev/rules.d/72-seat-drm-pci-0000_02_00_0.rules",
+                   'TAG=="seat", ENV{ID_FOR_SEAT}=="drm-pci-0000_02_00_0", ENV{ID_SEAT}="seat2"\n')
+        # Masked by the /etc file of the same name
+        self.write("/usr/lib/udev/rules.d/72-seat-drm-pci-0000_02_00_0.rules",
+                   'TAG=="seat", ENV{ID_FOR_SEAT}=="drm-pci-0000_02_00_0", ENV{ID_SEAT}="seat9"\n')
+        self.write("/usr/lib/udev/rules.d/71-seat.rules", 'SUBSYSTEM=="drm", TAG+="seat"\n')
+        self.index = RulesIndex(root=self.root).refresh()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, content):
+        host = os.path.join(self.root, path.lstrip("/"))
+        os.makedirs(os.path.dirname(host), exist_ok=True)
+        with open(host, "w") as f:
+            f.write(content)
+
+    def test_parse_rule_line(self):
+        rule = parse_rule_line('TAG=="seat", ENV{ID_PATH}=="pci-0000:00:14.0-usb-0:2", ENV{ID_SEAT}="seat3"')
+        self.assertEqual((rule.seat, rule.id_path, rule.devpath), ("seat3", "pci-0000:00:14.0-usb-0:2", None))
+        self.assertIsNone(parse_rule_line('SUBSYSTEM=="drm", TAG+="seat"'))
+        self.assertEqual(path_tag("pci-0000:00:14.0-usb-0:2"), "pci-0000_00_14_0-usb-0_2")
+
+    def test_lookups(self):
+        rule = self.index.lookup("/sys/devices/pci0000:00/usb1/1-2")
+        self.assertEqual((rule.seat, rule.mode, rule.line), ("seat1", "0600", 2))
+        # ID_FOR_SEAT rules from loginctl attach are found from the device's ID_PATH; /etc masks /usr/lib
+        rule = self.index.lookup(id_path="pci-0000:02:00.0")
+        self.assertEqual(rule.seat, "seat2")
+        self.assertTrue(rule.file.startswith(os.path.join(self.root, "etc")))
+        self.assertIsNone(self.index.lookup("/sys/devices/other"))
+        # Glob DEVPATH rules are indexed but never reported as a literal assignment
+        self.assertEqual(self.index.seat_assignments(), {"/sys/devices/pci0000:00/usb1/1-2": "seat1"})
+        self.assertEqual(len(self.index.rules()), 3)
+
+    def test_refresh_rereads_changed_files_only(self):
+        path = os.path.join(self.root, "etc/udev/rules.d/70-multiseat-manager.rules")
+        untouched = self.index._files[os.path.join(self.root, "etc/udev/rules.d/72-seat-drm-pci-0000_02_00_0.rules")]
+        with open(path, "w") as f:
+            f.write('TAG=="seat", DEVPATH=="/devices/pci0000:00/usb1/1-2", ENV{ID_SEAT}="seat4"\n')
+        os.utime(path, ns=(time.time_ns() + 10**9,) * 2)
+        self.index.refresh()
+        self.assertEqual(self.index.lookup("/sys/devices/pci0000:00/usb1/1-2").seat, "seat4")
+        self.assertIs(self.index._files[os.path.join(self.root, "etc/udev/rules.d/72-seat-drm-pci-0000_02_00_0.rules")], untouched)
+
+    def test_executor_releases_loginctl_attached_devices_to_seat0(self):
+        executor = ConfigExecutor()
+        executor.staging_dir = os.path.join(self.root, "staging")
+        gpu = {"name": "GPU", "type": "gpu", "syspath": "/sys/devices/pci0000:00/0000:00:01.1/0000:02:00.0/drm/card1",
+               "pci_syspath": "0000:02:00", "persistent_id": "path:pci-0000:02:00.0"}
+        keyboard = {"name": "Keyboard", "type": "input", "syspath": "/sys/devices/pci0000:00/usb1/1-2"}
+        executor.generate_staging({"seat0": [gpu], "seat1": [keyboard]}, live_assignments={}, rules_index=self.index)
+        with open(os.path.join(executor.staging_dir, "apply_config.sh")) as f:
+            self.assertIn("loginctl attach seat0 /sys/devices/pci0000:00/0000:00:01.1/0000:02:00.0\n", f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.tools.synthetic_topology import generate_topology
+from src.core.config import ConfigManager
+from src.core.scanner import HardwareScanner
+from src.core.executor import ConfigExecutor
+from src.core.rules_index import RulesIndex
+from src.core.rules_sim import RuleSimulator
+
+
+class TestRuleSimulator(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        generate_topology(self.root, gpus=2, desks=2)
+        scanner = HardwareScanner(ConfigManager(os.path.join(self.root, "aliases.json")), root=self.root)
+        hardware = scanner.full_scan()
+        self.keyboard = next(inp for inp in hardware["inputs"] if "/1-1/" in inp.get("syspath", ""))
+        self.hub = self.keyboard["syspath"].split("/1-1/")[0] + "/1-1"
+        self.staging_map = {
+            "seat0": [],
+            "seat1": [hardware["graphics"][1], {"name": "Desk hub", "type": "usb_hub", "syspath": self.hub}],
+        }
+        self.simulator = RuleSimulator(scanner.udev_db, RulesIndex(root=self.root), root=self.root)
+        self.executor = ConfigExecutor()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write_rules(self, name, text):
+        rules_dir = os.path.join(self.root, "usr/lib/udev/rules.d")
+        os.makedirs(rules_dir, exist_ok=True)
+        with open(os.path.join(rules_dir, name), "w") as f:
+            f.write(text)
+
+    def test_predicts_seats_through_installed_rules(self):
+        # Without seat inheritance the keyboard below the hub stays on seat0
+        predicted, mismatches = self.executor.predict(self.staging_map, self.simulator)
+        self.assertEqual(mismatches, {self.hub: ("seat1", "seat0")})
+        self.assertIn("seat1", {seat for path, seat in predicted.items() if "/drm/" in path})
+
+        # logind's 71-seat.rules lets children import ID_SEAT from their parent
+        self.write_rules("71-seat.rules", 'ACTION=="remove", GOTO="seat_end"\n'
+                                          'ENV{ID_SEAT}=="", IMPORT{parent}="ID_SEAT"\n'
+                                          'LABEL="seat_end"\n')
+        predicted, mismatches = self.executor.predict(self.staging_map, self.simulator)
+        self.assertEqual(mismatches, {})
+        self.assertEqual(predicted[self.keyboard["syspath"]], "seat1")
+
+        # A leftover `loginctl attach` rule (72-seat-*) runs later and wins
+        id_path = self.simulator.udev_db.properties(self.keyboard["syspath"])["ID_PATH"]
+        self.write_rules("72-seat-input-kbd.rules", f'TAG=="seat", ENV{{ID_PATH}}=="{id_path}", ENV{{ID_SEAT}}="seat2"\n')
+        predicted, mismatches = self.executor.predict(self.staging_map, self.simulator)
+        self.assertEqual(mismatches, {self.hub: ("seat1", "seat2")})
+
+
+if __name__ == '__main__':
+    unittest.main()
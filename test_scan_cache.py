@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+
+from src.core.config import ConfigManager
+from src.core.registry import DeviceRegistry, GpuDevice, to_plain
+from src.core.scan_cache import compute_fingerprint, load_cached_scan, store_scan
+
+
+class TestScanCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, "scan.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_requires_matching_fingerprint(self):
+        hardware = {"usb": {}, "graphics": [{"name": "GPU", "monitors": []}], "inputs": [], "av": []}
+        store_scan(hardware, "abc", self.cache_path)
+        cached = load_cached_scan("abc", self.cache_path)
+        self.assertIsInstance(cached, DeviceRegistry)
+        self.assertIsInstance(cached["graphics"][0], GpuDevice)
+        self.assertEqual(to_plain(cached), hardware)
+        self.assertIsNone(load_cached_scan("def", self.cache_path))
+        self.assertIsNone(load_cached_scan("abc", os.path.join(self.tmp.name, "missing.json")))
+
+    def test_fingerprint_tracks_aliases(self):
+        config = ConfigManager(os.path.join(self.tmp.name, "aliases.json"))
+        before = compute_fingerprint(config)
+        self.assertEqual(before, compute_fingerprint(config))
+        config.aliases["path:pci-0000:00:14.0-usb-0:2"] = "Desk 3 Keyboard"
+        self.assertNotEqual(before, compute_fingerprint(config))
+
+
+if __name__ == '__main__':
+    unittest.main()
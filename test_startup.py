@@ -0,0 +1,55 @@
+import os
+import sys
+import json
+import subprocess
+import tempfile
+import unittest
+
+from PyQt6.QtWidgets import QApplication
+
+from app import MultiseatLauncher
+from src.core.config import ConfigManager
+from src.core.scanner import HardwareScanner
+from src.tools.synthetic_topology import generate_topology
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+qapp = QApplication.instance() or QApplication(sys.argv[:1])
+
+
+class TestLauncherStartup(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "root")
+        self.aliases = os.path.join(self.tmp.name, "aliases.json")
+        generate_topology(self.root, gpus=2, connectors=2, desks=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_launcher_shows_before_scan_completes(self):
+        launcher = MultiseatLauncher(scanner=HardwareScanner(ConfigManager(self.aliases), root=self.root))
+        launcher.show()
+        self.assertFalse(launcher.btn_advanced.isEnabled())
+        self.assertIn("Scanning", launcher.summary_label.text())
+
+        launcher.start_initial_scan(use_cache=False)
+        launcher.startup_thread.wait()
+        qapp.processEvents()
+        self.assertTrue(launcher.btn_advanced.isEnabled())
+        self.assertEqual(len(launcher.hardware_data["graphics"]), 2)
+        self.assertIn("2 GPUs", launcher.summary_label.text())
+        launcher.close()
+
+    def test_startup_defers_wizard_and_advanced_ui(self):
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--root", self.root, "--config", self.aliases],
+            cwd=APP_DIR, capture_output=True, text=True, check=True,
+            env=dict(os.environ, QT_QPA_PLATFORM="offscreen"),
+        )
+        timings = json.loads(result.stdout)
+        self.assertEqual(timings["lazy_modules_loaded"], [])
+        self.assertLessEqual(timings["time_to_window"], timings["time_to_hardware"])
+
+
+if __name__ == '__main__':
+    unittest.main()
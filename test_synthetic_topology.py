@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from src.core.config import ConfigManager
+from src.core.scan_cache import scans_equal
+from src.core.scanner import HardwareScanner
+from src.tools.synthetic_topology import generate_topology, topology_for_seats
+
+
+class TestSyntheticTopology(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "root")
+        self.config = ConfigManager(os.path.join(self.tmp.name, "aliases.json"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scanner_sees_generated_devices(self):
+        stats = generate_topology(self.root, **topology_for_seats(6))
+        hardware = HardwareScanner(self.config, root=self.root).full_scan()
+
+        self.assertEqual(len(hardware["graphics"]), stats["gpus"])
+        self.assertEqual(sum(len(gpu["monitors"]) for gpu in hardware["graphics"]), stats["monitors"])
+        # One keyboard and one mouse per desk; the keyboard's two event nodes are grouped
+        self.assertEqual(len(hardware["inputs"]), 12)
+        self.assertEqual(sum(len(inp["nodes"]) for inp in hardware["inputs"]), stats["event_nodes"])
+        self.assertTrue(all(inp["syspath"].startswith("/sys/devices/") for inp in hardware["inputs"]))
+        # HDMI audio is trapped under the GPUs, leaving only the onboard card
+        self.assertEqual([av["name"] for av in hardware["av"]], ["Sound (PCH)"])
+
+    def test_parallel_scan_matches_serial(self):
+        generate_topology(self.root, gpus=3, connectors=3, connected=2, desks=10, hub_depth=3)
+        scanner = HardwareScanner(self.config, root=self.root)
+        self.assertTrue(scans_equal(scanner.full_scan(), scanner.full_scan(parallel=True)))
+
+    def test_streaming_scan_yields_devices_before_done(self):
+        generate_topology(self.root, gpus=2, connectors=2, desks=3)
+        scanner = HardwareScanner(self.config, root=self.root)
+        for parallel in (False, True):
+            events = list(scanner.iter_scan(parallel=parallel))
+            self.assertEqual(events[-1][:2], ("done", "all"))
+            registry = events[-1][2]
+            added = [item for action, _, item in events if action == "add"]
+            self.assertTrue(all(any(item is gpu for item in added) for gpu in registry["graphics"]))
+            self.assertTrue(all(any(item is inp for item in added) for inp in registry["inputs"]))
+            # HDMI audio is announced, then withdrawn when its GPU traps it
+            trapped = [item for action, category, item in events if (action, category) == ("remove", "av")]
+            self.assertEqual(len(trapped), 2)
+            self.assertTrue(scans_equal(registry, scanner.full_scan()))
+
+
+if __name__ == '__main__':
+    unittest.main()
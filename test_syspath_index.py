@@ -0,0 +1,34 @@
+import unittest
+
+from src.core.syspath_index import SyspathIndex, pci_device_of
+
+HUB = "/sys/devices/pci0000:00/0000:00:14.0/usb1/1-1"
+
+
+class TestSyspathIndex(unittest.TestCase):
+    def test_pci_device_owns_all_functions(self):
+        index = SyspathIndex()
+        index.add_pci_device("0000:07:00", "gpu")
+        self.assertEqual(index.find_owner("/sys/devices/pci0000:00/0000:00:03.1/0000:07:00.1/sound/card1"), "gpu")
+        self.assertIsNone(index.find_owner("/sys/devices/pci0000:00/0000:00:03.1/0000:08:00.1/sound/card2"))
+        self.assertEqual(pci_device_of("0000:07:00.1"), "0000:07:00")
+        self.assertIsNone(pci_device_of("card1"))
+
+    def test_nearest_ancestor_wins(self):
+        index = SyspathIndex()
+        index.add(HUB, "hub")
+        index.add(HUB + "/1-1.2", "keyboard")
+        self.assertEqual(index.find_owner(HUB + "/1-1.2/1-1.2:1.0/input/input3"), "keyboard")
+        self.assertEqual(index.find_owner(HUB + "/1-1.3"), "hub")
+
+    def test_has_descendant_respects_path_boundaries(self):
+        index = SyspathIndex([HUB + "/1-1.2/1-1.2:1.0/input/input3/event3", HUB + "0/1-10.1"])
+        self.assertTrue(index.has_descendant(HUB))
+        self.assertTrue(index.has_descendant(HUB + "/1-1.2"))
+        self.assertFalse(index.has_descendant(HUB + "/1-1.3"))
+        # usb1/1-10 is a sibling of usb1/1-1, not a child
+        self.assertFalse(SyspathIndex([HUB + "0/1-10.1"]).has_descendant(HUB))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from src.core.udev_db import UdevDatabase, read_seat_assignments
+from src.tools.synthetic_topology import generate_topology
+from src.core.scanner import HardwareScanner
+from src.core.config import ConfigManager
+
+EXPORT_DB = """P: /devices/pci0000:00/0000:00:14.0/usb1/1-2
+N: bus/usb/001/003
+E: DEVPATH=/devices/pci0000:00/0000:00:14.0/usb1/1-2
+E: ID_PATH=pci-0000:00:14.0-usb-0:2
+E: ID_SERIAL=Logitech_USB_Receiver
+E: TAGS=:seat:uaccess:
+
+P: /devices/pci0000:00/0000:00:14.0/usb1/1-3
+E: ID_SERIAL=Some_Keyboard
+G: seat
+"""
+
+
+class TestUdevDatabase(unittest.TestCase):
+    def setUp(self):
+        self.db = UdevDatabase(UdevDatabase.parse_export_db(EXPORT_DB))
+
+    def test_export_db_parsing(self):
+        self.assertEqual(len(self.db), 2)
+        syspath = "/sys/devices/pci0000:00/0000:00:14.0/usb1/1-2"
+        self.assertEqual(self.db.get_property(syspath, "ID_PATH"), "pci-0000:00:14.0-usb-0:2")
+        self.assertEqual(self.db.tags(syspath), {"seat", "uaccess"})
+        self.assertEqual(self.db.tags("/sys/devices/pci0000:00/0000:00:14.0/usb1/1-3"), {"seat"})
+        self.assertIsNone(self.db.get_property("/sys/devices/missing", "ID_PATH"))
+
+    def test_persistent_id_uses_index(self):
+        scanner = HardwareScanner(ConfigManager("/tmp/test_udev_db_aliases.json"))
+        scanner.udev_db = self.db
+        self.assertEqual(scanner._get_persistent_id("/sys/devices/pci0000:00/0000:00:14.0/usb1/1-2"),
+                         "path:pci-0000:00:14.0-usb-0:2")
+        self.assertEqual(scanner._get_persistent_id("/sys/devices/pci0000:00/0000:00:14.0/usb1/1-3"),
+                         "serial:Some_Keyboard")
+        self.assertEqual(scanner._get_persistent_id("/sys/devices/platform/foo"), "platform/foo")
+
+
+class TestSeatAssignments(unittest.TestCase):
+    def test_single_sweep_reads_tagged_id_seat(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_topology(tmp, gpus=3, desks=1)
+            data_dir = os.path.join(tmp, "run/udev/data")
+            # card1 moved to seat1; card2 carries ID_SEAT without the "seat" tag, so it does not count
+            with open(os.path.join(data_dir, "c226:1"), "a") as f:
+                f.write("E:ID_SEAT=seat1\n")
+            with open(os.path.join(data_dir, "c226:2"), "w") as f:
+                f.write("E:ID_SEAT=seat2\nG:uaccess\n")
+
+            self.assertEqual(read_seat_assignments(root=tmp),
+                             {"/sys/devices/pci0000:00/0000:00:01.1/0000:02:00.0/drm/card1": "seat1"})
+            self.assertIsNone(read_seat_assignments(root=os.path.join(tmp, "missing")))
+
+
+if __name__ == '__main__':
+    unittest.main()